@@ -3,11 +3,35 @@ import eventlet
 eventlet.monkey_patch()
 
 # Now we can safely import other modules
+import logging
+import math
+import os
+import signal
+import sys
 import time
-from flask import Flask, render_template
-from flask_socketio import SocketIO, emit
+from eventlet import tpool
+from flask import Flask, render_template, jsonify, request, url_for, abort
+from flask_socketio import SocketIO, emit, join_room
 from flask_cors import CORS
-from game.core.game_state import GameState
+from game.core.batch import BatchSimulation
+from game.core.events import EventBus, ALL_EVENTS, game_event
+from game.core.snapshot import SnapshotStore
+from game.services.rooms import RoomManager, IDLE_TICK_RATE
+from game.services.verification import VerificationService, MAX_TICK_DT
+from game.services.leaderboard import Leaderboard
+from game.services.metrics import Metrics
+from game.services.gc_tuning import GCTuner
+from game.services.structured_log import configure_logging
+from game.services.scheduler import TickScheduler
+from game.services.compression import CompressionPolicy
+from game.services.assets import AssetBundle
+from game.engine.world import WorldConfig
+from game.engine.level import Track
+
+# JSON-lines logs, written by a native thread so the game loop never blocks on stdout
+log_handler, log_listener = configure_logging(
+    getattr(logging, os.environ.get('LOG_LEVEL', 'INFO').upper(), logging.INFO))
+log = logging.getLogger(__name__)
 
 # Create Flask app
 app = Flask(__name__)
@@ -17,83 +41,303 @@ app.config['CORS_HEADERS'] = 'Content-Type'
 # Enable CORS
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+# Fingerprinted, precompressed copies of the static files, from python -m game.services.assets;
+# without a build the page links the plain files under /static
+assets = AssetBundle(os.environ.get('ASSET_DIR', os.path.join(app.static_folder, 'dist')))
+
+# WS_COMPRESSION=auto deflates messages of at least WS_COMPRESSION_MIN_BYTES, which
+# takes in layouts and state updates, and sends small ones like game events and pings
+# uncompressed; 'always' and 'off' apply to every message. Polling uses the same threshold
+compression = CompressionPolicy(os.environ.get('WS_COMPRESSION', 'auto'),
+                                int(os.environ.get('WS_COMPRESSION_MIN_BYTES', 512)),
+                                int(os.environ.get('WS_COMPRESSION_LEVEL', 1)))
+
 # Configure SocketIO with CORS settings
 socketio = SocketIO(
     app,
     async_mode='eventlet',
     cors_allowed_origins="*",
     logger=False,
-    engineio_logger=False
+    engineio_logger=False,
+    http_compression=compression.mode != 'off',
+    compression_threshold=0 if compression.mode == 'always' else compression.min_size
 )
+compression.install(socketio.server.eio)
 
-# Frame rate management
-FRAME_RATE = 60
+# Frame rate management; swept collisions keep low tick rates from tunnelling
+FRAME_RATE = max(int(os.environ.get('TICK_RATE', 60)), int(1 / MAX_TICK_DT))
 FRAME_TIME = 1.0 / FRAME_RATE
 last_update = time.time()
+tick_number = 0  # Game loop iterations since startup, stamped on log records
+IDLE_FRAMES = max(1, FRAME_RATE // IDLE_TICK_RATE)  # Frames between steps of an idle room
+LEADERBOARD_FLUSH_INTERVAL = 2.0  # Seconds between batched leaderboard writes
+SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH', 'rooms.snapshot')
+WORLD = WorldConfig(float(os.environ.get('WORLD_WIDTH', 800)),
+                    float(os.environ.get('WORLD_HEIGHT', 600)),
+                    wind=float(os.environ.get('WIND', 0)))  # Prevailing wind speed; 0 turns wind off
+BOT_COUNT = int(os.environ.get('BOT_COUNT', 0))  # Computer opponents per room
+
+def search_flow_fields(search, install):
+    """Run a level's bot flow field search on a native thread and install it when done."""
+    def run():
+        try:
+            install(tpool.execute(search))
+        except Exception:
+            log.exception('flow field search failed')
+    eventlet.spawn(run)
+
+# Large levels take seconds to search; the game loop keeps ticking meanwhile
+Track.run_flow_search = staticmethod(search_flow_fields)
+
+# Game events (checkpoints, pickups, game over) queued during a tick and flushed after it
+events = EventBus()
+
+# One room per client session; rooms from the last shutdown are restored on reconnect
+rooms = RoomManager(SnapshotStore(SNAPSHOT_PATH), WORLD, BOT_COUNT, events)
+if len(rooms.snapshots):
+    log.info('loaded room snapshots', extra={'fields': {'rooms': len(rooms.snapshots), 'path': SNAPSHOT_PATH}})
+
+def report_verification(result):
+    """Log runs whose replayed score diverges from the submitted one."""
+    if not result['valid']:
+        log.warning('flagged run', extra={'fields': {
+            'run_id': result['run_id'], 'reason': result['reason'],
+            'claimed_score': result['claimed_score'], 'replayed_score': result['replayed_score']}})
+
+# Tick timings and GC pauses, served at /metrics
+metrics = Metrics()
+
+# GC_MODE=tuned freezes startup objects and raises thresholds; GC_IDLE_COLLECT=1
+# also runs due collections in the idle time at the end of a tick
+gc_tuner = GCTuner(metrics, os.environ.get('GC_MODE', 'default'),
+                   idle_collect=os.environ.get('GC_IDLE_COLLECT') == '1')
+
+# Rooms are ticked in TICK_BUCKETS phase-offset groups spread over each frame, each
+# stepped with its own BatchSimulation, so socket I/O runs between the bursts
+scheduler = TickScheduler(max(1, int(os.environ.get('TICK_BUCKETS', 4))), FRAME_TIME,
+                          BatchSimulation, sleep=eventlet.sleep)
+
+# Replays finished runs in worker processes to audit their scores. Workers use the
+# platform default start method: under spawn/forkserver each would re-import this
+# module and its web stack, which headless entry points avoid with game.worker.pool_context()
+verifier = VerificationService(batch_size=8, on_result=report_verification)
+
+# High scores survive restarts; writes are batched by leaderboard_writer
+leaderboard = Leaderboard(os.environ.get('LEADERBOARD_DB', 'leaderboard.db'))
+
+def finish_run(room):
+    """Record a finished run on the leaderboard and queue it for verification."""
+    if room.finished:
+        return
+    room.finished = True
+    state = room.state
+    leaderboard.submit('anonymous', state.score, state.level)
+    if state.recorder is not None:
+        verifier.submit(state.recorder.to_log(state.score, state.level, run_id=str(state.seed)))
+
+@game_event('game_over', events)
+def on_game_over(token, event):
+    """Hand runs that ran out of time to the leaderboard and verifier."""
+    room = rooms.rooms.get(token)
+    if room is not None:
+        finish_run(room)
+
+@game_event(ALL_EVENTS, events)
+def count_event(token, event):
+    metrics.increment('events.' + event['type'])
 
-# Create game state
-game_state = GameState()
+@game_event(ALL_EVENTS, events)
+def log_event(token, event):
+    """Structured log line per event; coin pickups are sampled by the log filter."""
+    log.info(event['type'], extra={'room': token, 'tick': tick_number, 'fields': event})
+
+@game_event(ALL_EVENTS, events)
+def forward_event(token, event):
+    """Pass events on to the room's clients for sounds and notifications."""
+    socketio.emit('game_events', event, namespace='/', to=token)
+
+@app.context_processor
+def asset_urls():
+    def asset_url(name):
+        return assets.url(name, '/assets', url_for('static', filename=name))
+    return {'asset_url': asset_url}
+
+@app.route('/assets/<path:filename>')
+def hashed_asset(filename):
+    """Serve a built asset with immutable caching, precompressed where the client accepts it."""
+    response = assets.response(request, app.response_class, filename)
+    if response is None:
+        abort(404)
+    return response
 
 @app.route('/')
 def index():
     """Render game interface."""
     return render_template('index.html')
+
+@app.route('/leaderboard')
+def get_leaderboard():
+    """Return the top scores from the in-memory leaderboard cache."""
+    limit = max(0, min(request.args.get('limit', 10, type=int), leaderboard.cache_size))
+    return jsonify(leaderboard.top(limit))
+
+@app.route('/metrics')
+def get_metrics():
+    """Return tick, GC pause, bucket and compression statistics."""
+    metrics.set_gauge('log.dropped', log_handler.dropped)
+    data = metrics.snapshot()
+    data['buckets'] = scheduler.report()
+    data['compression'] = compression.report()
+    return jsonify(data)
     
 @socketio.on('connect')
-def handle_connect():
+def handle_connect(auth=None):
     """Handle new client connection."""
+    token = auth.get('token') if isinstance(auth, dict) else None
     with app.app_context():
-        emit('game_state', game_state.get_client_data())
+        room = rooms.join(token, request.sid)
+        join_room(room.token)
+        emit('session', {'token': room.token})
+        emit('game_state', room.state.get_client_data())
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    """Handle client disconnection."""
+    rooms.leave(request.sid)
     
 @socketio.on('input')
 def handle_input(data):
     """Handle client input events."""
+    room = rooms.room_for(request.sid)
+    if room is None:
+        return
     with app.app_context():
-        game_state.handle_event(data)
+        room.catch_up(FRAME_TIME)  # Wakes an idle room before the input takes effect
+        room.state.handle_event(data)
 
 @socketio.on('new_game')
 def handle_new_game():
     """Handle new game request."""
-    global game_state
+    room = rooms.room_for(request.sid)
+    if room is None:
+        return
     with app.app_context():
-        game_state = GameState()  # Create a fresh game state
-        emit('game_state', game_state.get_client_data())
+        finish_run(room)
+        room.reset()  # Create a fresh game state
+        emit('game_state', room.state.get_client_data(), to=room.token)
+        room.sent_layout = room.state.layout_version
+        room.sent_wind = room.state.wind.client_version if room.state.wind else None
     
 def game_loop():
     """Main game loop."""
-    global last_update
+    global last_update, tick_number
     
     while True:
         try:
             current_time = time.time()
-            dt = current_time - last_update
-            last_update = current_time
+            # Step in whole frames so dt repeats exactly and per-dt factors stay cached;
+            # the leftover fraction of a frame carries over to the next tick
+            frames = math.floor((current_time - last_update) / FRAME_TIME)
+            if frames <= 0:
+                # Woke before a whole frame was due; never let simulated time run ahead
+                if last_update > current_time:
+                    last_update = current_time
+                eventlet.sleep(last_update + FRAME_TIME - current_time)
+                continue
+            tick_number += 1
+            gc_tuner.take_pause_time()  # Pauses during the sleep belong to no tick
+            dt = frames * FRAME_TIME
+            last_update += dt
+            if dt > MAX_TICK_DT:
+                dt = MAX_TICK_DT  # Keep stalls replayable
+                last_update = current_time
             
-            # Update game state within app context
-            with app.app_context():
-                game_state.update(dt)
-                state_data = game_state.get_client_data()
+            # Rooms without clients or past game over are not stepped or broadcast at all
+            active, idle = rooms.schedule(frames, IDLE_FRAMES)
+            
+            def step(batch, active, idle):
+                # Idle rooms come and go from the step list, so they are stepped one
+                # by one to keep the bucket's batch layout stable
+                batch.step([room.state for room in active], dt)
+                for room, room_frames in idle:
+                    room.state.update(min(room_frames * FRAME_TIME, MAX_TICK_DT))
+                events.flush()  # Once per bucket, after its rooms have moved
             
-            # Broadcast state to all clients
-            socketio.emit('game_state', state_data, namespace='/')
+            # Update game state within app context; buckets are spread over the frame
+            with app.app_context():
+                busy = scheduler.run_frame(current_time, active, idle, step, broadcast)
             
             # Maintain frame rate
             elapsed = time.time() - current_time
+            gc_pause = gc_tuner.take_pause_time()
+            metrics.observe('tick.duration', busy)
+            metrics.observe('tick.gc_pause', gc_pause)
+            for activity, count in rooms.activity_counts.items():
+                metrics.set_gauge('rooms.' + activity, count)
+            if tick_number % FRAME_RATE == 0:
+                rooms.hibernate()
+                rooms.expire()
+            if elapsed > FRAME_TIME:
+                metrics.increment('tick.overruns')
+                if gc_pause:
+                    metrics.increment('tick.overruns_with_gc')
+            elif gc_tuner.collect_in_slack(FRAME_TIME - elapsed):
+                elapsed = time.time() - current_time
             sleep_time = max(0, FRAME_TIME - elapsed)
             eventlet.sleep(sleep_time)
             
-        except Exception as e:
-            print(f"Error in game loop: {e}")
+        except Exception:
+            log.exception('game loop error', extra={'tick': tick_number})
             eventlet.sleep(1)  # Sleep for a second before retrying
+
+def broadcast(stepped_rooms):
+    """Send each room's state to its clients."""
+    for room in stepped_rooms:
+        # The obstacle layout only goes out when it changes, and the wind field every few
+        # steps of it; joining clients get both on connect
+        layout = room.state.layout_version
+        wind = room.state.wind.client_version if room.state.wind else None
+        state_data = room.state.get_client_data(include_layout=layout != room.sent_layout,
+                                                include_wind=wind != room.sent_wind)
+        room.sent_layout = layout
+        room.sent_wind = wind
+        state_data['sent_at'] = time.time()  # Lets same-host load tests measure delivery latency
+        
+        # Broadcast state to the room's clients
+        socketio.emit('game_state', state_data, namespace='/', to=room.token)
+
+def leaderboard_writer():
+    """Flush queued leaderboard writes on a native thread, off the game loop."""
+    while True:
+        eventlet.sleep(LEADERBOARD_FLUSH_INTERVAL)
+        try:
+            tpool.execute(leaderboard.flush)
+        except Exception:
+            log.exception('leaderboard write failed')
         
 def create_app():
     """Create and configure the application."""
     return app
 
+def shutdown():
+    """Snapshot in-progress rooms and flush background services."""
+    count = rooms.dump(SNAPSHOT_PATH)
+    log.info('saved room snapshots', extra={'fields': {'rooms': count, 'path': SNAPSHOT_PATH}})
+    verifier.shutdown(wait=False)
+    leaderboard.close()
+    log_listener.stop()  # Writes out whatever is still queued
+
+def handle_sigterm(signum, frame):
+    """Treat SIGTERM from deploy tooling like Ctrl+C so rooms get snapshotted."""
+    sys.exit(0)
+
 if __name__ == '__main__':
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    gc_tuner.install()  # After startup, so restored rooms and caches get frozen too
     try:
         # Start game loop in background
         eventlet.spawn(game_loop)
+        eventlet.spawn(leaderboard_writer)
         
         # Start Flask-SocketIO server
         socketio.run(app,
@@ -102,6 +346,8 @@ if __name__ == '__main__':
                     debug=True,
                     use_reloader=False)  # Disable reloader to avoid duplicate game loops
     except KeyboardInterrupt:
-        print("\nShutting down gracefully...")
-    except Exception as e:
-        print(f"Error starting server: {e}")
\ No newline at end of file
+        log.info('shutting down')
+    except Exception:
+        log.exception('server failed')
+    finally:
+        shutdown()
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""Benchmark per-object versus batched room stepping.
+
+Usage: python -m benchmarks.bench_batch [rooms] [ticks]
+
+Batched runs are then repeated with and without the buggy heading and surface
+damping caches, which recompute sin/cos and damping ** dt on every call, to
+show what the caches save in the gather phase.
+"""
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from game.core.batch import BatchSimulation
+from game.core.game_state import GameState
+from game.engine.physics import PhysicsEngine
+from game.entities.player import BeachBuggy
+
+KEYS = ['ArrowUp', 'ArrowDown', 'ArrowLeft', 'ArrowRight']
+DT = 1.0 / 60
+ROUNDS = 3
+
+class UncachedBuggy(BeachBuggy):
+    """BeachBuggy taking sin and cos of its rotation on every call."""
+    def heading(self):
+        rad = math.radians(self.rotation)
+        return math.sin(rad), math.cos(rad)
+
+class UncachedPhysics(PhysicsEngine):
+    """PhysicsEngine raising the surface damping to dt on every call."""
+    def damping(self, surface_type: str, dt: float) -> float:
+        return self.surface_damping[surface_type] ** dt
+
+def make_rooms(count: int, cached: bool = True):
+    """Rooms with the accelerator held and steering changing now and then."""
+    states = []
+    for seed in range(count):
+        state = GameState(seed=seed)
+        if not cached:
+            state.player.__class__ = UncachedBuggy
+            state.physics.__class__ = UncachedPhysics
+        state.time_left = 1e9  # Keep every room running for the whole benchmark
+        state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+        states.append(state)
+    return states
+
+def steer(states, inputs: random.Random) -> None:
+    for state in states:
+        if inputs.random() < 0.05:
+            key = inputs.choice(KEYS[2:])
+            kind = 'keydown' if key not in state.keys_pressed else 'keyup'
+            state.handle_event({'type': kind, 'key': key})
+
+class PhaseTimedBatch(BatchSimulation):
+    """BatchSimulation that accumulates wall time per step phase."""
+    PHASES = ('_sync_layout', '_gather_players', '_integrate_players',
+              '_update_entities', '_collide', '_scatter')
+    
+    def __init__(self):
+        super().__init__()
+        self.phase_times = defaultdict(float)
+        for name in self.PHASES:
+            setattr(self, name, self._timed(name, getattr(self, name)))
+            
+    def _timed(self, name, method):
+        def timed(*args):
+            start = time.perf_counter()
+            method(*args)
+            self.phase_times[name] += time.perf_counter() - start
+        return timed
+
+def run(states, ticks: int, step) -> float:
+    """Return seconds per tick for all rooms."""
+    inputs = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        steer(states, inputs)
+        step(states)
+    return (time.perf_counter() - start) / ticks
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    
+    def per_object(states):
+        for state in states:
+            state.update(DT)
+            
+    batch = PhaseTimedBatch()
+    def batched(states):
+        batch.step(states, DT)
+        
+    print(f"rooms: {count}, ticks: {ticks}")
+    for name, step in (('per-object', per_object), ('batched', batched)):
+        tick_time = run(make_rooms(count), ticks, step)
+        rooms_per_core = count * DT / tick_time
+        print(f"{name:>10}: {tick_time * 1000:7.2f} ms/tick, {rooms_per_core:7.0f} rooms/core at 60 Hz")
+        
+    for name in PhaseTimedBatch.PHASES:
+        print(f"{name.strip('_'):>18}: {batch.phase_times[name] / ticks * 1000:6.3f} ms/tick")
+        
+    # Heading and damping are read in _gather_players; alternate runs with and
+    # without their caches so drift on a busy machine hits both alike
+    best = {True: float('inf'), False: float('inf')}
+    for _ in range(ROUNDS):
+        for cached in (True, False):
+            batch.phase_times.clear()
+            run(make_rooms(count, cached), ticks, batched)
+            best[cached] = min(best[cached], batch.phase_times['_gather_players'] / ticks)
+    print(f"gather_players, best of {ROUNDS}: {best[True] * 1000:6.3f} ms/tick cached, "
+          f"{best[False] * 1000:6.3f} ms/tick uncached ({1 - best[True] / best[False]:.0%} saved)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark bot steering cost per tick and flow field build time per level.
+
+Usage: python -m benchmarks.bench_bots [rooms] [bots_per_room] [ticks]
+"""
+import contextlib
+import os
+import sys
+import time
+from game.core.batch import BatchSimulation
+from game.core.game_state import GameState
+from game.engine.world import WorldConfig
+
+DT = 1.0 / 60
+
+def make_rooms(count: int, bots: int):
+    states = []
+    for seed in range(count):
+        state = GameState(seed=seed, bots=bots)
+        state.time_left = 1e9
+        state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+        states.append(state)
+    return states
+
+def tick_time(count: int, bots: int, ticks: int) -> float:
+    """Seconds per batched tick for all rooms; flow fields are built during level setup."""
+    states = make_rooms(count, bots)
+    batch = BatchSimulation()
+    for _ in range(60):
+        batch.step(states, DT)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        batch.step(states, DT)
+    return (time.perf_counter() - start) / ticks
+
+def field_build_time(world: WorldConfig) -> float:
+    """Seconds to build the flow fields for every checkpoint of a level."""
+    state = GameState(seed=1, world=world)
+    start = time.perf_counter()
+    state.track.build_flow_fields(lambda: None)
+    return time.perf_counter() - start
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    bots = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    ticks = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+    
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        without = tick_time(count, 0, ticks)
+        with_bots = tick_time(count, bots, ticks)
+        builds = [(world, field_build_time(world))
+                  for world in (WorldConfig(), WorldConfig(3000, 3000))]
+        
+    per_bot = (with_bots - without) / (count * bots)
+    print(f"rooms: {count}, bots/room: {bots}, ticks: {ticks}")
+    print(f"  no bots: {without * 1000:7.2f} ms/tick")
+    print(f"with bots: {with_bots * 1000:7.2f} ms/tick ({per_bot * 1e6:.2f} us per bot per tick)")
+    for world, seconds in builds:
+        print(f"flow fields for a {world.width:.0f}x{world.height:.0f} level: {seconds * 1000:7.1f} ms")
+
+if __name__ == '__main__':
+    main()
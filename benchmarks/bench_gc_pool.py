@@ -0,0 +1,92 @@
+"""Measure GC pauses and tick latency under level churn, with and without object pools.
+
+Usage: python -m benchmarks.bench_gc_pool [rooms] [ticks] [regenerations_per_tick]
+
+Every tick steps all rooms and builds their client payloads, and a few rooms
+regenerate their level as they would in a high-churn mode. Pause times come from
+gc.callbacks; the unpooled run sets every pool's max_size to 0 so nothing is recycled.
+"""
+import contextlib
+import gc
+import os
+import random
+import sys
+import time
+from game.core.game_state import GameState
+
+DT = 1.0 / 60
+
+class GCPauses:
+    """Collects the duration of each collection reported through gc.callbacks."""
+    def __init__(self):
+        self.pauses = {0: [], 1: [], 2: []}
+        self._start = 0.0
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        else:
+            self.pauses[info['generation']].append(time.perf_counter() - self._start)
+
+    def __enter__(self):
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self)
+
+def make_rooms(count: int, pooled: bool):
+    states = []
+    for seed in range(count):
+        state = GameState(seed=seed)
+        state.time_left = 1e9
+        state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+        if not pooled:
+            track = state.track
+            for pool in list(track.obstacle_pools.values()) + list(track.collectible_pools.values()):
+                pool.max_size = 0
+        states.append(state)
+    return states
+
+def run(count: int, ticks: int, churn: int, pooled: bool):
+    picks = random.Random(0)
+    tick_times = []
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        states = make_rooms(count, pooled)
+        gc.collect()
+        with GCPauses() as pauses:
+            for _ in range(ticks):
+                start = time.perf_counter()
+                for state in states:
+                    state.update(DT)
+                    state.get_client_data()
+                for _ in range(churn):
+                    state = states[picks.randrange(count)]
+                    state.level = state.level % 8 + 1
+                    state._setup_level()
+                tick_times.append(time.perf_counter() - start)
+    pools = [pool for state in states for pool in state.track.collectible_pools.values()]
+    reused = sum(pool.reused for pool in pools)
+    return tick_times, pauses.pauses, (reused, reused + sum(pool.created for pool in pools))
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    churn = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    print(f"rooms: {count}, ticks: {ticks}, regenerations/tick: {churn}")
+    for name, pooled in (('unpooled', False), ('pooled', True)):
+        tick_times, pauses, (reused, acquired) = run(count, ticks, churn, pooled)
+        tick_times.sort()
+        p99 = tick_times[int(len(tick_times) * 0.99)]
+        mean = sum(tick_times) / len(tick_times)
+        print(f"{name:>9}: tick mean {mean * 1000:6.2f} ms, p99 {p99 * 1000:6.2f} ms, "
+              f"max {tick_times[-1] * 1000:6.2f} ms, {reused}/{acquired} collectibles reused")
+        for generation, durations in pauses.items():
+            total = sum(durations)
+            worst = max(durations, default=0.0)
+            print(f"{'':>11}gen{generation}: {len(durations):5d} collections, "
+                  f"total {total * 1000:7.2f} ms, max {worst * 1000:6.3f} ms")
+
+if __name__ == '__main__':
+    main()
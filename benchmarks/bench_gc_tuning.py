@@ -0,0 +1,79 @@
+"""Compare tick latency and GC pauses under the GC tuning modes.
+
+Usage: python -m benchmarks.bench_gc_tuning [rooms] [ticks]
+
+Mirrors game_loop: a batched step, client payloads for every room and a
+level regeneration now and then, against a 60 Hz budget. Instead of sleeping,
+the idle slack of each tick is only offered to the tuner.
+"""
+import contextlib
+import gc
+import os
+import random
+import sys
+import time
+from game.core.batch import BatchSimulation
+from game.core.game_state import GameState
+from game.services.gc_tuning import GCTuner
+from game.services.metrics import Metrics
+
+FRAME_TIME = 1.0 / 60
+MODES = (('default', 'default', False), ('tuned', 'tuned', False), ('tuned+idle', 'tuned', True))
+
+def run(count: int, ticks: int, mode: str, idle_collect: bool) -> Metrics:
+    metrics = Metrics(window=ticks)
+    tuner = GCTuner(metrics, mode, idle_collect=idle_collect)
+    picks = random.Random(0)
+    batch = BatchSimulation()
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        states = [GameState(seed=seed) for seed in range(count)]
+        for state in states:
+            state.time_left = 1e9
+            state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+        tuner.install()
+        try:
+            for tick in range(ticks):
+                tuner.take_pause_time()
+                start = time.perf_counter()
+                batch.step(states, FRAME_TIME)
+                for state in states:
+                    state.get_client_data()
+                if tick % 10 == 0:
+                    state = states[picks.randrange(count)]
+                    state.level = state.level % 8 + 1
+                    state._setup_level()
+                elapsed = time.perf_counter() - start
+                metrics.observe('tick.duration', elapsed)
+                if elapsed > FRAME_TIME:
+                    metrics.increment('tick.overruns')
+                    if tuner.take_pause_time():
+                        metrics.increment('tick.overruns_with_gc')
+                else:
+                    tuner.collect_in_slack(FRAME_TIME - elapsed)
+        finally:
+            tuner.uninstall()
+    gc.collect()
+    return metrics
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 1200
+
+    print(f"rooms: {count}, ticks: {ticks}")
+    for name, mode, idle_collect in MODES:
+        report = run(count, ticks, mode, idle_collect).snapshot()
+        tick = report['timings']['tick.duration']
+        counters = report['counters']
+        print(f"{name:>10}: tick p50 {tick['p50_ms']:6.2f} ms, p99 {tick['p99_ms']:6.2f} ms, "
+              f"max {tick['max_ms']:6.2f} ms, overruns {counters.get('tick.overruns', 0)} "
+              f"({counters.get('tick.overruns_with_gc', 0)} with GC)")
+        for generation in range(3):
+            pauses = report['timings'].get(f'gc.pause.gen{generation}')
+            if pauses:
+                print(f"{'':>12}gen{generation}: {pauses['count']:5d} pauses, "
+                      f"total {pauses['total_ms']:7.2f} ms, max {pauses['max_ms']:6.3f} ms")
+        print(f"{'':>12}collections in slack: {counters.get('gc.collections.slack', 0)}, "
+              f"automatic: {counters.get('gc.collections.automatic', 0)}")
+
+if __name__ == '__main__':
+    main()
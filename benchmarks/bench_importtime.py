@@ -0,0 +1,64 @@
+"""Measure cold-start import cost of game modules and worker pool start-up.
+
+Usage: python -m benchmarks.bench_importtime [repeats]
+
+Each module is imported in a fresh interpreter under `python -X importtime`;
+the best of several runs is reported with the number of modules loaded and
+whether numpy or the web stack came along. Pool start-up is the time from
+creating a verification pool to its first (empty) batch result.
+"""
+import multiprocessing
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from game.services.verification import verify_batch
+from game.worker import pool_context
+
+MODULES = ['game.engine.level', 'game.core.game_state', 'game.core.snapshot',
+           'game.services.verification', 'game.worker', 'game.core.batch', 'app']
+HEAVY = ['numpy', 'flask', 'flask_socketio', 'eventlet']
+
+def import_profile(module: str):
+    """Return (cumulative microseconds, modules loaded, heavy packages loaded) for one import."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True)
+    total = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            total = int(cumulative)
+    heavy = [package for package in HEAVY if package in loaded]
+    return total, len(loaded), heavy
+
+def pool_startup(context) -> float:
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        executor.submit(verify_batch, []).result()
+    return time.perf_counter() - start
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    
+    print(f"import cost, best of {repeats}:")
+    for module in MODULES:
+        runs = [import_profile(module) for _ in range(repeats)]
+        total, count, heavy = min(runs)
+        print(f"{module:>28}: {total / 1000:7.1f} ms, {count:4d} modules, "
+              f"loads {', '.join(heavy) or 'nothing heavy'}")
+        
+    print("pool start-up to first result:")
+    contexts = [('fork', multiprocessing.get_context('fork')),
+                ('spawn', multiprocessing.get_context('spawn')),
+                ('game.worker', pool_context())]
+    for name, context in contexts:
+        best = min(pool_startup(context) for _ in range(repeats))
+        print(f"{name:>28}: {best * 1000:7.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Compare the caller-side cost of print() and the queued JSON logger on a slow stdout.
+
+Usage: python -m benchmarks.bench_logging [messages] [write_delay_ms]
+
+The sink sleeps on every write, standing in for a terminal or log pipe that
+is not draining fast enough. print() pays that delay on the calling greenlet;
+the structured logger only queues the record and a native thread pays it.
+"""
+import io
+import logging
+import sys
+import time
+from game.services.structured_log import configure_logging, RoomLogFilter
+
+class SlowStream(io.StringIO):
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return super().write(text)
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.2
+
+    stream = SlowStream(delay)
+    start = time.perf_counter()
+    for tick in range(count):
+        print(f"Checkpoint {tick % 8} reached! Score: {tick * 50}", file=stream)
+    printed = time.perf_counter() - start
+
+    stream = SlowStream(delay)
+    # No thinning, so both sides emit the same number of lines
+    handler, listener = configure_logging(stream=stream,
+                                          log_filter=RoomLogFilter(rate=1e9, burst=count, sample_every={}))
+    log = logging.getLogger('bench')
+    start = time.perf_counter()
+    for tick in range(count):
+        log.info('checkpoint_reached', extra={'room': 'bench', 'tick': tick,
+                                              'fields': {'checkpoint': tick % 8, 'score': tick * 50}})
+    queued = time.perf_counter() - start
+    listener.stop()
+    drained = time.perf_counter() - start
+
+    print(f"messages: {count}, write delay: {delay * 1000:.2f} ms")
+    print(f"   print(): {printed / count * 1e6:8.1f} us per message on the caller")
+    print(f"structured: {queued / count * 1e6:8.1f} us per message on the caller "
+          f"({drained:.2f} s until the writer caught up, {handler.dropped} dropped)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Measure game-loop cost when most open rooms have nobody playing.
+
+Usage: python -m benchmarks.bench_room_activity [rooms] [playing_percent] [ticks]
+
+Of the open rooms, playing_percent hold a key down; half the rest sit idle with
+a client connected and the other half have no client. 'every room' steps and
+serializes all of them each tick as the loop used to; 'scheduled' uses
+RoomManager.schedule(), which skips empty rooms and steps idle ones at
+IDLE_TICK_RATE.
+"""
+import sys
+import time
+from game.core.batch import BatchSimulation
+from game.services.rooms import RoomManager, IDLE_TICK_RATE
+
+FRAME_RATE = 60
+FRAME_TIME = 1.0 / FRAME_RATE
+IDLE_FRAMES = FRAME_RATE // IDLE_TICK_RATE
+
+def make_rooms(count: int, playing: int) -> RoomManager:
+    manager = RoomManager()
+    for index in range(count):
+        room = manager.join(f'{index:032x}', f'sid{index}')
+        room.state.time_left = 1e9
+        if index < playing:
+            room.state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+        elif index % 2:
+            manager.leave(f'sid{index}')
+    return manager
+
+def run(manager: RoomManager, ticks: int, scheduled: bool) -> float:
+    batch = BatchSimulation()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if scheduled:
+            active, idle = manager.schedule(1, IDLE_FRAMES)
+            batch.step([room.state for room in active], FRAME_TIME)
+            for room, frames in idle:
+                room.state.update(frames * FRAME_TIME)
+            stepped = active + [room for room, _ in idle]
+        else:
+            stepped = list(manager.rooms.values())
+            batch.step([room.state for room in stepped], FRAME_TIME)
+        for room in stepped:
+            room.state.get_client_data(include_layout=False)
+    return (time.perf_counter() - start) / ticks
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    playing_percent = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    ticks = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+    playing = int(count * playing_percent / 100)
+
+    print(f"rooms: {count}, playing: {playing}, ticks: {ticks}")
+    for name, scheduled in (('every room', False), ('scheduled', True)):
+        manager = make_rooms(count, playing)
+        per_tick = run(manager, ticks, scheduled)
+        print(f"{name:>10}: {per_tick * 1000:7.2f} ms per tick")
+    print(f"{'':>12}activity: {manager.activity_counts}")
+
+if __name__ == '__main__':
+    main()
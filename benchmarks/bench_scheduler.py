@@ -0,0 +1,77 @@
+"""Measure how long the eventlet hub is starved while rooms tick, with and without buckets.
+
+Usage: python -m benchmarks.bench_scheduler [rooms] [frames] [buckets]
+
+A probe greenlet asks to wake every millisecond, standing in for socket
+reads and writes; its lateness is how long I/O would wait on the game loop.
+One bucket steps every room back to back as the old loop did.
+"""
+import eventlet
+eventlet.monkey_patch()
+
+import sys
+import time
+from game.core.batch import BatchSimulation
+from game.services.rooms import RoomManager
+from game.services.scheduler import TickScheduler
+
+FRAME_TIME = 1.0 / 60
+PROBE_INTERVAL = 0.001
+
+def make_rooms(count: int) -> RoomManager:
+    manager = RoomManager()
+    for index in range(count):
+        room = manager.join(f'{index * 2654435761 % 2**32:08x}{index:024x}', f'sid{index}')
+        room.state.time_left = 1e9
+        room.state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+    return manager
+
+def probe(lateness, running):
+    while running:
+        expected = time.perf_counter() + PROBE_INTERVAL
+        eventlet.sleep(PROBE_INTERVAL)
+        lateness.append(time.perf_counter() - expected)
+
+def run(count: int, frames: int, buckets: int):
+    manager = make_rooms(count)
+    scheduler = TickScheduler(buckets, FRAME_TIME, BatchSimulation, sleep=eventlet.sleep,
+                              clock=time.perf_counter)
+
+    def step(batch, active, idle):
+        batch.step([room.state for room in active], FRAME_TIME)
+
+    def broadcast(rooms):
+        for room in rooms:
+            room.state.get_client_data(include_layout=False)
+
+    lateness = []
+    running = [True]
+    prober = eventlet.spawn(probe, lateness, running)
+    next_frame = time.perf_counter()
+    for _ in range(frames):
+        active, idle = manager.schedule(1, 6)
+        scheduler.run_frame(time.perf_counter(), active, idle, step, broadcast)
+        next_frame += FRAME_TIME
+        eventlet.sleep(max(0.0, next_frame - time.perf_counter()))
+    running.clear()
+    prober.wait()
+    return sorted(lateness), scheduler.report()
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    buckets = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    print(f"rooms: {count}, frames: {frames}")
+    for bucket_count in (1, buckets):
+        lateness, report = run(count, frames, bucket_count)
+        p99 = lateness[int(len(lateness) * 0.99)]
+        print(f"{bucket_count} bucket(s): probe lateness p99 {p99 * 1000:6.2f} ms, "
+              f"max {lateness[-1] * 1000:6.2f} ms")
+        for bucket in report:
+            print(f"{'':>12}bucket {bucket['bucket']}: {bucket['rooms']:4d} rooms, "
+                  f"utilization {bucket['utilization']:5.2f}, overruns {bucket['overruns']}, "
+                  f"skipped broadcasts {bucket['skipped_broadcasts']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark room snapshot and restore time.
+
+Usage: python -m benchmarks.bench_snapshot [rooms] [ticks]
+"""
+import os
+import sys
+import tempfile
+import time
+from game.core.game_state import GameState
+from game.core.snapshot import SnapshotStore, encode_state, write_snapshots
+
+DT = 1.0 / 60
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    
+    rooms = {}
+    for seed in range(count):
+        state = GameState(seed=seed, record=True)
+        state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+        for _ in range(ticks):
+            state.update(DT)
+        rooms[f'{seed:032x}'] = state
+        
+    path = os.path.join(tempfile.mkdtemp(), 'rooms.snapshot')
+    
+    start = time.perf_counter()
+    blobs = {token: encode_state(state) for token, state in rooms.items()}
+    encoded = time.perf_counter()
+    size = write_snapshots(path, blobs)
+    written = time.perf_counter()
+    
+    store = SnapshotStore(path)
+    opened = time.perf_counter()
+    for token in rooms:
+        store.pop(token)
+    restored = time.perf_counter()
+    store.close()
+    os.remove(path)
+    
+    per_thousand = 1000.0 / count
+    print(f"rooms: {count} ({ticks} recorded ticks each), file size: {size / 1024:.0f} KiB")
+    print(f"snapshot: {(written - start) * per_thousand * 1000:.1f} ms per 1000 rooms "
+          f"(encode {(encoded - start) * per_thousand * 1000:.1f}, write {(written - encoded) * per_thousand * 1000:.1f})")
+    print(f"open index: {(opened - written) * 1000:.2f} ms")
+    print(f"restore: {(restored - opened) * per_thousand * 1000:.1f} ms per 1000 rooms")
+
+if __name__ == '__main__':
+    main()
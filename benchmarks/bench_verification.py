@@ -0,0 +1,48 @@
+"""Benchmark replay verification throughput.
+
+Usage: python -m benchmarks.bench_verification [runs] [ticks] [workers]
+"""
+import random
+import sys
+from game.core.game_state import GameState
+from game.services.verification import VerificationService
+
+KEYS = ['ArrowUp', 'ArrowDown', 'ArrowLeft', 'ArrowRight']
+DT = 1.0 / 60
+
+def record_run(seed: int, ticks: int) -> dict:
+    """Play a run with random inputs and return its run log."""
+    inputs = random.Random(seed)
+    state = GameState(seed=seed, record=True)
+    for _ in range(ticks):
+        if inputs.random() < 0.1:
+            key = inputs.choice(KEYS)
+            kind = 'keydown' if key not in state.keys_pressed else 'keyup'
+            state.handle_event({'type': kind, 'key': key})
+        state.update(DT)
+        if state.game_over:
+            break
+    return state.recorder.to_log(state.score, state.level, run_id=str(seed))
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 1800
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    
+    run_logs = [record_run(seed, ticks) for seed in range(runs)]
+    # Tamper with every eighth run so the flagging path is exercised
+    for run_log in run_logs[::8]:
+        run_log['score'] += 100
+        
+    service = VerificationService(max_workers=workers)
+    report = service.verify(run_logs)
+    service.shutdown()
+    
+    print(f"runs: {report['runs']} ({ticks} ticks each), workers: {report['workers']}")
+    print(f"flagged: {report['flagged']} (expected {len(run_logs[::8])})")
+    print(f"elapsed: {report['elapsed']:.2f}s")
+    print(f"runs/s: {report['runs_per_second']:.1f}")
+    print(f"runs/s/core: {report['runs_per_second_per_core']:.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Measure what the wind field adds to a game-loop tick.
+
+Usage: python -m benchmarks.bench_wind [rooms] [ticks] [bots]
+
+Steps the same rooms through BatchSimulation with and without wind, then
+times the field's parts on their own: one scalar sample() per kite, a
+vectorized sample_many() for a squad of bots, an evolution step (taken once
+every WIND_STEP of simulated time) for one field and for a stack of fields
+due together, and the downsampled field sent to clients.
+"""
+import sys
+import time
+import numpy as np
+from game.core.batch import BatchSimulation
+from game.core.game_state import GameState
+from game.engine.wind import WindField, WIND_STEP
+from game.engine.world import WorldConfig
+
+FRAME_TIME = 1.0 / 60
+WIND = 80.0
+
+def make_rooms(count: int, wind: float, bots: int):
+    states = []
+    for seed in range(count):
+        state = GameState(seed=seed, world=WorldConfig(wind=wind), bots=bots)
+        state.time_left = 1e9
+        state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+        states.append(state)
+    return states
+
+def per_tick(count: int, ticks: int, wind: float, bots: int) -> float:
+    states = make_rooms(count, wind, bots)
+    batch = BatchSimulation()
+    batch.step(states, FRAME_TIME)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        batch.step(states, FRAME_TIME)
+    return (time.perf_counter() - start) / ticks
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    bots = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    print(f"rooms: {count}, ticks: {ticks}, bots per room: {bots}")
+    calm = per_tick(count, ticks, 0.0, bots)
+    windy = per_tick(count, ticks, WIND, bots)
+    print(f"{'calm':>10}: {calm * 1000:7.2f} ms per tick")
+    print(f"{'windy':>10}: {windy * 1000:7.2f} ms per tick "
+          f"(+{(windy - calm) / count * 1e6:.1f} us per room)")
+
+    fields = []
+    for seed in range(count):
+        field = WindField(800.0, 600.0, WIND, seed)
+        field.reset(1, 0.0)
+        fields.append(field)
+    field = fields[0]
+    positions = np.random.default_rng(0).uniform(0.0, 600.0, (2, 8))
+    print(f"{'sample':>10}: {timed(lambda: field.sample(412.5, 287.25), 100000) * 1e6:7.2f} us per kite")
+    print(f"{'8 bots':>10}: {timed(lambda: field.sample_many(positions), 20000) * 1e6:7.2f} us per squad")
+    # Rooms start at different times, so about this many fields are due in any one tick
+    due = max(1, round(count * FRAME_TIME / WIND_STEP))
+    for stacked in (1, due):
+        step = timed(lambda: WindField._evolve(fields[:stacked]), 2000) / stacked
+        print(f"{'evolve':>10}: {step * 1e6:7.2f} us per field with {stacked:3d} stacked, "
+              f"{step * FRAME_TIME / WIND_STEP * 1e6:.2f} us per room per tick")
+    print(f"{'to_client':>10}: {timed(field.to_client, 5000) * 1e6:7.2f} us, "
+          f"{field.columns}x{field.rows} nodes sent as {len(field.to_client()['u'])}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark tick cost as the world grows at constant obstacle density.
+
+Usage: python -m benchmarks.bench_world [rooms] [ticks]
+"""
+import random
+import sys
+import time
+from game.core.batch import BatchSimulation
+from game.core.game_state import GameState
+from game.engine.world import WorldConfig
+from .bench_batch import steer, DT
+
+SIZES = [(800, 600), (2000, 2000), (5000, 5000), (10000, 10000)]
+
+def make_rooms(count: int, world: WorldConfig):
+    states = []
+    for seed in range(count):
+        state = GameState(seed=seed, world=world)
+        state.time_left = 1e9  # Keep every room running for the whole benchmark
+        state.handle_event({'type': 'keydown', 'key': 'ArrowUp'})
+        states.append(state)
+    return states
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    
+    print(f"rooms: {count}, ticks: {ticks}")
+    for width, height in SIZES:
+        states = make_rooms(count, WorldConfig(width, height))
+        batch = BatchSimulation()
+        inputs = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            steer(states, inputs)
+            batch.step(states, DT)
+            for state in states:
+                state.get_client_data()
+        tick_time = (time.perf_counter() - start) / ticks
+        obstacles = sum(len(state.entities) for state in states) / count
+        print(f"{width:>6}x{height:<6} {obstacles:7.0f} obstacles/room: "
+              f"{tick_time * 1000:7.2f} ms/tick incl. client data")
+
+if __name__ == '__main__':
+    main()
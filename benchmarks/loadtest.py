@@ -0,0 +1,223 @@
+"""Load-test a running server with many concurrent Socket.IO clients.
+
+Usage: python -m benchmarks.loadtest [--url URL] [--clients N] [--duration SECONDS]
+                                     [--ramp SECONDS] [--report PATH] [--no-compress]
+
+Needs the asyncio client extra: pip install "python-socketio[asyncio_client]".
+
+Each client connects, then plays like a person would: the accelerator is held
+most of the time, steering keys are tapped or held for a moment and the
+accelerator is now and then released. For every game_state received the
+client records the delivery latency (receive time minus the server's sent_at,
+so run it on the same host as the server), and the JSON-encoded payload size.
+The report has latency percentiles, per-client receive rates and bytes, and the
+server's /metrics taken at the end, so runs can be compared across changes.
+Clients offer permessage-deflate like browsers do unless --no-compress is given;
+'compression' has the server's raw and on-the-wire bytes per message class for
+the run, from which the bandwidth saved is worked out.
+"""
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.request
+import socketio
+
+def percentiles(values: List[float], scale: float = 1.0) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    def at(fraction: float) -> float:
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * scale
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered) * scale,
+        'p50': at(0.5),
+        'p90': at(0.9),
+        'p99': at(0.99),
+        'min': ordered[0] * scale,
+        'max': ordered[-1] * scale
+    }
+
+class LoadClient:
+    def __init__(self, index: int, url: str, transports: List[str], compress: bool):
+        self.index = index
+        self.url = url
+        self.transports = transports
+        self.rng = random.Random(index)
+        self.sio = socketio.AsyncClient(
+            reconnection=False, websocket_extra_options={'compress': 15 if compress else 0})
+        self.sio.on('game_state', self.on_game_state)
+        self.connect_time = None
+        self.received = 0
+        self.bytes = 0
+        self.latencies: List[float] = []
+        self.inputs_sent = 0
+        self.error = None
+        
+    def on_game_state(self, data: Dict[str, Any]) -> None:
+        now = time.time()
+        self.received += 1
+        self.bytes += len(json.dumps(data, separators=(',', ':')))
+        sent_at = data.get('sent_at')
+        if sent_at is not None:
+            self.latencies.append(now - sent_at)
+            
+    async def key(self, kind: str, key: str) -> None:
+        await self.sio.emit('input', {'type': kind, 'key': key})
+        self.inputs_sent += 1
+        
+    async def play(self, until: float) -> None:
+        """Send keydown/keyup patterns until the deadline."""
+        rng = self.rng
+        await self.key('keydown', 'ArrowUp')
+        accelerating = True
+        while time.time() < until:
+            await asyncio.sleep(rng.uniform(0.2, 1.0))
+            roll = rng.random()
+            if roll < 0.6:
+                # Steer for a moment
+                key = rng.choice(['ArrowLeft', 'ArrowRight'])
+                await self.key('keydown', key)
+                await asyncio.sleep(rng.uniform(0.05, 0.6))
+                await self.key('keyup', key)
+            elif roll < 0.75:
+                accelerating = not accelerating
+                await self.key('keydown' if accelerating else 'keyup', 'ArrowUp')
+            elif roll < 0.8:
+                await self.key('keydown', 'ArrowDown')
+                await asyncio.sleep(rng.uniform(0.1, 0.4))
+                await self.key('keyup', 'ArrowDown')
+        
+    async def run(self, start_delay: float, until: float) -> None:
+        await asyncio.sleep(start_delay)
+        try:
+            started = time.perf_counter()
+            await self.sio.connect(self.url, transports=self.transports, wait_timeout=30)
+            self.connect_time = time.perf_counter() - started
+            await self.play(until)
+        except Exception as e:
+            self.error = f'{type(e).__name__}: {e}'
+        finally:
+            if self.sio.connected:
+                await self.sio.disconnect()
+                
+    def summary(self, duration: float) -> Dict[str, Any]:
+        return {
+            'received': self.received,
+            'receive_rate_hz': self.received / duration,
+            'bytes_per_second': self.bytes / duration,
+            'bytes_per_message': self.bytes / self.received if self.received else 0.0,
+            'inputs_sent': self.inputs_sent
+        }
+
+def fetch_metrics(url: str) -> Any:
+    try:
+        with urllib.request.urlopen(url.rstrip('/') + '/metrics', timeout=5) as response:
+            return json.load(response)
+    except Exception as e:
+        return {'error': str(e)}
+
+def compression_delta(before: Any, after: Any) -> Dict[str, Any]:
+    """Per-class raw and wire bytes the server sent between two /metrics fetches."""
+    if 'compression' not in after:
+        return {}
+    old_classes = before.get('compression', {}).get('classes', {})
+    classes = {}
+    for name, stats in after['compression']['classes'].items():
+        old = old_classes.get(name, {})
+        delta = {key: stats[key] - old.get(key, 0)
+                 for key in ('messages', 'compressed', 'raw_bytes', 'wire_bytes', 'cpu_ms')}
+        delta['ratio'] = delta['wire_bytes'] / delta['raw_bytes'] if delta['raw_bytes'] else 1.0
+        delta['us_per_message'] = delta['cpu_ms'] * 1000 / delta['messages'] if delta['messages'] else 0.0
+        classes[name] = delta
+    raw = sum(stats['raw_bytes'] for stats in classes.values())
+    wire = sum(stats['wire_bytes'] for stats in classes.values())
+    return {
+        'mode': after['compression']['mode'],
+        'raw_bytes': raw,
+        'wire_bytes': wire,
+        'saved_fraction': 1 - wire / raw if raw else 0.0,
+        'classes': classes
+    }
+
+async def run_load(args) -> Dict[str, Any]:
+    transports = ['websocket'] if args.transport == 'websocket' else ['polling']
+    clients = [LoadClient(i, args.url, transports, args.compress) for i in range(args.clients)]
+    metrics_before = fetch_metrics(args.url)
+    started = time.time()
+    until = started + args.ramp + args.duration
+    await asyncio.gather(*(client.run(args.ramp * i / max(args.clients, 1), until)
+                           for i, client in enumerate(clients)))
+    elapsed = time.time() - started
+    metrics_after = fetch_metrics(args.url)
+    
+    # Rates are over the time each client was meant to be connected, ramp-in excluded
+    connected = [client for client in clients if client.connect_time is not None]
+    summaries = [client.summary(until - started - args.ramp * i / max(args.clients, 1))
+                 for i, client in enumerate(clients) if client.connect_time is not None]
+    errors: Dict[str, int] = {}
+    for client in clients:
+        if client.error:
+            errors[client.error] = errors.get(client.error, 0) + 1
+            
+    return {
+        'config': vars(args),
+        'started_at': started,
+        'elapsed_seconds': elapsed,
+        'clients': {
+            'requested': args.clients,
+            'connected': len(connected),
+            'errors': errors
+        },
+        'connect_ms': percentiles([client.connect_time for client in connected], 1000),
+        'latency_ms': percentiles([latency for client in clients for latency in client.latencies], 1000),
+        'receive_rate_hz': percentiles([summary['receive_rate_hz'] for summary in summaries]),
+        'bytes_per_second_per_client': percentiles([summary['bytes_per_second'] for summary in summaries]),
+        'bytes_per_message': percentiles([summary['bytes_per_message'] for summary in summaries]),
+        'inputs_sent': sum(client.inputs_sent for client in clients),
+        'compression': compression_delta(metrics_before, metrics_after),
+        'server_metrics': metrics_after
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Socket.IO load generator for the game server.')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds at full load')
+    parser.add_argument('--ramp', type=float, default=10.0, help='seconds over which clients connect')
+    parser.add_argument('--transport', choices=['websocket', 'polling'], default='websocket')
+    parser.add_argument('--report', default='loadtest-report.json')
+    parser.add_argument('--no-compress', dest='compress', action='store_false',
+                        help='do not offer permessage-deflate')
+    args = parser.parse_args()
+    
+    report = asyncio.run(run_load(args))
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+        
+    latency = report['latency_ms']
+    rate = report['receive_rate_hz']
+    size = report['bytes_per_second_per_client']
+    print(f"clients: {report['clients']['connected']}/{args.clients} connected, "
+          f"errors: {sum(report['clients']['errors'].values())}")
+    if latency:
+        print(f"latency: p50 {latency['p50']:.1f} ms, p99 {latency['p99']:.1f} ms, max {latency['max']:.1f} ms")
+    if rate:
+        print(f"receive rate: median {rate['p50']:.1f} Hz, slowest client {rate['min']:.1f} Hz")
+        print(f"bandwidth: median {size['p50'] / 1024:.1f} KiB/s per client")
+    compression = report['compression']
+    if compression.get('raw_bytes'):
+        print(f"server sent {compression['raw_bytes'] / 1024:.0f} KiB as "
+              f"{compression['wire_bytes'] / 1024:.0f} KiB on the wire "
+              f"({compression['saved_fraction']:.0%} saved, mode {compression['mode']})")
+        for name, stats in compression['classes'].items():
+            if stats['messages']:
+                print(f"{name:>12}: {stats['messages']:6d} messages, {stats['compressed']:6d} compressed, "
+                      f"ratio {stats['ratio']:.3f}, {stats['us_per_message']:.1f} us each")
+    print(f"report written to {args.report}")
+
+if __name__ == '__main__':
+    main()
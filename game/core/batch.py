@@ -0,0 +1,313 @@
+"""Vectorized stepping of many rooms' buggy physics and obstacle collisions."""
+from typing import List, Tuple
+import numpy as np
+from .game_state import GameState
+from ..entities.obstacles import Wave
+from ..engine.level import INDEX_MIN_OBSTACLES
+from ..engine.wind import WindField
+
+# Entity kinds in the padded entity arrays
+EMPTY, SOLID, WAVE = 0, 1, 2
+
+RESTITUTION = 0.1
+
+def _overlaps(x, y, w, h, other_x, other_y, other_w, other_h):
+    """PhysicsEngine.check_collision over broadcast arrays."""
+    return (x < other_x + other_w) & (x + w > other_x) & (y < other_y + other_h) & (y + h > other_y)
+
+def _slabs(start, extent, delta, other_start, other_extent):
+    """PhysicsEngine._slab over broadcast arrays: entry and exit times along one axis."""
+    step = np.where(delta == 0, 1.0, delta)
+    near = (other_start - (start + extent)) / step
+    far = (other_start + other_extent - start) / step
+    forward = delta > 0
+    entry = np.where(forward, near, far)
+    exit_ = np.where(forward, far, near)
+    inside = (start < other_start + other_extent) & (start + extent > other_start)
+    still = delta == 0
+    entry = np.where(still, np.where(inside, -np.inf, np.inf), entry)
+    exit_ = np.where(still, np.where(inside, np.inf, -np.inf), exit_)
+    return entry, exit_
+
+class BatchSimulation:
+    """Steps the physics of many GameStates as one set of NumPy arrays.
+
+    Row i of the player arrays is rooms[i].player; entity arrays are padded to
+    the largest room. Transcendental terms (heading, surface damping ** dt) are taken
+    from the same scalar math the per-object path uses, so both stay bit-for-bit
+    comparable; everything else runs as whole-array operations.
+    """
+
+    def __init__(self):
+        self._layout: List[Tuple[GameState, int]] = []
+        self._tracks = []
+        # Entities whose position changes, with their cells, written back each tick
+        self._moving_entities: List[object] = []
+        self._moving_rows = np.zeros(0, dtype=np.intp)
+        self._moving_columns = np.zeros(0, dtype=np.intp)
+        self._moving_count = 0
+
+    def step(self, states: List[GameState], dt) -> None:
+        """Advance every state by dt (a float, or one dt per state)."""
+        dts = dt if isinstance(dt, (list, tuple)) else [dt] * len(states)
+        active = []
+        active_dts = []
+        for state, state_dt in zip(states, dts):
+            if state._begin_tick(state_dt):
+                active.append(state)
+                active_dts.append(state_dt)
+        if not active:
+            return
+        windy = [state for state in active if state.wind]
+        if windy:
+            WindField.advance_many([state.wind for state in windy],
+                                   [state.clock.now for state in windy])
+
+        self._sync_layout(active)
+        self._gather_players(active, active_dts)
+        self._integrate_players()
+        self._update_entities()
+        self._collide()
+        self._scatter(active)
+
+        for state, state_dt in zip(active, active_dts):
+            if state.bots:
+                state.bots.update(state_dt, state.wind, state.physics.wind_drag)
+            state._end_tick()
+
+    def _sync_layout(self, states: List[GameState]) -> None:
+        """Rebuild the padded entity arrays when rooms or their levels change."""
+        if len(states) == len(self._layout) and all(
+                state is known and state.layout_version == version
+                for state, (known, version) in zip(states, self._layout)):
+            return
+        self._layout = [(state, state.layout_version) for state in states]
+        self._tracks = [state.track for state in states]
+
+        rows = len(states)
+        columns = max((len(state.entities) for state in states), default=0)
+        self.ex = np.zeros((rows, columns))
+        self.ey = np.zeros((rows, columns))
+        self.ew = np.zeros((rows, columns))
+        self.eh = np.zeros((rows, columns))
+        self.evx = np.zeros((rows, columns))
+        self.evy = np.zeros((rows, columns))
+        self.kind = np.full((rows, columns), EMPTY, dtype=np.int8)
+        moving = []
+
+        for row, state in enumerate(states):
+            for column, entity in enumerate(state.entities):
+                self.ex[row, column] = entity.x
+                self.ey[row, column] = entity.y
+                self.ew[row, column] = entity.width
+                self.eh[row, column] = entity.height
+                self.evx[row, column] = entity.velocity_x
+                self.evy[row, column] = entity.velocity_y
+                self.kind[row, column] = WAVE if isinstance(entity, Wave) else SOLID
+                if entity.velocity_x or entity.velocity_y:
+                    moving.append((row, column, entity))
+
+        self._moving_entities = [entity for _, _, entity in moving]
+        self._moving_rows = np.array([row for row, _, _ in moving], dtype=np.intp)
+        self._moving_columns = np.array([column for _, column, _ in moving], dtype=np.intp)
+        self._moving_count = len(moving)
+
+        self.is_wave = self.kind == WAVE
+        self.is_solid = self.kind == SOLID
+
+    def _gather_players(self, states: List[GameState], dts: List[float]) -> None:
+        """Copy each player's fields and per-row scalar terms into arrays."""
+        rows = []
+        windy = []
+        for state, dt in zip(states, dts):
+            player = state.player
+            keys = state.keys_pressed
+            surface = state.track.surface_at(player.x, player.y)
+            if 'ArrowUp' in keys:
+                accel_dt = dt
+            elif 'ArrowDown' in keys:
+                accel_dt = -dt * 0.5
+            else:
+                accel_dt = 0.0
+            sin_r, cos_r = player.heading()
+            # Turning is applied after acceleration, as in BeachBuggy.handle_input
+            rotation = player.rotation
+            if 'ArrowLeft' in keys:
+                rotation -= player.turn_speed * dt
+            if 'ArrowRight' in keys:
+                rotation += player.turn_speed * dt
+            # Wind is sampled with the same scalar code as GameState.update
+            wind_x = wind_y = wind_drag = 0.0
+            if state.wind:
+                wind_x, wind_y = state.wind.sample(player.x, player.y)
+                wind_drag = state.physics.wind_drag * dt
+                windy.append(len(rows))
+            rows.append((player.x, player.y, player.velocity_x, player.velocity_y,
+                         rotation % 360, player.acceleration, player.max_speed,
+                         accel_dt, sin_r, cos_r, state.physics.damping(surface, dt),
+                         player.width, player.height, player.bounds_width, player.bounds_height,
+                         wind_x, wind_y, wind_drag))
+
+        # One conversion for the whole batch; row-wise assignment costs more than the maths
+        fields = np.array(rows).T.copy()
+        (self.px, self.py, self.vx, self.vy, self.rotation, self.accel, self.max_speed,
+         self.accel_dt, self.sin_r, self.cos_r, self.damping, self.pw, self.ph,
+         self.bounds_width, self.bounds_height, self.wind_x, self.wind_y, self.wind_drag) = fields
+        self.windy = np.array(windy, dtype=np.intp)  # Rows of rooms with a wind field
+        self.dt = np.asarray(dts)
+        self.start_x = self.px.copy()
+        self.start_y = self.py.copy()
+
+    def _integrate_players(self) -> None:
+        """BeachBuggy.handle_input followed by BeachBuggy.apply_physics, for every row."""
+        accelerating = self.accel_dt != 0
+        self.vx += self.sin_r * self.accel * self.accel_dt
+        self.vy -= self.cos_r * self.accel * self.accel_dt
+
+        speed_sq = self.vx * self.vx + self.vy * self.vy
+        capped = accelerating & (speed_sq > self.max_speed * self.max_speed)
+        if capped.any():
+            scale = self.max_speed[capped] / np.sqrt(speed_sq[capped])
+            self.vx[capped] *= scale
+            self.vy[capped] *= scale
+
+        # PhysicsEngine.apply_wind; only on windy rows, so the others keep their exact values
+        if len(self.windy):
+            windy = self.windy
+            drag = self.wind_drag[windy]
+            self.vx[windy] += (self.wind_x[windy] - self.vx[windy]) * drag
+            self.vy[windy] += (self.wind_y[windy] - self.vy[windy]) * drag
+
+        self.vx *= self.damping
+        self.vy *= self.damping
+        self.px += self.vx * self.dt
+        self.py += self.vy * self.dt
+
+        half_w = self.pw / 2
+        half_h = self.ph / 2
+        low = self.px - half_w < 0
+        high = ~low & (self.px + half_w > self.bounds_width)
+        self.px = np.where(low, half_w, np.where(high, self.bounds_width - half_w, self.px))
+        self.vx = np.where(low, np.maximum(0, self.vx), np.where(high, np.minimum(0, self.vx), self.vx))
+        low = self.py - half_h < 0
+        high = ~low & (self.py + half_h > self.bounds_height)
+        self.py = np.where(low, half_h, np.where(high, self.bounds_height - half_h, self.py))
+        self.vy = np.where(low, np.maximum(0, self.vy), np.where(high, np.minimum(0, self.vy), self.vy))
+
+    def _update_entities(self) -> None:
+        """GameEntity.update for every entity; waves move as a function of time instead."""
+        if not self._moving_count:
+            return
+        dt = self.dt[:, None]
+        self.ex += self.evx * dt
+        self.ey += self.evy * dt
+
+    def _collide(self) -> None:
+        """GameState._check_collisions: swept AABB tests for all rooms at once.
+
+        Waves take no part; water slowdown comes from the surface damping.
+        """
+        if not self.ex.size:
+            return
+        dx = self.px - self.start_x
+        dy = self.py - self.start_y
+        pw = self.pw[:, None]
+        ph = self.ph[:, None]
+
+        # Broad phase against the box swept out this tick
+        sweep_x = np.minimum(self.start_x, self.start_x + dx)[:, None]
+        sweep_y = np.minimum(self.start_y, self.start_y + dy)[:, None]
+        sweep_w = pw + np.abs(dx)[:, None]
+        sweep_h = ph + np.abs(dy)[:, None]
+        ex, ey, ew, eh, is_solid = self._candidates(sweep_x, sweep_y, sweep_w, sweep_h)
+        solid = _overlaps(sweep_x, sweep_y, sweep_w, sweep_h, ex, ey, ew, eh) & is_solid
+        if not solid.any():
+            return
+        sx = self.start_x[:, None]
+        sy = self.start_y[:, None]
+
+        # Rooms whose player starts inside a solid are pushed out of the first one
+        stuck = solid & _overlaps(sx, sy, pw, ph, ex, ey, ew, eh)
+        is_stuck = stuck.any(axis=1)
+        rows = np.arange(len(self.px))
+        column = stuck.argmax(axis=1)
+        stuck_x, stuck_y = ex[rows, column], ey[rows, column]
+        stuck_w, stuck_h = ew[rows, column], eh[rows, column]
+        push_left = self.start_x + self.pw - stuck_x
+        push_right = stuck_x + stuck_w - self.start_x
+        push_up = self.start_y + self.ph - stuck_y
+        push_down = stuck_y + stuck_h - self.start_y
+        left = push_left < push_right
+        depth_x = np.where(left, push_left, push_right)
+        normal_x = np.where(left, -1.0, 1.0)
+        up = push_up < push_down
+        depth_y = np.where(up, push_up, push_down)
+        normal_y = np.where(up, -1.0, 1.0)
+        along_x = depth_x < depth_y
+        stuck_nx = np.where(along_x, normal_x, 0.0)
+        stuck_ny = np.where(along_x, 0.0, normal_y)
+        depth = np.where(along_x, depth_x, depth_y)
+
+        # Everyone else stops at the earliest time of impact
+        entry_x, exit_x = _slabs(sx, pw, dx[:, None], ex, ew)
+        entry_y, exit_y = _slabs(sy, ph, dy[:, None], ey, eh)
+        entry = np.maximum(entry_x, entry_y)
+        hits = solid & (entry >= 0) & (entry < 1) & (entry < np.minimum(exit_x, exit_y))
+        entry = np.where(hits, entry, np.inf)
+        column = entry.argmin(axis=1)
+        is_hit = ~is_stuck & hits.any(axis=1)
+        toi = np.where(is_hit, entry[rows, column], 0.0)
+        on_x = entry_x[rows, column] > entry_y[rows, column]
+        hit_nx = np.where(on_x, np.where(dx > 0, -1.0, 1.0), 0.0)
+        hit_ny = np.where(on_x, 0.0, np.where(dy > 0, -1.0, 1.0))
+
+        self.px = np.where(is_stuck, self.start_x + stuck_nx * depth,
+                           np.where(is_hit, self.start_x + dx * toi, self.px))
+        self.py = np.where(is_stuck, self.start_y + stuck_ny * depth,
+                           np.where(is_hit, self.start_y + dy * toi, self.py))
+
+        nx = np.where(is_stuck, stuck_nx, hit_nx)
+        ny = np.where(is_stuck, stuck_ny, hit_ny)
+        dot = self.vx * nx + self.vy * ny
+        bounce = (is_stuck | is_hit) & (dot < 0)
+        self.vx = np.where(bounce, self.vx - (1 + RESTITUTION) * dot * nx, self.vx)
+        self.vy = np.where(bounce, self.vy - (1 + RESTITUTION) * dot * ny, self.vy)
+
+    def _candidates(self, sweep_x, sweep_y, sweep_w, sweep_h):
+        """Entity columns to test: all of them, or per-row grid hits for large tracks.
+        
+        Grid hits keep their list order, so "first overlap" and "earliest hit"
+        ties resolve exactly as in the full scan.
+        """
+        if self.ex.shape[1] <= INDEX_MIN_OBSTACLES:
+            return self.ex, self.ey, self.ew, self.eh, self.is_solid
+        boxes = zip(sweep_x[:, 0].tolist(), sweep_y[:, 0].tolist(),
+                    (sweep_x + sweep_w)[:, 0].tolist(), (sweep_y + sweep_h)[:, 0].tolist())
+        hits = [track.obstacle_indices_in(*box) for track, box in zip(self._tracks, boxes)]
+        width = max(1, max(len(columns) for columns in hits))
+        columns = np.zeros((len(hits), width), dtype=np.intp)
+        valid = np.zeros((len(hits), width), dtype=bool)
+        for row, row_columns in enumerate(hits):
+            columns[row, :len(row_columns)] = row_columns
+            valid[row, :len(row_columns)] = True
+        return (np.take_along_axis(self.ex, columns, 1), np.take_along_axis(self.ey, columns, 1),
+                np.take_along_axis(self.ew, columns, 1), np.take_along_axis(self.eh, columns, 1),
+                np.take_along_axis(self.is_solid, columns, 1) & valid)
+
+    def _scatter(self, states: List[GameState]) -> None:
+        """Write stepped values back to the player and entity objects."""
+        values = zip(self.px.tolist(), self.py.tolist(), self.vx.tolist(),
+                     self.vy.tolist(), self.rotation.tolist())
+        for state, (x, y, vx, vy, rotation) in zip(states, values):
+            player = state.player
+            player.x = x
+            player.y = y
+            player.velocity_x = vx
+            player.velocity_y = vy
+            player.rotation = rotation
+
+        xs = self.ex[self._moving_rows, self._moving_columns].tolist()
+        ys = self.ey[self._moving_rows, self._moving_columns].tolist()
+        for entity, x, y in zip(self._moving_entities, xs, ys):
+            entity.x = x
+            entity.y = y
@@ -0,0 +1,133 @@
+"""Computer-driven buggies that race the checkpoint route of a room's track."""
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from ..engine.level import Track
+from ..engine.navigation import NAV_CELL_SIZE
+
+BOT_SPEED = 260.0  # Top speed of the fastest bot, pixels per second
+BOT_SPEED_SPREAD = 0.25  # The slowest bot is this fraction slower, so the pack spreads out
+BOT_STEERING = 4.0  # Fraction of the gap to the desired velocity closed per second
+BOT_WIDTH = 40
+BOT_HEIGHT = 60
+CHECKPOINT_RADIUS = 50  # Same as the player's
+
+class BotSquad:
+    """All bots of one room held as arrays, so a tick steers them with a few NumPy operations."""
+
+    # Bots do not collide with the player, obstacles or each other and never draw from
+    # the room's rng, so they cannot change a run's score or its replay
+
+    def __init__(self, count: int, track: Track):
+        self.count = count
+        self.track = track
+        self.max_speed = BOT_SPEED * (1.0 - BOT_SPEED_SPREAD * np.arange(count) / max(count - 1, 1))
+        # Rows are x and y, so each step is one operation for both axes
+        self.position = np.zeros((2, count))
+        self.velocity = np.zeros((2, count))
+        self.target = np.ones(count, dtype=np.intp)  # Index of the next checkpoint
+        self.laps = np.zeros(count, dtype=np.intp)
+        self._low = np.array([[BOT_WIDTH / 2], [BOT_HEIGHT / 2]])
+        self._high = np.array([[track.width - BOT_WIDTH / 2], [track.height - BOT_HEIGHT / 2]])
+        self._load_route()
+        
+    def _load_route(self) -> None:
+        """Take the current level's checkpoints and have the track build their flow fields."""
+        track = self.track
+        self._route = np.array(track.checkpoints, dtype=float).reshape(-1, 2).T.copy()
+        # Directions for every (axis, checkpoint, nav cell); zero until the search is done
+        self._fields = np.zeros((2, self._route.shape[1], track.nav_columns * track.nav_rows))
+        track.build_flow_fields(self._take_fields)
+
+    def _take_fields(self) -> None:
+        for checkpoint in range(self._route.shape[1]):
+            self._fields[:, checkpoint] = self.track.flow_field(checkpoint)
+
+    def reset(self) -> None:
+        """Line the bots up around the start checkpoint of a freshly generated level."""
+        self._load_route()
+        if not self._route.shape[1]:
+            return
+        slots = np.arange(self.count)
+        # Four abreast, rows stacked behind the start
+        self.position[0] = self._route[0, 0] + (slots % 4 - 1.5) * (BOT_WIDTH + 10)
+        self.position[1] = self._route[1, 0] + (slots // 4 + 1) * (BOT_HEIGHT + 10)
+        np.clip(self.position, self._low, self._high, out=self.position)
+        self.velocity[:] = 0.0
+        self.target[:] = 1 if self._route.shape[1] > 1 else 0
+        self.laps[:] = 0
+
+    def update(self, dt: float, wind=None, wind_drag: float = 0.0) -> None:
+        """Steer along the flow fields, move, and advance bots that reached their checkpoint.
+
+        With a WindField, velocities are also pulled towards the wind at the
+        bots' positions, wind_drag of the gap per second.
+        """
+        track = self.track
+        route = self._route
+        if route.shape[1] < 2:
+            return
+        position = self.position
+        velocity = self.velocity
+        
+        # Positions are clamped inside the track, so the cell is always in range
+        cells = (position[1] // NAV_CELL_SIZE).astype(np.intp)
+        cells *= track.nav_columns
+        cells += (position[0] // NAV_CELL_SIZE).astype(np.intp)
+        
+        # Close part of the gap between the velocity and the field's direction at full speed.
+        # Only the checkpoint's own cell has no direction, and arriving there already counts
+        # as reaching the checkpoint
+        steer = self._fields[:, self.target, cells]
+        steer *= self.max_speed
+        steer -= velocity
+        steer *= min(1.0, BOT_STEERING * dt)
+        velocity += steer
+        if wind is not None:
+            pull = wind.sample_many(position)
+            pull -= velocity
+            pull *= min(1.0, wind_drag * dt)
+            velocity += pull
+        position += velocity * dt
+        np.clip(position, self._low, self._high, out=position)
+
+        offset = route[:, self.target] - position
+        offset *= offset
+        reached = offset[0] + offset[1] < CHECKPOINT_RADIUS * CHECKPOINT_RADIUS
+        if reached.any():
+            self.target[reached] += 1
+            # The last checkpoint closes the lap at the start; carry on to the first real one
+            lapped = self.target >= route.shape[1]
+            self.target[lapped] = 1
+            self.laps[lapped] += 1
+
+    def render(self, view: Optional[Tuple[float, float, float, float]] = None) -> List[Dict[str, Any]]:
+        """Client data for bots, optionally only those inside a (left, top, right, bottom) box."""
+        (x, y), (velocity_x, velocity_y) = self.position, self.velocity
+        if view is not None:
+            left, top, right, bottom = view
+            visible = (x >= left) & (x <= right) & (y >= top) & (y <= bottom)
+            x, y, velocity_x, velocity_y = x[visible], y[visible], velocity_x[visible], velocity_y[visible]
+        # Same convention as BeachBuggy: 0 degrees faces up, clockwise positive
+        rotation = np.degrees(np.arctan2(velocity_x, -velocity_y)) % 360
+        return [{'x': bot_x, 'y': bot_y, 'rotation': bot_rotation,
+                 'width': BOT_WIDTH, 'height': BOT_HEIGHT}
+                for bot_x, bot_y, bot_rotation in zip(x.tolist(), y.tolist(), rotation.tolist())]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain values for snapshots."""
+        return {
+            'position': self.position.tolist(),
+            'velocity': self.velocity.tolist(),
+            'target': self.target.tolist(),
+            'laps': self.laps.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], track: Track) -> 'BotSquad':
+        """Rebuild a squad captured by to_dict once the track's checkpoints are restored."""
+        squad = cls(len(data['target']), track)
+        squad.position[:] = data['position']
+        squad.velocity[:] = data['velocity']
+        squad.target[:] = data['target']
+        squad.laps[:] = data['laps']
+        return squad
@@ -0,0 +1,68 @@
+"""Simulation clock with a timer wheel for timed game effects."""
+from typing import Callable, List
+import math
+
+class Timer:
+    __slots__ = ('deadline', 'tick', 'callback', 'cancelled')
+
+    def __init__(self, deadline: float, tick: int, callback: Callable[[], None]):
+        self.deadline = deadline
+        self.tick = tick
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Prevent the timer from firing; it is dropped when its slot comes up."""
+        self.cancelled = True
+
+class SimulationClock:
+    def __init__(self, resolution: float = 1.0 / 60, wheel_size: int = 512):
+        self.now = 0.0  # Simulated seconds, advanced only by dt
+        self.resolution = resolution
+        self._wheel: List[List[Timer]] = [[] for _ in range(wheel_size)]
+        self._tick = 0  # Last wheel tick that has been processed
+        self._pending = 0
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Timer:
+        """Run callback once simulated time has advanced by delay seconds."""
+        deadline = self.now + delay
+        # Small epsilon keeps float noise from pushing exact deadlines a tick later
+        tick = max(math.ceil(deadline / self.resolution - 1e-9), self._tick + 1)
+        timer = Timer(deadline, tick, callback)
+        self._wheel[tick % len(self._wheel)].append(timer)
+        self._pending += 1
+        return timer
+
+    def advance(self, dt: float) -> None:
+        """Move simulated time forward, firing timers whose deadline has passed."""
+        self.now += dt
+        target = int(self.now / self.resolution)
+        if target <= self._tick:
+            return
+        if not self._pending:
+            self._tick = target
+            return
+
+        size = len(self._wheel)
+        if target - self._tick >= size:
+            # Jumped a full revolution or more: every slot may hold due timers
+            slots = range(size)
+        else:
+            slots = [tick % size for tick in range(self._tick + 1, target + 1)]
+        self._tick = target
+
+        due: List[Timer] = []
+        for index in slots:
+            slot = self._wheel[index]
+            if not slot:
+                continue
+            # Timers for later revolutions stay in the slot
+            keep = [timer for timer in slot if timer.tick > target and not timer.cancelled]
+            due.extend(timer for timer in slot if timer.tick <= target and not timer.cancelled)
+            self._pending -= len(slot) - len(keep)
+            self._wheel[index] = keep
+
+        due.sort(key=lambda timer: timer.deadline)
+        for timer in due:
+            if not timer.cancelled:
+                timer.callback()
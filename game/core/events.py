@@ -1,28 +1,78 @@
-from typing import Dict, Any, Callable
-from functools import wraps
+"""Tick-batched game events: the simulation queues them, subscribers get them after the tick."""
+from typing import Dict, Any, Callable, List, Tuple
+import logging
 
-class EventSystem:
+log = logging.getLogger(__name__)
+
+# Subscribing to this receives every event type
+ALL_EVENTS = '*'
+
+# Called as handler(source, event): source is the publisher (a room token for game
+# states), event a dict of the published fields plus 'type'
+Handler = Callable[[Any, Dict[str, Any]], None]
+
+class EventBus:
+    """Queues events published during a tick and delivers them all in flush()."""
     def __init__(self):
-        self._handlers = {}
-        
-    def register(self, event_type: str, handler: Callable) -> None:
-        """Register an event handler."""
-        if event_type not in self._handlers:
-            self._handlers[event_type] = []
-        self._handlers[event_type].append(handler)
-        
-    def emit(self, event_type: str, **kwargs) -> None:
-        """Emit an event to all registered handlers."""
-        if event_type in self._handlers:
-            for handler in self._handlers[event_type]:
-                handler(**kwargs)
-                
-def game_event(event_type: str):
-    """Decorator to register game event handlers."""
-    def decorator(func: Callable):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
-        EventSystem().register(event_type, wrapper)
-        return wrapper
-    return decorator
\ No newline at end of file
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._dispatch: Dict[str, Tuple[Handler, ...]] = {}
+        self._catch_all: Tuple[Handler, ...] = ()
+        self._pending: List[Tuple[Tuple[Handler, ...], Any, Dict[str, Any]]] = []
+        self.errors = 0  # Handler exceptions swallowed by flush()
+
+    def subscribe(self, event_type: str, handler: Handler) -> None:
+        """Register a handler for one event type, or ALL_EVENTS."""
+        self._handlers.setdefault(event_type, []).append(handler)
+        self._compile()
+
+    def unsubscribe(self, event_type: str, handler: Handler) -> None:
+        handlers = self._handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            self._compile()
+
+    def _compile(self) -> None:
+        """Precompute the handler tuple for every subscribed event type."""
+        catch_all = tuple(self._handlers.get(ALL_EVENTS, ()))
+        self._dispatch = {event_type: tuple(handlers) + catch_all
+                          for event_type, handlers in self._handlers.items()
+                          if event_type != ALL_EVENTS}
+        self._catch_all = catch_all
+
+    def publish(self, source: Any, event_type: str, **fields) -> None:
+        """Queue an event for the next flush()."""
+        # Events nobody listens to are dropped here, for the cost of one dict lookup
+        handlers = self._dispatch.get(event_type) or self._catch_all
+        if handlers:
+            fields['type'] = event_type
+            self._pending.append((handlers, source, fields))
+
+    def publisher(self, source: Any) -> Callable[..., None]:
+        """A publish function bound to one source, for handing to a game state."""
+        def publish(event_type: str, **fields) -> None:
+            self.publish(source, event_type, **fields)
+        return publish
+
+    def flush(self) -> int:
+        """Deliver queued events in publish order; returns how many were delivered."""
+        pending = self._pending
+        if not pending:
+            return 0
+        self._pending = []
+        for handlers, source, event in pending:
+            for handler in handlers:
+                try:
+                    handler(source, event)
+                except Exception:
+                    # A failing subscriber must not stop the others or the game loop
+                    self.errors += 1
+                    log.exception('event handler failed', extra={'room': source, 'fields': {
+                        'event': event['type'], 'handler': getattr(handler, '__name__', repr(handler))}})
+        return len(pending)
+
+def game_event(event_type: str, bus: EventBus):
+    """Decorator subscribing a handler to event_type on bus."""
+    def decorator(func: Handler) -> Handler:
+        bus.subscribe(event_type, func)
+        return func
+    return decorator
@@ -1,11 +1,17 @@
 import time
-from typing import List, Dict, Any, Optional
+import random
+from typing import List, Dict, Any, Optional, Callable
+from .clock import SimulationClock, Timer
+from .replay import RunRecorder
 from ..entities.player import BeachBuggy
 from ..entities.base import GameEntity
 from ..entities.obstacles import Rock, PalmTree, Wave
 from ..engine.physics import PhysicsEngine
 from ..engine.level import Track
 from ..engine.renderer import Renderer
+from ..engine.world import WorldConfig
+
+IDLE_SPEED = 1.0  # Buggies slower than this (pixels per second) count as standing still
 
 class GameState:
     def __init__(self):
@@ -252,16 +258,42 @@ class GameState:
                 self._setup_level()
 
 class GameState:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, record: bool = False,
+                 setup_level: bool = True, world: Optional[WorldConfig] = None,
+                 bots: int = 0):
+        # Deterministic randomness so a run can be replayed from its seed
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.world = world or WorldConfig()
+        self.recorder = RunRecorder(self.seed, self.world.to_dict()) if record else None
+        
         # Game systems
         self.physics = PhysicsEngine()
-        self.renderer = Renderer()
-        self.track = Track(800, 600)
+        self.renderer = Renderer(self.world)
+        self.track = Track(self.world.width, self.world.height, self.rng,
+                           self.world.cell_size, self.world.area_scale)
         
         # Game objects
-        self.player = BeachBuggy(400, 300)  # Start at middle of screen
+        self.player = BeachBuggy(self.world.width / 2, self.world.height / 2,
+                                 self.world.width, self.world.height)  # Start at middle of the world
         self.entities: List[GameEntity] = []
         self.collectibles: List[Dict[str, Any]] = []
+        self.layout_version = 0  # Bumped whenever the set of entities is rebuilt
+        
+        # Queues game events for subscribers; set by the owner (see EventBus.publisher)
+        self.events: Optional[Callable[..., None]] = None
+        
+        # Computer-driven opponents; imported only when used since they need numpy
+        self.bots = None
+        if bots:
+            from .bots import BotSquad
+            self.bots = BotSquad(bots, self.track)
+        
+        # Wind over the track when the world has any; imported only when used, like bots
+        self.wind = None
+        if self.world.wind:
+            from ..engine.wind import WindField
+            self.wind = WindField(self.world.width, self.world.height, self.world.wind, self.seed)
         
         # Game state
         self.score = 0
@@ -272,8 +304,13 @@ class GameState:
         self.current_checkpoint = 0
         self.active_powerup: Optional[Dict[str, Any]] = None
         
-        # Set up initial level
-        self._setup_level()
+        # Simulated time drives all timed effects, so replays and pauses stay consistent
+        self.clock = SimulationClock()
+        self._powerup_timer: Optional[Timer] = None
+        
+        # Set up initial level (skipped when a snapshot fills it in instead)
+        if setup_level:
+            self._setup_level()
         
     def _setup_level(self):
         """Initialize level with track, obstacles, and collectibles."""
@@ -283,42 +320,78 @@ class GameState:
         # Get generated objects
         self.entities = self.track.obstacles
         self.collectibles = self.track.collectibles
+        self.layout_version += 1
+        if self.events:
+            self.events('level_started', level=self.level, obstacles=len(self.entities),
+                        collectibles=len(self.collectibles))
         
         # Reset player position to start
         start_pos = self.track.checkpoints[0]
         self.player.x = start_pos[0]
         self.player.y = start_pos[1]
         self.current_checkpoint = 0
+        if self.bots:
+            self.bots.reset()
+        if self.wind:
+            self.wind.reset(self.level, self.clock.now)
         
         # Reset game state
         self.time_left = 60.0 + (self.level * 10)  # More time for higher levels
+        self._cancel_powerup_timer()
         self.active_powerup = None
         
     def update(self, dt: float) -> None:
         """Update game state for current frame."""
-        if self.game_over:
+        if not self._begin_tick(dt):
             return
-            
-        # Update time
-        self.time_left -= dt
-        if self.time_left <= 0:
-            self.game_over = True
-            return
-        
-        # Update powerups
-        self._update_powerups(dt)
+        if self.wind:
+            self.wind.advance(self.clock.now)  # BatchSimulation advances all rooms' wind together
         
         # Update player with current input state
+        start_x, start_y = self.player.x, self.player.y
+        surface = self.track.surface_at(start_x, start_y)
         self.player.handle_input(self.keys_pressed, dt)
-        self.player.apply_physics(dt)
+        if self.wind:
+            wind_x, wind_y = self.wind.sample(start_x, start_y)
+            self.physics.apply_wind(self.player, wind_x, wind_y, dt)
+        self.player.apply_physics(dt, self.physics.damping(surface, dt))
         
         # Update other entities
         for entity in self.entities:
             entity.update(dt)
+        if self.bots:
+            self.bots.update(dt, self.wind, self.physics.wind_drag)
             
         # Check collisions
-        self._check_collisions()
+        self._check_collisions(start_x, start_y)
+        
+        self._end_tick()
+        
+    def _begin_tick(self, dt: float) -> bool:
+        """Advance timers ahead of physics; returns False if nothing should move this tick."""
+        if self.game_over:
+            return False
+            
+        if self.recorder:
+            self.recorder.record_tick(dt)
+            
+        # Update time
+        self.time_left -= dt
+        if self.time_left <= 0:
+            self.game_over = True
+            if self.events:
+                self.events('game_over', score=self.score, level=self.level)
+            return False
+        
+        # Advance simulated time, firing any expired timers
+        self.clock.advance(dt)
+        
+        # Update powerups
+        self._update_powerups(dt)
+        return True
         
+    def _end_tick(self) -> None:
+        """Resolve pickups and progress once everything has moved."""
         # Check collectibles
         self._check_collectibles()
         
@@ -329,49 +402,79 @@ class GameState:
         """Process game events from client."""
         event_type = event.get('type')
         
+        if self.recorder and not self.game_over:
+            self.recorder.record_event(event)
+                
         if event_type == 'keydown':
             self.keys_pressed.add(event['key'])
         elif event_type == 'keyup':
             self.keys_pressed.discard(event['key'])
+                
+    def is_idle(self) -> bool:
+        """True when nothing in the room moves: no keys held, the buggy at rest, no powerup or bots."""
+        player = self.player
+        speed_sq = player.velocity_x * player.velocity_x + player.velocity_y * player.velocity_y
+        return (not self.keys_pressed and self.active_powerup is None and not self.bots
+                and speed_sq < IDLE_SPEED * IDLE_SPEED)
                             
-    def _check_collisions(self) -> None:
-        """Check and handle collisions with obstacles."""
-        for entity in self.entities:
-            if self.physics.check_collision(
-                (self.player.x, self.player.y),
-                (self.player.width, self.player.height),
-                (entity.x, entity.y),
-                (entity.width, entity.height)
-            ):
-                if isinstance(entity, Wave):
-                    # Waves slow down the player gently
-                    self.player.velocity_x *= 0.9
-                    self.player.velocity_y *= 0.9
-                else:
-                    # Solid obstacles bounce the player more gently
-                    normal = (
-                        self.player.x - entity.x,
-                        self.player.y - entity.y
-                    )
-                    # Normalize the vector
-                    length = (normal[0]**2 + normal[1]**2)**0.5
-                    if length > 0:
-                        normal = (normal[0]/length, normal[1]/length)
-                        bounce_velocity_x, bounce_velocity_y = \
-                            self.physics.resolve_collision(
-                                (self.player.x, self.player.y),
-                                (self.player.velocity_x, self.player.velocity_y),
-                                normal
-                            )
-                        # Apply much gentler bounce
-                        self.player.velocity_x = self.player.velocity_x * 0.8 + bounce_velocity_x * 0.2
-                        self.player.velocity_y = self.player.velocity_y * 0.8 + bounce_velocity_y * 0.2
+    def _check_collisions(self, start_x: float, start_y: float) -> None:
+        """Check and handle collisions with obstacles along this tick's movement."""
+        player = self.player
+        physics = self.physics
+        width, height = player.width, player.height
+        dx = player.x - start_x
+        dy = player.y - start_y
+        
+        # Broad phase: only entities touching the box swept out this tick matter
+        sweep_x = min(start_x, start_x + dx)
+        sweep_y = min(start_y, start_y + dy)
+        sweep_w = width + abs(dx)
+        sweep_h = height + abs(dy)
+        
+        stuck = None
+        earliest = None
+        for entity in self.track.obstacles_in(sweep_x, sweep_y, sweep_x + sweep_w, sweep_y + sweep_h):
+            if isinstance(entity, Wave):
+                # Waves are drawn over water; the surface grid does the slowing
+                continue
+            if not physics.overlaps(sweep_x, sweep_y, sweep_w, sweep_h,
+                                    entity.x, entity.y, entity.width, entity.height):
+                continue
+                
+            if stuck is None:
+                stuck = physics.penetration_box(start_x, start_y, width, height, entity.x, entity.y,
+                                                entity.width, entity.height)
+            hit = physics.sweep_box(start_x, start_y, width, height, dx, dy, entity.x, entity.y,
+                                    entity.width, entity.height)
+            if hit and (earliest is None or hit[0] < earliest[0]):
+                earliest = hit
+                
+        if stuck:
+            # Already inside a solid obstacle: push out along the shallowest axis
+            normal_x, normal_y, depth = stuck
+            player.x = start_x + normal_x * depth
+            player.y = start_y + normal_y * depth
+        elif earliest:
+            # Stop at the time of impact instead of tunnelling through
+            time_of_impact, normal_x, normal_y = earliest
+            player.x = start_x + dx * time_of_impact
+            player.y = start_y + dy * time_of_impact
+        else:
+            return
+            
+        # Bounce gently off the face that was hit
+        if player.velocity_x * normal_x + player.velocity_y * normal_y < 0:
+            physics.reflect_velocity(player, normal_x, normal_y)
                         
     def _check_collectibles(self) -> None:
         """Check and handle collectible collection."""
-        collected_indices = []
+        # Collection radius (slightly larger than visual size)
+        collection_radius = 25
+        grid = self.track.collectible_grid
+        collected = []
         
-        for i, collectible in enumerate(self.collectibles):
+        # Only collectibles in the grid cells around the player can be in reach
+        for collectible in grid.near(self.player.x, self.player.y, collection_radius):
             if collectible.get('collected', False):
                 continue
                 
@@ -379,22 +482,35 @@ class GameState:
             distance = ((self.player.x - collectible['x'])**2 + 
                        (self.player.y - collectible['y'])**2)**0.5
             
-            # Collection radius (slightly larger than visual size)
-            collection_radius = 25
-            
             if distance < collection_radius:
-                collectible['collected'] = True
-                collected_indices.append(i)
+                collected.append(collectible)
                 
-                if collectible['type'] == 'coin':
-                    self.score += collectible['value']
-                    
-                elif collectible['type'] == 'powerup':
-                    self._activate_powerup(collectible)
-        
-        # Remove collected items (in reverse order to maintain indices)
-        for i in reversed(collected_indices):
-            self.collectibles.pop(i)
+        if not collected:
+            return
+            
+        collected_ids = {id(collectible) for collectible in collected}
+        if len(collected) > 1:
+            # Apply effects in list order, as a full scan would
+            collected = [c for c in self.collectibles if id(c) in collected_ids]
+            
+        for collectible in collected:
+            collectible['collected'] = True
+            grid.remove(collectible, collectible['x'], collectible['y'])
+            
+            if collectible['type'] == 'coin':
+                self.score += collectible['value']
+                
+            elif collectible['type'] == 'powerup':
+                self._activate_powerup(collectible)
+                
+            if self.events:
+                self.events('collected', kind=collectible['type'],
+                            power_type=collectible.get('power_type'), score=self.score)
+        
+        # Remove collected items, keeping the list shared with the track
+        self.collectibles[:] = [c for c in self.collectibles if id(c) not in collected_ids]
+        for collectible in collected:
+            self.track.release_collectible(collectible)
     
     def _activate_powerup(self, powerup: Dict[str, Any]) -> None:
         """Activate a collected powerup."""
@@ -408,8 +524,9 @@ class GameState:
         self.active_powerup = {
             'type': power_type,
             'duration': duration,
-            'start_time': time.time()
+            'start_time': self.clock.now
         }
+        self._powerup_timer = self.clock.schedule(duration, self._deactivate_powerup)
         
         # Apply powerup effects
         if power_type == 'speed':
@@ -428,6 +545,7 @@ class GameState:
         if not self.active_powerup:
             return
             
+        self._cancel_powerup_timer()
         power_type = self.active_powerup['type']
         
         # Remove powerup effects
@@ -444,12 +562,19 @@ class GameState:
             pass
             
         self.active_powerup = None
+        
+    def _cancel_powerup_timer(self) -> None:
+        """Stop the pending expiry of the active powerup."""
+        if self._powerup_timer:
+            self._powerup_timer.cancel()
+            self._powerup_timer = None
 
     def _attract_nearby_coins(self) -> None:
         """Attract nearby coins when magnet powerup is active."""
         magnet_radius = 80
+        grid = self.track.collectible_grid
         
-        for collectible in self.collectibles:
+        for collectible in grid.near(self.player.x, self.player.y, magnet_radius):
             if collectible['type'] == 'coin' and not collectible.get('collected', False):
                 distance = ((self.player.x - collectible['x'])**2 + 
                            (self.player.y - collectible['y'])**2)**0.5
@@ -461,18 +586,15 @@ class GameState:
                     
                     # Reduced pull strength
                     pull_strength = 1.5
+                    old_x, old_y = collectible['x'], collectible['y']
                     collectible['x'] += direction_x * pull_strength
                     collectible['y'] += direction_y * pull_strength
+                    grid.move(collectible, old_x, old_y, collectible['x'], collectible['y'])
     
     def _update_powerups(self, dt: float) -> None:
-        """Update active powerups and handle expiration."""
-        if self.active_powerup:
-            elapsed = time.time() - self.active_powerup['start_time']
-            
-            if elapsed >= self.active_powerup['duration']:
-                self._deactivate_powerup()
-            elif self.active_powerup['type'] == 'magnet':
-                self._attract_nearby_coins()
+        """Apply per-tick powerup effects; expiry is handled by the clock."""
+        if self.active_powerup and self.active_powerup['type'] == 'magnet':
+            self._attract_nearby_coins()
                             
     def _check_checkpoints(self) -> None:
         """Check if player has reached the next checkpoint."""
@@ -486,16 +608,26 @@ class GameState:
         if distance < 50:  # Checkpoint radius
             self.current_checkpoint += 1
             self.score += 50 * self.level
-            print(f"Checkpoint {self.current_checkpoint} reached! Score: {self.score}")
+            if self.events:
+                self.events('checkpoint_reached', checkpoint=self.current_checkpoint,
+                            total=len(self.track.checkpoints), score=self.score)
             
             # Complete level when ALL checkpoints are reached
             if self.current_checkpoint >= len(self.track.checkpoints):
+                if self.events:
+                    self.events('level_completed', level=self.level, score=self.score)
                 self.level += 1
-                print(f"Level {self.level} completed! Generating new level...")
                 self._setup_level()
                 
-    def get_client_data(self) -> Dict[str, Any]:
-        """Serialize current game state for client."""
+    def get_client_data(self, include_layout: bool = True, include_wind: bool = True) -> Dict[str, Any]:
+        """Serialize current game state for client.
+        
+        The obstacle layout only changes with the level, so callers that track
+        layout_version can leave it out of in-between updates; clients keep the
+        last one and animate waves from their parameters and 'time'. Large
+        worlds always include it since it depends on the camera. The downsampled
+        wind field can likewise be left out until wind.client_version changes.
+        """
         # Create a combined player data structure for backwards compatibility
         player_data = {
             'x': self.player.x,
@@ -507,26 +639,52 @@ class GameState:
             'velocity_y': getattr(self.player, 'velocity_y', 0)
         }
         
-        # Prepare entities data
-        entities_data = []
-        for entity in self.entities:
-            entities_data.append({
-                'type': entity.__class__.__name__.lower(),
-                'x': entity.x,
-                'y': entity.y,
-                'width': getattr(entity, 'width', 20),
-                'height': getattr(entity, 'height', 20)
-            })
-        
-        return {
+        # Large worlds only send what the client's camera can see
+        entities = self.entities
+        collectibles = self.collectibles
+        view = None
+        if not self.world.fits_view:
+            view = self.renderer.view_around(self.player.x, self.player.y)
+            left, top, right, bottom = view
+            entities = self.track.obstacles_in(left, top, right, bottom)
+            half_width = (right - left) / 2
+            half_height = (bottom - top) / 2
+            radius = max(half_width, half_height)
+            collectibles = [c for c in self.track.collectible_grid.near(
+                                left + half_width, top + half_height, radius)
+                            if left <= c['x'] <= right and top <= c['y'] <= bottom]
+            
+        data = {
             'player': player_data,
-            'entities': entities_data,
-            'collectibles': [c for c in self.collectibles if not c.get('collected', False)],
+            'collectibles': [c for c in collectibles if not c.get('collected', False)],
             'score': self.score,
             'timeLeft': self.time_left,
             'level': self.level,
             'game_over': self.game_over,
             'current_checkpoint': self.current_checkpoint,
             'total_checkpoints': len(self.track.checkpoints) if self.track.checkpoints else 0,
-            'active_powerup': self.active_powerup
-        }
\ No newline at end of file
+            'active_powerup': self.active_powerup,
+            'bots': self.bots.render(view) if self.bots else [],
+            'world': self.world.to_dict(),
+            'time': self.clock.now,
+            'layout_version': self.layout_version
+        }
+        if self.wind and include_wind:
+            data['wind'] = self.wind.to_client()
+        
+        if include_layout or view is not None:
+            entities_data = []
+            for entity in entities:
+                entity_data = {
+                    'type': entity.__class__.__name__.lower(),
+                    'x': entity.x,
+                    'y': entity.y,
+                    'width': getattr(entity, 'width', 20),
+                    'height': getattr(entity, 'height', 20)
+                }
+                if isinstance(entity, Wave):
+                    entity_data.update(origin_x=entity.origin_x, distance=entity.distance,
+                                       speed=entity.speed, phase=entity.phase)
+                entities_data.append(entity_data)
+            data['entities'] = entities_data
+        return data
\ No newline at end of file
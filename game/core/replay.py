@@ -0,0 +1,32 @@
+"""Run recording for server-side replay verification."""
+from typing import List, Dict, Any, Tuple, Optional
+
+RUN_LOG_VERSION = 3  # Bump whenever simulation rules change, so old logs are not replayed under new ones
+
+class RunRecorder:
+    def __init__(self, seed: int, world: Optional[Dict[str, Any]] = None):
+        self.seed = seed
+        self.world = world  # WorldConfig.to_dict() of the run; None means the default world
+        self.ticks: List[Tuple[float, List[Dict[str, Any]]]] = []
+        self._pending: List[Dict[str, Any]] = []
+
+    def record_event(self, event: Dict[str, Any]) -> None:
+        """Buffer an input event until the next tick consumes it."""
+        self._pending.append({'type': event.get('type'), 'key': event.get('key')})
+
+    def record_tick(self, dt: float) -> None:
+        """Close the current tick with the inputs received since the last one."""
+        self.ticks.append((dt, self._pending))
+        self._pending = []
+
+    def to_log(self, score: int, level: int, run_id: str = '') -> Dict[str, Any]:
+        """Build a run log that can be submitted for verification."""
+        return {
+            'version': RUN_LOG_VERSION,
+            'run_id': run_id,
+            'seed': self.seed,
+            'world': self.world,
+            'ticks': [[dt, events] for dt, events in self.ticks],
+            'score': score,
+            'level': level
+        }
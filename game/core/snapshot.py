@@ -0,0 +1,230 @@
+"""Versioned GameState snapshots so rooms survive server restarts."""
+from typing import Dict, Any, Optional, List, Tuple
+import logging
+import marshal
+import mmap
+import os
+import struct
+import time
+from .game_state import GameState
+from ..entities.obstacles import Rock, PalmTree, Wave
+from ..engine.world import WorldConfig
+
+SNAPSHOT_VERSION = 7
+
+# File layout: header, marshalled index of (token, offset, length, saved_at), room blobs
+_MAGIC = b'KGSN'
+_HEADER = struct.Struct('<4sHI')  # magic, version, index length
+
+_ENTITY_TYPES = {'rock': Rock, 'palmtree': PalmTree, 'wave': Wave}
+
+log = logging.getLogger(__name__)
+
+def capture_state(state: GameState) -> Dict[str, Any]:
+    """Reduce a game state to plain values that marshal can encode."""
+    player = state.player
+    entities = []
+    for entity in state.entities:
+        extra = None
+        if isinstance(entity, Wave):
+            extra = (entity.speed, entity.distance, entity.origin_x, entity.phase)
+        entities.append((entity.__class__.__name__.lower(), entity.x, entity.y,
+                         entity.velocity_x, entity.velocity_y, extra))
+
+    powerup = None
+    if state.active_powerup:
+        powerup = {
+            'type': state.active_powerup['type'],
+            'duration': state.active_powerup['duration'],
+            'start_time': state.active_powerup['start_time']
+        }
+
+    recorder = None
+    if state.recorder:
+        recorder = (state.recorder.ticks, state.recorder._pending)
+
+    return {
+        'seed': state.seed,
+        'world': state.world.to_dict(),
+        'rng': state.rng.getstate(),
+        'player': (player.x, player.y, player.velocity_x, player.velocity_y,
+                   player.rotation, player.speed, player.max_speed,
+                   player.is_shielded, player.boost_time),
+        'entities': entities,
+        'collectibles': [dict(collectible) for collectible in state.collectibles],
+        'checkpoints': list(state.track.checkpoints),
+        'current_checkpoint': state.current_checkpoint,
+        'clock': state.clock.now,
+        'powerup': powerup,
+        'score': state.score,
+        'time_left': state.time_left,
+        'level': state.level,
+        'game_over': state.game_over,
+        'keys_pressed': sorted(state.keys_pressed),
+        'recorder': recorder,
+        'bots': state.bots.to_dict() if state.bots else None,
+        'wind': state.wind.to_dict() if state.wind else None
+    }
+
+def restore_state(data: Dict[str, Any]) -> GameState:
+    """Rebuild a game state from captured values without regenerating the level."""
+    state = GameState(seed=data['seed'], record=data['recorder'] is not None,
+                      setup_level=False, world=WorldConfig.from_dict(data['world']))
+    state.rng.setstate(data['rng'])
+
+    player = state.player
+    (player.x, player.y, player.velocity_x, player.velocity_y,
+     player.rotation, player.speed, player.max_speed,
+     player.is_shielded, player.boost_time) = data['player']
+
+    for type_name, x, y, velocity_x, velocity_y, extra in data['entities']:
+        entity = _ENTITY_TYPES[type_name](x, y)
+        entity.velocity_x = velocity_x
+        entity.velocity_y = velocity_y
+        if extra is not None:
+            entity.speed, entity.distance, entity.origin_x, entity.phase = extra
+        state.track.obstacles.append(entity)
+    state.track.rasterize_surface()
+    state.track.index_obstacles()
+    # Copied so the track's pool never recycles dicts that belong to the snapshot
+    state.track.collectibles.extend(dict(collectible) for collectible in data['collectibles'])
+    state.track.checkpoints.extend(tuple(point) for point in data['checkpoints'])
+    state.entities = state.track.obstacles
+    state.collectibles = state.track.collectibles
+    state.track.index_collectibles()
+    state.layout_version += 1
+
+    if data['bots']:
+        from .bots import BotSquad
+        state.bots = BotSquad.from_dict(data['bots'], state.track)
+    if data['wind']:
+        state.wind.load(data['wind'])
+
+    state.current_checkpoint = data['current_checkpoint']
+    state.score = data['score']
+    state.time_left = data['time_left']
+    state.level = data['level']
+    state.game_over = data['game_over']
+
+    state.clock.advance(data['clock'])
+    powerup = data['powerup']
+    if powerup:
+        state.active_powerup = dict(powerup)
+        # Effects are already reflected in the captured player fields; only the expiry is re-armed
+        remaining = powerup['start_time'] + powerup['duration'] - state.clock.now
+        state._powerup_timer = state.clock.schedule(remaining, state._deactivate_powerup)
+
+    if state.recorder:
+        state.recorder.ticks, state.recorder._pending = data['recorder']
+        # Held keys are released on restore; record that so replays agree
+        for key in data['keys_pressed']:
+            state.recorder.record_event({'type': 'keyup', 'key': key})
+
+    return state
+
+def encode_state(state: GameState) -> bytes:
+    """Serialize a game state to a compact snapshot blob."""
+    return marshal.dumps(capture_state(state))
+
+def decode_state(blob: bytes) -> GameState:
+    """Deserialize a snapshot blob produced by encode_state."""
+    return restore_state(marshal.loads(blob))
+
+def write_snapshots(path: str, blobs: Dict[str, bytes],
+                    saved_at: Optional[Dict[str, float]] = None) -> int:
+    """Write encoded room snapshots to a memory-mapped file and return its size.
+
+    saved_at gives each room's wall-clock age stamp; rooms without one are stamped now.
+    """
+    saved_at = saved_at or {}
+    now = time.time()
+    index: List[Tuple[str, int, int, float]] = []
+    offset = 0
+    for token, blob in blobs.items():
+        index.append((token, offset, len(blob), saved_at.get(token, now)))
+        offset += len(blob)
+    index_bytes = marshal.dumps(index)
+    data_start = _HEADER.size + len(index_bytes)
+    size = data_start + offset
+
+    # Write to a temporary file first so a store still mapping the old file is unaffected
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w+b') as f:
+        f.truncate(size)
+        with mmap.mmap(f.fileno(), size) as mapped:
+            mapped[:_HEADER.size] = _HEADER.pack(_MAGIC, SNAPSHOT_VERSION, len(index_bytes))
+            mapped[_HEADER.size:data_start] = index_bytes
+            for (_, blob_offset, length, _), blob in zip(index, blobs.values()):
+                start = data_start + blob_offset
+                mapped[start:start + length] = blob
+            mapped.flush()
+    os.replace(tmp_path, path)
+    return size
+
+class SnapshotStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._mapped: Optional[mmap.mmap] = None
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self.saved_at: Dict[str, float] = {}  # token -> wall-clock time the room was saved
+
+        if os.path.exists(path) and os.path.getsize(path) >= _HEADER.size:
+            self._open()
+
+    def _open(self) -> None:
+        """Map the snapshot file and read its index; room blobs stay on disk."""
+        self._file = open(self.path, 'rb')
+        self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = _HEADER.unpack_from(self._mapped, 0)
+        if magic != _MAGIC or version != SNAPSHOT_VERSION:
+            log.warning('ignoring snapshot file', extra={'fields': {
+                'path': self.path, 'version': version, 'expected': SNAPSHOT_VERSION}})
+            self.close()
+            return
+        data_start = _HEADER.size + index_length
+        index = marshal.loads(self._mapped[_HEADER.size:data_start])
+        self._index = {token: (data_start + offset, length) for token, offset, length, _ in index}
+        self.saved_at = {token: saved_at for token, _, _, saved_at in index}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._index
+
+    def _blob(self, token: str) -> bytes:
+        start, length = self._index[token]
+        return self._mapped[start:start + length]
+
+    def pop(self, token: str) -> Optional[GameState]:
+        """Restore a room on first reconnect; each snapshot is restored only once."""
+        if token not in self._index:
+            return None
+        blob = self._blob(token)
+        del self._index[token]
+        del self.saved_at[token]
+        return decode_state(blob)
+
+    def remaining_blobs(self) -> Dict[str, bytes]:
+        """Raw blobs of rooms whose clients have not reconnected yet."""
+        return {token: self._blob(token) for token in self._index}
+
+    def expire(self, before: float) -> int:
+        """Forget snapshots saved before a wall-clock time; returns how many."""
+        expired = [token for token, saved_at in self.saved_at.items() if saved_at < before]
+        for token in expired:
+            del self._index[token]
+            del self.saved_at[token]
+        return len(expired)
+
+    def close(self) -> None:
+        """Unmap the snapshot file."""
+        self._index = {}
+        self.saved_at = {}
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
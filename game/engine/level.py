@@ -1,17 +1,86 @@
 """Track and level generation for Beach Rally."""
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional, Callable
 import random
 import math
 from ..entities.obstacles import Rock, PalmTree, Wave
 from ..entities.base import GameEntity
+from .spatial import SpatialGrid, PointGrid
+from .pool import ObjectPool
+from .navigation import NAV_CELL_SIZE, blocked_cells, flow_fields
+
+# Terrain surface grid: one byte per cell, indexing SURFACE_TYPES
+SURFACE_CELL_SIZE = 20
+SAND, WATER = 0, 1
+SURFACE_TYPES = ('sand', 'water')
+WATER_MARGIN = 20  # Shallows around each wave's travel range
+
+# Below this many obstacles a plain scan beats the grid lookup
+INDEX_MIN_OBSTACLES = 32
+
+# Collectible dicts are pooled per type, so a reused dict already has the right keys
+# and reset only assigns their values
+def _new_coin(x: float, y: float, value: int) -> Dict[str, Any]:
+    return {'type': 'coin', 'x': x, 'y': y, 'value': value, 'collected': False}
+
+def _reset_coin(coin: Dict[str, Any], x: float, y: float, value: int) -> None:
+    coin['x'] = x
+    coin['y'] = y
+    coin['value'] = value
+    coin['collected'] = False
+
+def _new_powerup(power_type: str, x: float, y: float, duration: float) -> Dict[str, Any]:
+    return {'type': 'powerup', 'power_type': power_type, 'x': x, 'y': y,
+            'duration': duration, 'collected': False}
+
+def _reset_powerup(powerup: Dict[str, Any], power_type: str, x: float, y: float,
+                   duration: float) -> None:
+    powerup['power_type'] = power_type
+    powerup['x'] = x
+    powerup['y'] = y
+    powerup['duration'] = duration
+    powerup['collected'] = False
+
+def run_in_place(search: Callable[[], Any], install: Callable[[Any], None]) -> None:
+    install(search())
 
 class Track:
-    def __init__(self, width: float, height: float):
+    # Runs a level's flow field search and hands the result to install. The default runs it
+    # in place; the server swaps in one that searches on a native thread, off the game loop
+    run_flow_search: Callable[[Callable[[], Any], Callable[[Any], None]], None] = \
+        staticmethod(run_in_place)
+
+    def __init__(self, width: float, height: float,
+                 rng: Optional[random.Random] = None, cell_size: float = 200.0,
+                 density_scale: float = 1.0):
         self.width = width
         self.height = height
+        self.rng = rng or random.Random()  # Seeded by GameState so runs can be replayed
+        self.density_scale = density_scale  # Multiplies obstacle/bonus counts for larger worlds
+        self.index = SpatialGrid(width, height, cell_size)  # Obstacle boxes, by list position
+        self._unindexed: List[int] = []  # Obstacles that move freely and are always checked
+        self._obstacle_points = PointGrid(width, height, cell_size)  # Used while generating
+        self.collectible_grid = PointGrid(width, height, cell_size)  # Kept in sync by GameState
+        # Regenerating a level recycles the previous level's objects instead of reallocating them
+        self.obstacle_pools: Dict[type, ObjectPool[GameEntity]] = {
+            Rock: ObjectPool(Rock, Rock.reset),
+            PalmTree: ObjectPool(PalmTree, PalmTree.reset),
+            Wave: ObjectPool(Wave, Wave.reset)
+        }
+        self.collectible_pools: Dict[str, ObjectPool[Dict[str, Any]]] = {
+            'coin': ObjectPool(_new_coin, _reset_coin),
+            'powerup': ObjectPool(_new_powerup, _reset_powerup)
+        }
         self.checkpoints: List[Tuple[float, float]] = []
         self.obstacles: List[GameEntity] = []
         self.collectibles: List[Dict[str, Any]] = []
+        self.surface_columns = math.ceil(width / SURFACE_CELL_SIZE)
+        self.surface_rows = math.ceil(height / SURFACE_CELL_SIZE)
+        self.surface = bytearray(self.surface_columns * self.surface_rows)
+        # Navigation for bots; flow fields are built per level by build_flow_fields
+        self.nav_columns = math.ceil(width / NAV_CELL_SIZE)
+        self.nav_rows = math.ceil(height / NAV_CELL_SIZE)
+        self._nav_layout = 0  # Bumped with the obstacle layout, so late searches are dropped
+        self._flow_fields: Dict[int, Tuple[Any, Any]] = {}  # goal nav cell -> (dx, dy) arrays
         self.scroll_speed = 0
         self.scroll_position = 0
         
@@ -19,10 +88,10 @@ class Track:
         """Generate a new track with appropriate difficulty."""
         self._place_checkpoints(difficulty)
         self._add_obstacles_intelligent(difficulty)
+        self.rasterize_surface()
+        self.index_obstacles()
         self._add_collectibles_strategic(difficulty)
         
-        print(f"Generated track with {len(self.obstacles)} obstacles and {len(self.collectibles)} collectibles")
-        
     def _place_checkpoints(self, difficulty: int) -> None:
         """Place checkpoints to create the track route."""
         self.checkpoints.clear()
@@ -33,8 +102,8 @@ class Track:
         # Generate fewer waypoints to prevent level completion issues
         num_points = 3 + difficulty  # Reduced from 5 + difficulty * 2
         for i in range(num_points):
-            x = random.randint(100, int(self.width - 100))
-            y = random.randint(100, int(self.height - 100))
+            x = self.rng.randint(100, int(self.width - 100))
+            y = self.rng.randint(100, int(self.height - 100))
             self.checkpoints.append((x, y))
             
         # End point is the start point for lap completion
@@ -42,7 +111,10 @@ class Track:
         
     def _add_obstacles_intelligent(self, difficulty: int) -> None:
         """Add obstacles with intelligent placement inspired by endless runners."""
+        for obstacle in self.obstacles:
+            self.obstacle_pools[type(obstacle)].release(obstacle)
         self.obstacles.clear()
+        self._obstacle_points.clear()
         
         # Define safe zones around checkpoints
         safe_radius = 80
@@ -66,25 +138,28 @@ class Track:
                         break
                 
                 # Check distance from other obstacles to avoid clustering
-                for obstacle in self.obstacles:
-                    distance = math.sqrt((x - obstacle.x)**2 + (y - obstacle.y)**2)
-                    if distance < pattern['min_distance']:
-                        safe = False
-                        break
+                if safe:
+                    for obstacle in self._obstacles_near(x, y, pattern['min_distance']):
+                        distance = math.sqrt((x - obstacle.x)**2 + (y - obstacle.y)**2)
+                        if distance < pattern['min_distance']:
+                            safe = False
+                            break
                 
                 if safe:
+                    pools = self.obstacle_pools
                     if pattern['type'] == 'rock':
-                        self.obstacles.append(Rock(x, y))
+                        self.obstacles.append(pools[Rock].acquire(x, y))
                     elif pattern['type'] == 'palmtree':
-                        self.obstacles.append(PalmTree(x, y))
+                        self.obstacles.append(pools[PalmTree].acquire(x, y))
                     elif pattern['type'] == 'wave':
-                        self.obstacles.append(Wave(x, y))
+                        self.obstacles.append(pools[Wave].acquire(x, y, self.rng))
+                    self._obstacle_points.add(self.obstacles[-1], x, y)
                     placed = True
                 else:
                     # Regenerate position
                     pattern['position'] = (
-                        random.randint(50, int(self.width - 50)),
-                        random.randint(50, int(self.height - 50))
+                        self.rng.randint(50, int(self.width - 50)),
+                        self.rng.randint(50, int(self.height - 50))
                     )
                 
                 attempts += 1
@@ -94,29 +169,29 @@ class Track:
         patterns = []
         
         # Rocks - scattered around
-        num_rocks = 3 + difficulty * 2
+        num_rocks = self._scaled(3 + difficulty * 2)
         for _ in range(num_rocks):
             patterns.append({
                 'type': 'rock',
                 'position': (
-                    random.randint(50, int(self.width - 50)),
-                    random.randint(50, int(self.height - 50))
+                    self.rng.randint(50, int(self.width - 50)),
+                    self.rng.randint(50, int(self.height - 50))
                 ),
                 'min_distance': 100
             })
         
         # Palm trees - along edges and in clusters
-        num_trees = 2 + difficulty
+        num_trees = self._scaled(2 + difficulty)
         for _ in range(num_trees):
-            if random.random() < 0.6:  # 60% chance near edges
-                if random.random() < 0.5:
-                    x = random.randint(50, 150)  # Left side
+            if self.rng.random() < 0.6:  # 60% chance near edges
+                if self.rng.random() < 0.5:
+                    x = self.rng.randint(50, 150)  # Left side
                 else:
-                    x = random.randint(int(self.width - 150), int(self.width - 50))  # Right side
-                y = random.randint(50, int(self.height - 50))
+                    x = self.rng.randint(int(self.width - 150), int(self.width - 50))  # Right side
+                y = self.rng.randint(50, int(self.height - 50))
             else:  # 40% chance anywhere
-                x = random.randint(50, int(self.width - 50))
-                y = random.randint(50, int(self.height - 50))
+                x = self.rng.randint(50, int(self.width - 50))
+                y = self.rng.randint(50, int(self.height - 50))
             
             patterns.append({
                 'type': 'palmtree',
@@ -125,16 +200,16 @@ class Track:
             })
         
         # Waves - create clusters for water areas
-        num_wave_clusters = 1 + difficulty // 2
+        num_wave_clusters = self._scaled(1 + difficulty // 2)
         for _ in range(num_wave_clusters):
-            center_x = random.randint(100, int(self.width - 100))
-            center_y = random.randint(100, int(self.height - 100))
+            center_x = self.rng.randint(100, int(self.width - 100))
+            center_y = self.rng.randint(100, int(self.height - 100))
             
             # Create 3-5 waves per cluster
-            waves_per_cluster = random.randint(3, 5)
+            waves_per_cluster = self.rng.randint(3, 5)
             for _ in range(waves_per_cluster):
-                angle = random.uniform(0, 2 * math.pi)
-                distance = random.uniform(20, 60)
+                angle = self.rng.uniform(0, 2 * math.pi)
+                distance = self.rng.uniform(20, 60)
                 x = center_x + math.cos(angle) * distance
                 y = center_y + math.sin(angle) * distance
                 
@@ -150,9 +225,138 @@ class Track:
         
         return patterns
             
+    def _scaled(self, count: int) -> int:
+        """Scale an object count by world area so density stays the same."""
+        return max(1, round(count * self.density_scale)) if self.density_scale != 1.0 else count
+        
+    def _obstacles_near(self, x: float, y: float, radius: float) -> List[GameEntity]:
+        """Obstacles whose position may be within radius of a point."""
+        return self._obstacle_points.near(x, y, radius)
+        
+    def _collectibles_near(self, x: float, y: float, radius: float) -> List[Dict[str, Any]]:
+        """Collectibles whose position may be within radius of a point."""
+        return self.collectible_grid.near(x, y, radius)
+        
+    def _add_collectible(self, kind: str, *fields) -> None:
+        """Place a collectible of a kind, built from its pool's factory arguments."""
+        collectible = self.collectible_pools[kind].acquire(*fields)
+        self.collectibles.append(collectible)
+        self.collectible_grid.add(collectible, collectible['x'], collectible['y'])
+        
+    def release_collectible(self, collectible: Dict[str, Any]) -> None:
+        """Return a collectible that has been removed from the level to its pool."""
+        pool = self.collectible_pools.get(collectible['type'])
+        if pool is not None:
+            pool.release(collectible)
+        
+    def index_collectibles(self) -> None:
+        """Rebuild the collectible grid, e.g. after restoring a snapshot."""
+        self.collectible_grid.clear()
+        for collectible in self.collectibles:
+            self.collectible_grid.add(collectible, collectible['x'], collectible['y'])
+        
+    def index_obstacles(self) -> None:
+        """Index obstacle boxes for collision queries; waves cover their whole travel range."""
+        self.index.clear()
+        self._unindexed = []
+        self._nav_layout += 1
+        self._flow_fields.clear()
+        for i, obstacle in enumerate(self.obstacles):
+            if isinstance(obstacle, Wave):
+                self.index.insert(i, obstacle.origin_x, obstacle.y,
+                                  obstacle.origin_x + obstacle.distance + obstacle.width,
+                                  obstacle.y + obstacle.height)
+            elif obstacle.velocity_x or obstacle.velocity_y:
+                self._unindexed.append(i)
+            else:
+                self.index.insert(i, obstacle.x, obstacle.y,
+                                  obstacle.x + obstacle.width, obstacle.y + obstacle.height)
+                                  
+    def obstacles_in(self, left: float, top: float, right: float, bottom: float) -> List[GameEntity]:
+        """Obstacles that may overlap a box, in list order; small tracks skip the index."""
+        if len(self.obstacles) <= INDEX_MIN_OBSTACLES:
+            return self.obstacles
+        return [self.obstacles[i] for i in self.obstacle_indices_in(left, top, right, bottom)]
+        
+    def obstacle_indices_in(self, left: float, top: float, right: float, bottom: float) -> List[int]:
+        """List positions of obstacles that may overlap a box, ascending."""
+        indices = self.index.query(left, top, right, bottom)
+        if self._unindexed:
+            indices = sorted(set(indices).union(self._unindexed))
+        return indices
+        
+    def nav_cell(self, x: float, y: float) -> int:
+        """Index of the navigation cell containing a point, clamped to the track."""
+        column = min(max(int(x // NAV_CELL_SIZE), 0), self.nav_columns - 1)
+        row = min(max(int(y // NAV_CELL_SIZE), 0), self.nav_rows - 1)
+        return row * self.nav_columns + column
+        
+    def build_flow_fields(self, on_ready: Callable[[], None]) -> None:
+        """Search the flow field towards every checkpoint and call on_ready once flow_field() has them.
+        
+        Rocks and palm trees block cells, waves do not. Fields from a search that
+        finishes after the layout changed are dropped.
+        """
+        goals = sorted({self.nav_cell(x, y) for x, y in self.checkpoints})
+        if not goals:
+            return
+        solids = [obstacle for obstacle in self.obstacles if not isinstance(obstacle, Wave)]
+        blocked = blocked_cells(solids, self.nav_columns, self.nav_rows)
+        columns, rows, layout = self.nav_columns, self.nav_rows, self._nav_layout
+
+        def search() -> Dict[int, Tuple[Any, Any]]:
+            import numpy as np  # Only rooms with bots need numpy here
+            fields = flow_fields(blocked, columns, rows, goals)
+            return {goal: (np.array(field_x), np.array(field_y))
+                    for goal, (field_x, field_y) in fields.items()}
+
+        def install(fields: Dict[int, Tuple[Any, Any]]) -> None:
+            if layout == self._nav_layout:
+                self._flow_fields = fields
+                on_ready()
+
+        Track.run_flow_search(search, install)
+        
+    def flow_field(self, checkpoint: int) -> Optional[Tuple[Any, Any]]:
+        """Per-nav-cell unit directions (x and y arrays) towards a checkpoint, None until built."""
+        # Keyed by goal cell, so the lap's closing checkpoint shares the start's field
+        return self._flow_fields.get(self.nav_cell(*self.checkpoints[checkpoint]))
+        
+    def rasterize_surface(self) -> None:
+        """Mark water cells over the range each wave travels; everything else is sand."""
+        self.surface[:] = bytes(len(self.surface))
+        for obstacle in self.obstacles:
+            if not isinstance(obstacle, Wave):
+                continue
+            left = obstacle.origin_x - WATER_MARGIN
+            right = obstacle.origin_x + obstacle.distance + obstacle.width + WATER_MARGIN
+            top = obstacle.y - WATER_MARGIN
+            bottom = obstacle.y + obstacle.height + WATER_MARGIN
+            first_column, first_row = self._surface_cell(left, top)
+            last_column, last_row = self._surface_cell(right, bottom)
+            for row in range(first_row, last_row + 1):
+                start = row * self.surface_columns
+                self.surface[start + first_column:start + last_column + 1] = \
+                    bytes([WATER]) * (last_column - first_column + 1)
+                    
+    def _surface_cell(self, x: float, y: float) -> Tuple[int, int]:
+        """Grid cell containing a point, clamped to the track."""
+        column = min(max(int(x // SURFACE_CELL_SIZE), 0), self.surface_columns - 1)
+        row = min(max(int(y // SURFACE_CELL_SIZE), 0), self.surface_rows - 1)
+        return column, row
+        
+    def surface_at(self, x: float, y: float) -> str:
+        """Surface type under a point, by direct cell lookup."""
+        column = min(max(int(x // SURFACE_CELL_SIZE), 0), self.surface_columns - 1)
+        row = min(max(int(y // SURFACE_CELL_SIZE), 0), self.surface_rows - 1)
+        return SURFACE_TYPES[self.surface[row * self.surface_columns + column]]
+            
     def _add_collectibles_strategic(self, difficulty: int) -> None:
         """Add collectibles with strategic placement."""
+        for collectible in self.collectibles:
+            self.release_collectible(collectible)
         self.collectibles.clear()
+        self.collectible_grid.clear()
         
         # Create coin trails that lead players through safe paths
         self._create_coin_trails(difficulty)
@@ -185,44 +389,38 @@ class Track:
                 base_y = start[1] + t * (end[1] - start[1])
                 
                 # Add some variation to avoid straight lines
-                offset_x = random.uniform(-30, 30)
-                offset_y = random.uniform(-30, 30)
+                offset_x = self.rng.uniform(-30, 30)
+                offset_y = self.rng.uniform(-30, 30)
                 
                 x = max(30, min(base_x + offset_x, self.width - 30))
                 y = max(30, min(base_y + offset_y, self.height - 30))
                 
                 # Check if position is safe from obstacles
                 safe = True
-                for obstacle in self.obstacles:
+                for obstacle in self._obstacles_near(x, y, 50):
                     distance = math.sqrt((x - obstacle.x)**2 + (y - obstacle.y)**2)
                     if distance < 50:  # 50 unit safe distance
                         safe = False
                         break
                 
                 if safe:
-                    self.collectibles.append({
-                        'type': 'coin',
-                        'x': x,
-                        'y': y,
-                        'value': 10,
-                        'collected': False
-                    })
+                    self._add_collectible('coin', x, y, 10)
     
     def _add_bonus_coins(self, difficulty: int) -> None:
         """Add bonus coins in challenging but reachable positions."""
-        num_bonus = 2 + difficulty
+        num_bonus = self._scaled(2 + difficulty)
         
         for _ in range(num_bonus):
             attempts = 0
             placed = False
             
             while not placed and attempts < 30:
-                x = random.randint(50, int(self.width - 50))
-                y = random.randint(50, int(self.height - 50))
+                x = self.rng.randint(50, int(self.width - 50))
+                y = self.rng.randint(50, int(self.height - 50))
                 
                 # Check if near obstacles (risk/reward)
                 near_obstacle = False
-                for obstacle in self.obstacles:
+                for obstacle in self._obstacles_near(x, y, 100):
                     distance = math.sqrt((x - obstacle.x)**2 + (y - obstacle.y)**2)
                     if 60 <= distance <= 100:  # Sweet spot near obstacles
                         near_obstacle = True
@@ -230,27 +428,21 @@ class Track:
                 
                 # Ensure not too close to other collectibles
                 safe_distance = True
-                for collectible in self.collectibles:
+                for collectible in self._collectibles_near(x, y, 40):
                     distance = math.sqrt((x - collectible['x'])**2 + (y - collectible['y'])**2)
                     if distance < 40:
                         safe_distance = False
                         break
                 
                 if near_obstacle and safe_distance:
-                    self.collectibles.append({
-                        'type': 'coin',
-                        'x': x,
-                        'y': y,
-                        'value': 25,  # Higher value for bonus coins
-                        'collected': False
-                    })
+                    self._add_collectible('coin', x, y, 25)  # Higher value for bonus coins
                     placed = True
                 
                 attempts += 1
     
     def _add_strategic_powerups(self, difficulty: int) -> None:
         """Add power-ups in strategic locations."""
-        num_powerups = 1 + difficulty // 2
+        num_powerups = self._scaled(1 + difficulty // 2)
         
         powerup_types = ['speed', 'shield', 'magnet', 'time']
         
@@ -259,19 +451,19 @@ class Track:
             placed = False
             
             while not placed and attempts < 30:
-                x = random.randint(100, int(self.width - 100))
-                y = random.randint(100, int(self.height - 100))
+                x = self.rng.randint(100, int(self.width - 100))
+                y = self.rng.randint(100, int(self.height - 100))
                 
                 # Ensure safe distance from obstacles
                 safe = True
-                for obstacle in self.obstacles:
+                for obstacle in self._obstacles_near(x, y, 80):
                     distance = math.sqrt((x - obstacle.x)**2 + (y - obstacle.y)**2)
                     if distance < 80:
                         safe = False
                         break
                 
                 # Ensure safe distance from other powerups
-                for collectible in self.collectibles:
+                for collectible in self._collectibles_near(x, y, 150):
                     if collectible['type'] == 'powerup':
                         distance = math.sqrt((x - collectible['x'])**2 + (y - collectible['y'])**2)
                         if distance < 150:
@@ -279,15 +471,9 @@ class Track:
                             break
                 
                 if safe:
-                    power_type = random.choice(powerup_types)
-                    self.collectibles.append({
-                        'type': 'powerup',
-                        'power_type': power_type,
-                        'x': x,
-                        'y': y,
-                        'duration': 5.0 + difficulty,  # Longer duration at higher levels
-                        'collected': False
-                    })
+                    power_type = self.rng.choice(powerup_types)
+                    # Longer duration at higher levels
+                    self._add_collectible('powerup', power_type, x, y, 5.0 + difficulty)
                     placed = True
                 
                 attempts += 1
@@ -0,0 +1,100 @@
+"""Flow fields over a coarse navigation grid, used to steer computer-driven buggies."""
+from typing import Dict, List, Tuple
+import heapq
+import math
+
+NAV_CELL_SIZE = 20
+
+# Extra room kept between a buggy's centre and an obstacle's box
+NAV_CLEARANCE = 30
+
+# Crossing a blocked cell costs this many times more than a free one. Blocked cells
+# still get a direction, so a buggy that strays into one finds the shortest way out
+BLOCKED_COST = 25.0
+
+_WALL = 2  # Border of the padded search grid; never entered
+_DIAGONAL = math.sqrt(2)
+_NEIGHBOURS = [(-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+               (-1, -1, _DIAGONAL), (1, -1, _DIAGONAL), (-1, 1, _DIAGONAL), (1, 1, _DIAGONAL)]
+
+def blocked_cells(obstacles, columns: int, rows: int,
+                  clearance: float = NAV_CLEARANCE) -> bytearray:
+    """Mark cells whose centre lies within clearance of an obstacle box."""
+    blocked = bytearray(columns * rows)
+    for obstacle in obstacles:
+        left = obstacle.x - clearance
+        top = obstacle.y - clearance
+        right = obstacle.x + obstacle.width + clearance
+        bottom = obstacle.y + obstacle.height + clearance
+        # Cells whose centres fall inside the inflated box
+        first_column = max(0, math.ceil(left / NAV_CELL_SIZE - 0.5))
+        last_column = min(columns - 1, math.floor(right / NAV_CELL_SIZE - 0.5))
+        first_row = max(0, math.ceil(top / NAV_CELL_SIZE - 0.5))
+        last_row = min(rows - 1, math.floor(bottom / NAV_CELL_SIZE - 0.5))
+        for row in range(first_row, last_row + 1):
+            start = row * columns
+            for column in range(first_column, last_column + 1):
+                blocked[start + column] = 1
+    return blocked
+
+def flow_field(blocked: bytearray, columns: int, rows: int,
+               goal_column: int, goal_row: int) -> Tuple[List[float], List[float]]:
+    """Unit direction of the cheapest path towards the goal cell, for every cell.
+
+    One Dijkstra pass outward from the goal; each cell points at the neighbour it
+    was reached from. Diagonal steps past a blocked corner are not allowed. The goal
+    cell and cells the search never reaches have a zero direction.
+    """
+    # Work on a copy padded with a ring of walls, so neighbours need no bounds checks
+    padded = columns + 2
+    terrain = bytearray([_WALL]) * (padded * (rows + 2))
+    for row in range(rows):
+        start = (row + 1) * padded + 1
+        terrain[start:start + columns] = blocked[row * columns:(row + 1) * columns]
+    steps = []
+    for step_x, step_y, length in _NEIGHBOURS:
+        corners = (step_x, step_y * padded) if step_x and step_y else None
+        steps.append((step_x + step_y * padded, -step_x / length, -step_y / length, length, corners))
+
+    cost = [math.inf] * len(terrain)
+    padded_x = [0.0] * len(terrain)
+    padded_y = [0.0] * len(terrain)
+    goal = (goal_row + 1) * padded + goal_column + 1
+    cost[goal] = 0.0
+    frontier = [(0.0, goal)]
+
+    while frontier:
+        distance, cell = heapq.heappop(frontier)
+        if distance > cost[cell]:
+            continue
+        for offset, back_x, back_y, length, corners in steps:
+            neighbour = cell + offset
+            kind = terrain[neighbour]
+            if kind == _WALL:
+                continue
+            if corners and (terrain[cell + corners[0]] or terrain[cell + corners[1]]):
+                continue
+            reached = distance + (length * BLOCKED_COST if kind else length)
+            if reached < cost[neighbour]:
+                cost[neighbour] = reached
+                # Reached from cell, so travelling back towards it heads for the goal
+                padded_x[neighbour] = back_x
+                padded_y[neighbour] = back_y
+                heapq.heappush(frontier, (reached, neighbour))
+
+    direction_x: List[float] = []
+    direction_y: List[float] = []
+    for row in range(rows):
+        start = (row + 1) * padded + 1
+        direction_x.extend(padded_x[start:start + columns])
+        direction_y.extend(padded_y[start:start + columns])
+    return direction_x, direction_y
+
+def flow_fields(blocked: bytearray, columns: int, rows: int,
+                goals: List[int]) -> Dict[int, Tuple[List[float], List[float]]]:
+    """flow_field() towards each goal cell (row * columns + column), keyed by goal."""
+    fields = {}
+    for goal in goals:
+        goal_row, goal_column = divmod(goal, columns)
+        fields[goal] = flow_field(blocked, columns, rows, goal_column, goal_row)
+    return fields
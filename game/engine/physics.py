@@ -1,50 +1,40 @@
 """Physics engine for the Beach Rally game."""
-from typing import Tuple
+from typing import Dict, Tuple, Optional
 import math
 
 class PhysicsEngine:
     def __init__(self):
-        self.gravity = 9.81
-        self.sand_friction = 0.25  # High friction for sand
-        self.water_friction = 0.1  # Lower friction for water/waves
+        # Fraction of speed a rolling buggy keeps per second on each surface
+        self.surface_damping = {'sand': 0.95, 'water': 0.15}
+        self.wind_drag = 0.6  # Fraction of the gap between velocity and the wind closed per second
+        self._damping_dt = None  # dt the cached damping factors were computed for
+        self._damping_factors: Dict[str, float] = {}
         
-    def apply_forces(self, mass: float, velocity: Tuple[float, float], 
-                    force: Tuple[float, float], dt: float, 
-                    surface_type: str = 'sand') -> Tuple[float, float]:
-        """Apply forces to an object and return new velocity."""
-        # Select friction coefficient based on surface
-        friction_coef = self.water_friction if surface_type == 'water' else self.sand_friction
+    def damping(self, surface_type: str, dt: float) -> float:
+        """Velocity factor for rolling over a surface for dt seconds, cached for the tick dt."""
+        if dt != self._damping_dt:
+            self._damping_factors = {surface: damping ** dt
+                                     for surface, damping in self.surface_damping.items()}
+            self._damping_dt = dt
+        return self._damping_factors[surface_type]
         
-        # Calculate friction force
-        speed = math.sqrt(velocity[0]**2 + velocity[1]**2)
-        if speed > 0:
-            friction_force = (-friction_coef * mass * self.gravity * velocity[0] / speed,
-                            -friction_coef * mass * self.gravity * velocity[1] / speed)
-        else:
-            friction_force = (0, 0)
-            
-        # Sum all forces
-        total_force = (force[0] + friction_force[0],
-                      force[1] + friction_force[1])
-                      
-        # Calculate acceleration (F = ma)
-        acceleration = (total_force[0] / mass,
-                      total_force[1] / mass)
-                      
-        # Update velocity (v = v0 + at)
-        new_velocity = (velocity[0] + acceleration[0] * dt,
-                      velocity[1] + acceleration[1] * dt)
-                      
-        return new_velocity
+    def apply_wind(self, entity, wind_x: float, wind_y: float, dt: float) -> None:
+        """Pull entity.velocity_x/velocity_y towards the wind velocity for dt seconds."""
+        drag = self.wind_drag * dt
+        entity.velocity_x += (wind_x - entity.velocity_x) * drag
+        entity.velocity_y += (wind_y - entity.velocity_y) * drag
         
     def check_collision(self, pos1: Tuple[float, float], size1: Tuple[float, float],
                        pos2: Tuple[float, float], size2: Tuple[float, float]) -> bool:
         """Check for collision between two rectangles using AABB."""
-        return (pos1[0] < pos2[0] + size2[0] and
-                pos1[0] + size1[0] > pos2[0] and
-                pos1[1] < pos2[1] + size2[1] and
-                pos1[1] + size1[1] > pos2[1])
-                
+        return self.overlaps(pos1[0], pos1[1], size1[0], size1[1],
+                             pos2[0], pos2[1], size2[0], size2[1])
+                             
+    def overlaps(self, x1: float, y1: float, w1: float, h1: float,
+                 x2: float, y2: float, w2: float, h2: float) -> bool:
+        """check_collision on plain numbers, for hot loops that should not build tuples."""
+        return x1 < x2 + w2 and x1 + w1 > x2 and y1 < y2 + h2 and y1 + h1 > y2
+        
     def resolve_collision(self, pos: Tuple[float, float], vel: Tuple[float, float],
                          normal: Tuple[float, float], restitution: float = 0.1) -> Tuple[float, float]:
         """Resolve collision by reflecting velocity along normal vector."""
@@ -57,4 +47,85 @@ class PhysicsEngine:
             vel[1] - (1 + restitution) * dot * normal[1]
         )
         
-        return new_velocity
\ No newline at end of file
+        return new_velocity
+        
+    def reflect_velocity(self, entity, normal_x: float, normal_y: float,
+                         restitution: float = 0.1) -> None:
+        """resolve_collision applied in place to entity.velocity_x/velocity_y."""
+        dot = entity.velocity_x * normal_x + entity.velocity_y * normal_y
+        entity.velocity_x = entity.velocity_x - (1 + restitution) * dot * normal_x
+        entity.velocity_y = entity.velocity_y - (1 + restitution) * dot * normal_y
+
+    def swept_bounds(self, pos: Tuple[float, float], size: Tuple[float, float],
+                     displacement: Tuple[float, float]) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        """Box enclosing a moving box over a whole tick, for broad-phase culling."""
+        return ((min(pos[0], pos[0] + displacement[0]), min(pos[1], pos[1] + displacement[1])),
+                (size[0] + abs(displacement[0]), size[1] + abs(displacement[1])))
+
+    def sweep_aabb(self, pos: Tuple[float, float], size: Tuple[float, float],
+                   displacement: Tuple[float, float],
+                   other_pos: Tuple[float, float],
+                   other_size: Tuple[float, float]) -> Optional[Tuple[float, Tuple[float, float]]]:
+        """Time of impact in [0, 1) of a box moving by displacement against a static box.
+
+        Returns (time, contact normal) or None. Boxes already overlapping at the
+        start are not reported; use penetration() for those.
+        """
+        hit = self.sweep_box(pos[0], pos[1], size[0], size[1], displacement[0], displacement[1],
+                             other_pos[0], other_pos[1], other_size[0], other_size[1])
+        if hit is None:
+            return None
+        return hit[0], (hit[1], hit[2])
+
+    def sweep_box(self, x: float, y: float, width: float, height: float, dx: float, dy: float,
+                  other_x: float, other_y: float, other_width: float,
+                  other_height: float) -> Optional[Tuple[float, float, float]]:
+        """sweep_aabb on plain numbers, returning (time, normal_x, normal_y) or None."""
+        entry_x, exit_x = self._slab(x, width, dx, other_x, other_width)
+        entry_y, exit_y = self._slab(y, height, dy, other_y, other_height)
+        entry = max(entry_x, entry_y)
+        if not (0 <= entry < 1 and entry < min(exit_x, exit_y)):
+            return None
+        # The axis entered last is the face that was hit
+        if entry_x > entry_y:
+            return entry, -1.0 if dx > 0 else 1.0, 0.0
+        return entry, 0.0, -1.0 if dy > 0 else 1.0
+
+    def _slab(self, start: float, extent: float, delta: float,
+              other_start: float, other_extent: float) -> Tuple[float, float]:
+        """Entry and exit times of a moving interval against a static one along one axis."""
+        if delta > 0:
+            return ((other_start - (start + extent)) / delta,
+                    (other_start + other_extent - start) / delta)
+        if delta < 0:
+            return ((other_start + other_extent - start) / delta,
+                    (other_start - (start + extent)) / delta)
+        if start < other_start + other_extent and start + extent > other_start:
+            return -math.inf, math.inf
+        return math.inf, -math.inf
+
+    def penetration(self, pos: Tuple[float, float], size: Tuple[float, float],
+                    other_pos: Tuple[float, float],
+                    other_size: Tuple[float, float]) -> Optional[Tuple[Tuple[float, float], float]]:
+        """Shortest way out of an overlapping box as (normal, depth), or None if not overlapping."""
+        out = self.penetration_box(pos[0], pos[1], size[0], size[1],
+                                   other_pos[0], other_pos[1], other_size[0], other_size[1])
+        if out is None:
+            return None
+        return (out[0], out[1]), out[2]
+
+    def penetration_box(self, x: float, y: float, width: float, height: float,
+                        other_x: float, other_y: float, other_width: float,
+                        other_height: float) -> Optional[Tuple[float, float, float]]:
+        """penetration on plain numbers, returning (normal_x, normal_y, depth) or None."""
+        if not self.overlaps(x, y, width, height, other_x, other_y, other_width, other_height):
+            return None
+        push_left = x + width - other_x
+        push_right = other_x + other_width - x
+        push_up = y + height - other_y
+        push_down = other_y + other_height - y
+        depth_x, normal_x = (push_left, -1.0) if push_left < push_right else (push_right, 1.0)
+        depth_y, normal_y = (push_up, -1.0) if push_up < push_down else (push_down, 1.0)
+        if depth_x < depth_y:
+            return normal_x, 0.0, depth_x
+        return 0.0, normal_y, depth_y
@@ -0,0 +1,32 @@
+"""Typed free lists so level regeneration reuses objects instead of reallocating them."""
+from typing import Callable, Generic, List, TypeVar
+
+T = TypeVar('T')
+
+class ObjectPool(Generic[T]):
+    def __init__(self, factory: Callable[..., T], reset: Callable[..., None],
+                 max_size: int = 1024):
+        self.factory = factory  # Builds a new object from the acquire arguments
+        self.reset = reset  # Reinitialises a released object from the same arguments
+        self.max_size = max_size
+        self._free: List[T] = []
+        self.created = 0
+        self.reused = 0
+        
+    def __len__(self) -> int:
+        return len(self._free)
+        
+    def acquire(self, *args) -> T:
+        """Reuse a released object if there is one, otherwise build a new one."""
+        if self._free:
+            obj = self._free.pop()
+            self.reset(obj, *args)
+            self.reused += 1
+            return obj
+        self.created += 1
+        return self.factory(*args)
+        
+    def release(self, obj: T) -> None:
+        """Hand an object back; it must no longer be referenced by the game."""
+        if len(self._free) < self.max_size:
+            self._free.append(obj)
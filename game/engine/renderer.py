@@ -1,15 +1,17 @@
 """Game state serialization and rendering logic."""
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import math
 from ..entities.base import GameEntity
 from ..entities.player import BeachBuggy
+from .world import WorldConfig
 
 class Renderer:
-    def __init__(self):
+    def __init__(self, world: Optional[WorldConfig] = None):
+        self.world = world or WorldConfig()
         self.camera_x = 0
         self.camera_y = 0
-        self.view_width = 800
-        self.view_height = 600
+        self.view_width = self.world.view_width
+        self.view_height = self.world.view_height
         self.zoom = 1.0
         
     def follow_player(self, player: BeachBuggy) -> None:
@@ -23,6 +25,20 @@ class Renderer:
         self.camera_x += (target_x - self.camera_x) * smoothing
         self.camera_y += (target_y - self.camera_y) * smoothing
         
+        # Never show past the world edges
+        self.camera_x = min(max(self.camera_x, 0), max(0, self.world.width - self.view_width))
+        self.camera_y = min(max(self.camera_y, 0), max(0, self.world.height - self.view_height))
+        
+    def view_around(self, x: float, y: float, margin: float = 200) -> Tuple[float, float, float, float]:
+        """World-space box (left, top, right, bottom) a camera following a point can see.
+        
+        Matches the client camera: centred on the point but clamped to the world edges.
+        """
+        left = min(max(x - self.view_width / 2, 0), max(0, self.world.width - self.view_width))
+        top = min(max(y - self.view_height / 2, 0), max(0, self.world.height - self.view_height))
+        return (left - margin, top - margin,
+                left + self.view_width + margin, top + self.view_height + margin)
+        
     def world_to_screen(self, x: float, y: float) -> tuple[float, float]:
         """Convert world coordinates to screen coordinates."""
         screen_x = (x - self.camera_x) * self.zoom
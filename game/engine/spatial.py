@@ -0,0 +1,93 @@
+"""Uniform grid spatial index so lookups cost depends on local density, not world size."""
+from typing import List, Any
+import math
+
+class SpatialGrid:
+    def __init__(self, width: float, height: float, cell_size: float):
+        self.cell_size = cell_size
+        self.columns = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.cells: List[List[int]] = [[] for _ in range(self.columns * self.rows)]
+        
+    def clear(self) -> None:
+        for cell in self.cells:
+            cell.clear()
+            
+    def insert(self, item: int, left: float, top: float, right: float, bottom: float) -> None:
+        """Add item to every cell its box touches; items should be inserted in ascending order."""
+        for row in self._span(top, bottom, self.rows):
+            start = row * self.columns
+            for column in self._span(left, right, self.columns):
+                self.cells[start + column].append(item)
+                
+    def query(self, left: float, top: float, right: float, bottom: float) -> List[int]:
+        """Items whose cells touch the box, ascending and without duplicates.
+        
+        This is a superset of the items actually overlapping the box; callers
+        still run their exact test on each one.
+        """
+        rows = self._span(top, bottom, self.rows)
+        columns = self._span(left, right, self.columns)
+        if len(rows) == 1 and len(columns) == 1:
+            return list(self.cells[rows[0] * self.columns + columns[0]])
+        found = set()
+        for row in rows:
+            start = row * self.columns
+            for column in columns:
+                found.update(self.cells[start + column])
+        return sorted(found)
+        
+    def _span(self, low: float, high: float, count: int) -> range:
+        """Cell indices covering [low, high] on one axis, clamped to the grid."""
+        first = min(max(int(low // self.cell_size), 0), count - 1)
+        last = min(max(int(high // self.cell_size), 0), count - 1)
+        return range(first, last + 1)
+        
+class PointGrid:
+    """Buckets objects by a point position; used for collectibles and placement checks."""
+    
+    def __init__(self, width: float, height: float, cell_size: float):
+        self.cell_size = cell_size
+        self.columns = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.cells: List[List[Any]] = [[] for _ in range(self.columns * self.rows)]
+        
+    def clear(self) -> None:
+        for cell in self.cells:
+            cell.clear()
+            
+    def add(self, item: Any, x: float, y: float) -> None:
+        self.cells[self._cell(x, y)].append(item)
+        
+    def remove(self, item: Any, x: float, y: float) -> None:
+        """Remove item (by identity) from the cell of the position it was added at."""
+        cell = self.cells[self._cell(x, y)]
+        for i, other in enumerate(cell):
+            if other is item:
+                del cell[i]
+                return
+                
+    def move(self, item: Any, old_x: float, old_y: float, x: float, y: float) -> None:
+        old_cell = self._cell(old_x, old_y)
+        new_cell = self._cell(x, y)
+        if old_cell != new_cell:
+            self.remove(item, old_x, old_y)
+            self.cells[new_cell].append(item)
+            
+    def near(self, x: float, y: float, radius: float) -> List[Any]:
+        """Items in the cells within radius of a point, in no particular order."""
+        found: List[Any] = []
+        first_column = min(max(int((x - radius) // self.cell_size), 0), self.columns - 1)
+        last_column = min(max(int((x + radius) // self.cell_size), 0), self.columns - 1)
+        first_row = min(max(int((y - radius) // self.cell_size), 0), self.rows - 1)
+        last_row = min(max(int((y + radius) // self.cell_size), 0), self.rows - 1)
+        for row in range(first_row, last_row + 1):
+            start = row * self.columns
+            for column in range(first_column, last_column + 1):
+                found.extend(self.cells[start + column])
+        return found
+        
+    def _cell(self, x: float, y: float) -> int:
+        column = min(max(int(x // self.cell_size), 0), self.columns - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return row * self.columns + column
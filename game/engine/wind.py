@@ -0,0 +1,214 @@
+"""Coarse per-level wind field that pushes kites around the track."""
+from typing import Any, Dict, List, Sequence, Tuple
+import math
+import numpy as np
+
+WIND_CELL_SIZE = 100.0  # Spacing of the grid nodes, in pixels
+WIND_STEP = 0.25  # Simulated seconds between field updates
+GUST_WAVES = 3  # Travelling sine waves summed into the gust pattern
+GUST_SHARE = 0.5  # Gust amplitude relative to the prevailing wind speed
+RELAXATION = 0.35  # Fraction of the gap to prevailing wind plus gusts closed per step
+CLIENT_STRIDE = 2  # Clients get every second node along each axis
+CLIENT_EVERY = 2  # Steps between field versions sent to clients
+
+class WindField:
+    """Wind vectors on a node grid covering the world, evolved every WIND_STEP of simulated time."""
+
+    def __init__(self, width: float, height: float, strength: float, seed: int,
+                 cell_size: float = WIND_CELL_SIZE):
+        self.strength = strength  # Prevailing wind speed, pixels per second
+        self.seed = seed
+        self.cell_size = cell_size
+        self._inv_cell = 1.0 / cell_size
+        self.columns = int(math.ceil(width / cell_size)) + 1
+        self.rows = int(math.ceil(height / cell_size)) + 1
+        self.nodes = self.rows * self.columns
+        self._last_column = self.columns - 1.0
+        self._last_row = self.rows - 1.0
+        self._last = np.array([[self._last_column], [self._last_row]])
+        self._last_cell = np.array([[self.columns - 2], [self.rows - 2]], dtype=np.intp)
+        node_x, node_y = np.meshgrid(np.arange(self.columns) * cell_size,
+                                     np.arange(self.rows) * cell_size)
+        self._node_positions = np.array([node_x.ravel(), node_y.ravel()])
+        # Row 0 is the x component at every node, row-major; row 1 is y
+        self.field = np.zeros((2, self.nodes))
+        self._flat = self.field.ravel().tolist()  # Flat copy for scalar sampling
+        self.level = 0
+        self.steps = 0  # Steps taken since the level started
+        self.start = 0.0  # Clock time the level started at
+        self.next_time = 0.0
+
+    @property
+    def grid(self) -> Tuple[int, int, float]:
+        """Fields with the same grid can be stepped together."""
+        return self.rows, self.columns, self.cell_size
+
+    def reset(self, level: int, now: float) -> None:
+        """Draw the level's prevailing wind and gusts and start the field from them."""
+        # Seeded by (seed, level) rather than the room's rng, so replays and snapshots see the same wind
+        rng = np.random.default_rng((self.seed, level))
+        angle = rng.uniform(0.0, 2 * math.pi)
+        self._prevailing = np.array([[self.strength * math.cos(angle)],
+                                     [self.strength * math.sin(angle)]])
+
+        # Several grid cells per wavelength, so the downsampled client field still resolves it
+        wavelength = rng.uniform(600.0, 1600.0, GUST_WAVES)
+        heading = rng.uniform(0.0, 2 * math.pi, GUST_WAVES)
+        wavenumber = 2 * math.pi / wavelength
+        # Gusts travel at a fraction of the wind and blow within a radian of it
+        self._omega = (wavenumber * rng.uniform(0.2, 0.6, GUST_WAVES) * self.strength).tolist()
+        gust_angle = angle + rng.uniform(-1.0, 1.0, GUST_WAVES)
+        gust = self.strength * GUST_SHARE / GUST_WAVES * np.array([np.cos(gust_angle),
+                                                                   np.sin(gust_angle)])
+        self._gust = np.concatenate([gust, gust], axis=1)
+        # sin(a - wt) = sin(a)cos(wt) - cos(a)sin(wt): the node-dependent sines and cosines
+        # are taken once here, and a step only scales and sums them
+        spatial = (np.outer(wavenumber * np.cos(heading), self._node_positions[0]) +
+                   np.outer(wavenumber * np.sin(heading), self._node_positions[1]) +
+                   rng.uniform(0.0, 2 * math.pi, GUST_WAVES)[:, None])
+        self._basis = np.concatenate([np.sin(spatial), np.cos(spatial)])
+
+        self.level = level
+        self.steps = 0
+        self.start = now
+        self.next_time = now + WIND_STEP
+        self.field = WindField._targets([self])[0]
+        self._publish()
+
+    def _coefficients(self) -> np.ndarray:
+        """(2, 2 * GUST_WAVES) weights of the basis rows in the gust pattern at the current step."""
+        t = self.steps * WIND_STEP
+        phases = [omega * t for omega in self._omega]
+        weights = [math.cos(phase) for phase in phases] + [-math.sin(phase) for phase in phases]
+        return self._gust * np.array(weights)
+
+    @staticmethod
+    def _targets(fields: List['WindField']) -> np.ndarray:
+        """Prevailing wind plus gusts at each field's current step, as (field, 2, nodes)."""
+        target = np.stack([field._prevailing for field in fields])
+        coefficients = np.stack([field._coefficients() for field in fields])
+        basis = np.stack([field._basis for field in fields])
+        # Summed term by term in a fixed order, so any stack size gives the same values
+        for term in range(2 * GUST_WAVES):
+            target = target + coefficients[:, :, term, None] * basis[:, None, term]
+        return target
+
+    def advance(self, now: float) -> None:
+        """Take every step due by clock time now."""
+        WindField.advance_many([self], [now])
+
+    @staticmethod
+    def advance_many(fields: Sequence['WindField'], nows: Sequence[float]) -> None:
+        """advance() for many fields, each round of due steps taken for all of them at once."""
+        # A single field goes through the same stacked code, so batched and per-room
+        # stepping agree bit for bit
+        while True:
+            due: Dict[Tuple[int, int, float], List['WindField']] = {}
+            for field, now in zip(fields, nows):
+                if now >= field.next_time:
+                    due.setdefault(field.grid, []).append(field)
+            if not due:
+                return
+            for group in due.values():
+                WindField._evolve(group)
+
+    @staticmethod
+    def _evolve(fields: List['WindField']) -> None:
+        """One step for fields sharing a grid, stacked as (field, component, node) arrays."""
+        first = fields[0]
+        for field in fields:
+            field.steps += 1
+            field.next_time = field.start + (field.steps + 1) * WIND_STEP
+        current = np.stack([field.field for field in fields])
+        # Semi-Lagrangian advection: each node takes the wind found upstream of it, then
+        # relaxes towards the prevailing wind plus gusts
+        advected = first._interpolate(current, first._node_positions - current * WIND_STEP)
+        advected += (WindField._targets(fields) - advected) * RELAXATION
+        for field, values in zip(fields, advected):
+            field.field = values
+            field._publish()
+
+    def _interpolate(self, grids: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Bilinear samples of (F, 2, nodes) grids at (F, 2, N) positions, as (F, 2, N)."""
+        cell = np.clip(positions * self._inv_cell, 0.0, self._last)
+        index = np.minimum(cell.astype(np.intp), self._last_cell)
+        fraction = cell - index
+        top = index[:, 1] * self.columns + index[:, 0]
+        count = top.shape[1]
+        corners = np.concatenate([top, top + 1, top + self.columns, top + self.columns + 1], axis=1)
+        values = np.take_along_axis(grids, corners[:, None, :], axis=2)
+        top_left, top_right, bottom_left, bottom_right = (
+            values[:, :, corner * count:(corner + 1) * count] for corner in range(4))
+        tx = fraction[:, None, 0]
+        upper = top_left + (top_right - top_left) * tx
+        lower = bottom_left + (bottom_right - bottom_left) * tx
+        return upper + (lower - upper) * fraction[:, None, 1]
+
+    def _publish(self) -> None:
+        self._flat = self.field.ravel().tolist()
+
+    def sample(self, x: float, y: float) -> Tuple[float, float]:
+        """Wind at a point, bilinearly interpolated; points outside the grid get its edge."""
+        # Plain Python over the flat copy: four list lookups per component, no NumPy call overhead
+        fx = x * self._inv_cell
+        fy = y * self._inv_cell
+        if fx < 0.0:
+            fx = 0.0
+        elif fx > self._last_column:
+            fx = self._last_column
+        if fy < 0.0:
+            fy = 0.0
+        elif fy > self._last_row:
+            fy = self._last_row
+        column = min(int(fx), self.columns - 2)
+        row = min(int(fy), self.rows - 2)
+        tx = fx - column
+        ty = fy - row
+        top = row * self.columns + column
+        bottom = top + self.columns
+        flat = self._flat
+        u_top = flat[top] + (flat[top + 1] - flat[top]) * tx
+        u_bottom = flat[bottom] + (flat[bottom + 1] - flat[bottom]) * tx
+        top += self.nodes
+        bottom += self.nodes
+        v_top = flat[top] + (flat[top + 1] - flat[top]) * tx
+        v_bottom = flat[bottom] + (flat[bottom + 1] - flat[bottom]) * tx
+        return u_top + (u_bottom - u_top) * ty, v_top + (v_bottom - v_top) * ty
+
+    def sample_many(self, positions: np.ndarray) -> np.ndarray:
+        """sample() at the columns of a (2, N) position array, as a new (2, N) array."""
+        return self._interpolate(self.field[None], positions[None])[0]
+
+    @property
+    def client_version(self) -> Tuple[int, int]:
+        """Changes every CLIENT_EVERY steps and with the level; clients get the field when it does."""
+        return self.level, self.steps // CLIENT_EVERY
+
+    def to_client(self) -> Dict[str, Any]:
+        """Downsampled field, rounded to a tenth of a pixel per second."""
+        grid = self.field.reshape(2, self.rows, self.columns)[:, ::CLIENT_STRIDE, ::CLIENT_STRIDE]
+        grid = np.round(grid, 1)
+        return {
+            'columns': grid.shape[2],
+            'rows': grid.shape[1],
+            'cell_size': self.cell_size * CLIENT_STRIDE,
+            'u': grid[0].ravel().tolist(),
+            'v': grid[1].ravel().tolist()
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain values for snapshots; gusts are redrawn from the seed on restore."""
+        return {
+            'level': self.level,
+            'steps': self.steps,
+            'start': self.start,
+            'field': self._flat
+        }
+
+    def load(self, data: Dict[str, Any]) -> None:
+        """Inverse of to_dict, for a field built with the same world size, strength and seed."""
+        self.reset(data['level'], data['start'])
+        self.steps = data['steps']
+        self.next_time = self.start + (self.steps + 1) * WIND_STEP
+        self.field = np.array(data['field']).reshape(2, self.nodes)
+        self._publish()
@@ -0,0 +1,42 @@
+"""World dimensions shared by the track, physics bounds, renderer and client."""
+from typing import Dict, Any, Optional
+
+# The original fixed playfield; obstacle counts are tuned for this area
+BASE_WIDTH = 800.0
+BASE_HEIGHT = 600.0
+
+class WorldConfig:
+    def __init__(self, width: float = BASE_WIDTH, height: float = BASE_HEIGHT,
+                 view_width: float = BASE_WIDTH, view_height: float = BASE_HEIGHT,
+                 cell_size: float = 200.0, wind: float = 0.0):
+        self.width = float(width)
+        self.height = float(height)
+        self.view_width = float(view_width)  # Area the camera shows around the player
+        self.view_height = float(view_height)
+        self.cell_size = float(cell_size)  # Spatial grid cell edge
+        self.wind = float(wind)  # Prevailing wind speed in pixels per second; 0 means no wind field
+        
+    @property
+    def area_scale(self) -> float:
+        """World area relative to the original playfield."""
+        return (self.width * self.height) / (BASE_WIDTH * BASE_HEIGHT)
+        
+    @property
+    def fits_view(self) -> bool:
+        """True when the whole world is visible at once and no culling is needed."""
+        return self.width <= self.view_width and self.height <= self.view_height
+        
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'width': self.width,
+            'height': self.height,
+            'view_width': self.view_width,
+            'view_height': self.view_height,
+            'cell_size': self.cell_size,
+            'wind': self.wind
+        }
+        
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'WorldConfig':
+        """Inverse of to_dict; a missing config means the default world."""
+        return cls(**data) if data else cls()
@@ -7,6 +7,13 @@ class GameEntity:
         self.velocity_x = 0.0
         self.velocity_y = 0.0
         
+    def reset(self, x: float, y: float) -> None:
+        """Reinitialise a pooled entity at a new position."""
+        self.x = x
+        self.y = y
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+        
     def update(self, dt: float) -> None:
         """Update entity state based on time delta."""
         self.x += self.velocity_x * dt
@@ -1,4 +1,6 @@
+import math
 import random
+from typing import Optional
 from .base import GameEntity
 
 class Obstacle(GameEntity):
@@ -13,15 +15,36 @@ class PalmTree(Obstacle):
     def __init__(self, x: float, y: float):
         super().__init__(x, y, width=40, height=60)
         
+# Spreads wave phases by position instead of drawing from the level rng, which
+# keeps every seed's level layout unchanged
+_PHASE_SPREAD = (math.sqrt(5) - 1) / 2
+
 class Wave(Obstacle):
-    def __init__(self, x: float, y: float):
+    """Rolls back and forth over [origin_x, origin_x + distance], peaking at speed.
+    
+    Only clients animate it, from the parameters sent with the level; on the
+    server x stays at origin_x and the water under the whole travel range is
+    what slows buggies down.
+    """
+    def __init__(self, x: float, y: float, rng: Optional[random.Random] = None):
         super().__init__(x, y, width=80, height=20)
-        self.speed = random.uniform(50, 100)
-        self.distance = random.uniform(100, 200)
+        self._roll(x, rng)
+        
+    def reset(self, x: float, y: float, rng: Optional[random.Random] = None) -> None:
+        """Reinitialise a pooled wave, drawing from rng exactly as __init__ does."""
+        super().reset(x, y)
+        self._roll(x, rng)
+        
+    def _roll(self, x: float, rng: Optional[random.Random]) -> None:
+        rng = rng or random
+        self.speed = rng.uniform(50, 100)
+        self.distance = rng.uniform(100, 200)
         self.origin_x = x
+        self.phase = 2 * math.pi * ((x + self.y) * _PHASE_SPREAD % 1.0)
         
-    def update(self, dt: float) -> None:
-        """Move wave back and forth."""
-        self.x = self.origin_x + self.distance * \
-                 (0.5 + 0.5 * (self.x / self.distance % 1.0))
-        super().update(dt)
\ No newline at end of file
+    def render(self) -> dict:
+        """Return render data with the motion parameters clients animate from."""
+        data = super().render()
+        data.update(origin_x=self.origin_x, distance=self.distance,
+                    speed=self.speed, phase=self.phase)
+        return data
\ No newline at end of file
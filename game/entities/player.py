@@ -1,13 +1,18 @@
-from typing import Dict, Set
+from typing import Dict, Set, Optional, Tuple
+import math
 from .base import GameEntity
 
 class BeachBuggy(GameEntity):
-    def __init__(self, x: float, y: float):
+    def __init__(self, x: float, y: float, bounds_width: float = 800, bounds_height: float = 600):
         super().__init__(x, y, width=40, height=60)
+        self.bounds_width = bounds_width  # World size the car is kept inside
+        self.bounds_height = bounds_height
         self.speed = 200.0  # pixels per second
         self.acceleration = 400.0  # pixels per second squared
         self.max_speed = 400.0
         self.rotation = 0.0  # degrees
+        self._heading_rotation = None  # Rotation the cached heading was computed for
+        self._heading = (0.0, 1.0)
         self.turn_speed = 180.0  # degrees per second
         self.is_shielded = False
         self.boost_time = 0.0
@@ -29,36 +34,43 @@ class BeachBuggy(GameEntity):
         # Normalize rotation to 0-360 degrees
         self.rotation = self.rotation % 360
         
+    def heading(self) -> Tuple[float, float]:
+        """Unit (sin, cos) of the rotation, recomputed only when rotation changes."""
+        if self.rotation != self._heading_rotation:
+            rad = math.radians(self.rotation)
+            self._heading = (math.sin(rad), math.cos(rad))
+            self._heading_rotation = self.rotation
+        return self._heading
+        
     def _accelerate(self, dt: float) -> None:
         """Apply acceleration in current direction."""
-        import math
-        rad = math.radians(self.rotation)
+        sin_r, cos_r = self.heading()
         
         # Update velocities based on rotation
-        self.velocity_x += math.sin(rad) * self.acceleration * dt
-        self.velocity_y -= math.cos(rad) * self.acceleration * dt
+        self.velocity_x += sin_r * self.acceleration * dt
+        self.velocity_y -= cos_r * self.acceleration * dt
         
-        # Cap speed
-        speed = math.sqrt(self.velocity_x**2 + self.velocity_y**2)
-        if speed > self.max_speed:
-            scale = self.max_speed / speed
+        # Cap speed; compare squared speeds so the common uncapped case skips sqrt
+        speed_sq = self.velocity_x * self.velocity_x + self.velocity_y * self.velocity_y
+        if speed_sq > self.max_speed * self.max_speed:
+            scale = self.max_speed / math.sqrt(speed_sq)
             self.velocity_x *= scale
             self.velocity_y *= scale
             
-    def apply_physics(self, dt: float) -> None:
+    def apply_physics(self, dt: float, damping: Optional[float] = None) -> None:
         """Apply friction and bounds checking."""
-        # Apply friction
-        friction = 0.95
-        self.velocity_x *= friction ** dt
-        self.velocity_y *= friction ** dt
+        # Apply friction; the caller passes the factor for the surface underneath
+        if damping is None:
+            damping = 0.95 ** dt
+        self.velocity_x *= damping
+        self.velocity_y *= damping
         
         # Update position
         super().update(dt)
         
-        # Apply boundary constraints (keep car on screen)
-        # These should match the canvas size from the client
-        canvas_width = 800
-        canvas_height = 600
+        # Apply boundary constraints (keep car inside the world)
+        canvas_width = self.bounds_width
+        canvas_height = self.bounds_height
         
         # Keep car within bounds
         half_width = self.width / 2
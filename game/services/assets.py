@@ -0,0 +1,145 @@
+"""Fingerprinted, precompressed static assets.
+
+Build with: python -m game.services.assets [static_dir] [out_dir]
+
+Each asset is written as name.<hash>.ext next to .gz and, when the brotli
+package is installed, .br copies, and manifest.json maps the plain names to
+the hashed ones. Since a hashed URL never changes content, AssetBundle serves
+it with a year-long immutable Cache-Control and the hash as ETag.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # Optional; without it only gzip copies are built
+    brotli = None
+
+log = logging.getLogger(__name__)
+
+# Served assets, relative to the static directory, in build order
+ASSETS = ('css/style.css', 'js/state_decoder.js', 'js/state_worker.js', 'js/client.js')
+# Assets that load others by relative URL; those must be built first so the
+# references can be rewritten to hashed names, and the hash covers them
+REFERENCES = {'js/state_worker.js': ('js/state_decoder.js',)}
+
+MANIFEST = 'manifest.json'
+HASH_LENGTH = 12
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Preferred first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def hashed_name(name: str, digest: str) -> str:
+    root, ext = os.path.splitext(name)
+    return f'{root}.{digest[:HASH_LENGTH]}{ext}'
+
+def build(static_dir: str, out_dir: str) -> Dict[str, str]:
+    """Write hashed and precompressed copies of ASSETS and the manifest; returns the manifest."""
+    manifest: Dict[str, str] = {}
+    for name in ASSETS:
+        with open(os.path.join(static_dir, name), 'rb') as f:
+            content = f.read()
+        for dependency in REFERENCES.get(name, ()):
+            # Relative URLs resolve against the referring asset's own, hashed, URL
+            old = os.path.basename(dependency).encode()
+            new = os.path.basename(manifest[dependency]).encode()
+            content = content.replace(b"'" + old + b"'", b"'" + new + b"'")
+        digest = hashlib.sha256(content).hexdigest()
+        manifest[name] = hashed_name(name, digest)
+
+        path = os.path.join(out_dir, manifest[name])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+        # mtime=0 keeps the gzip output a function of the content alone
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(content, 9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(content, quality=11))
+
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+class Asset:
+    """One hashed asset with its encoded variants, held in memory."""
+    def __init__(self, path: str):
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        # The file name carries a hash of the content, so it doubles as the ETag
+        self.etag = os.path.basename(path)
+        self.variants: List[Tuple[Optional[str], bytes]] = []
+        for encoding, suffix in ENCODINGS:
+            if os.path.exists(path + suffix):
+                with open(path + suffix, 'rb') as f:
+                    self.variants.append((encoding, f.read()))
+        with open(path, 'rb') as f:
+            self.variants.append((None, f.read()))
+
+    def select(self, accepted) -> Tuple[Optional[str], bytes]:
+        """Best variant for a request's Accept-Encoding."""
+        for encoding, body in self.variants:
+            if encoding is None or accepted[encoding]:
+                return encoding, body
+        return self.variants[-1]
+
+class AssetBundle:
+    """Serves a build's assets from memory; urls fall back to /static without one."""
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.manifest: Dict[str, str] = {}
+        self.assets: Dict[str, Asset] = {}
+        manifest_path = os.path.join(out_dir, MANIFEST)
+        if not os.path.exists(manifest_path):
+            log.warning('static assets not built, serving them unhashed',
+                        extra={'fields': {'path': out_dir}})
+            return
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        for hashed in self.manifest.values():
+            self.assets[hashed] = Asset(os.path.join(out_dir, hashed))
+
+    def url(self, name: str, prefix: str, fallback: str) -> str:
+        """URL of an asset: its hashed name under prefix if built, else fallback."""
+        hashed = self.manifest.get(name)
+        return f'{prefix}/{hashed}' if hashed is not None else fallback
+
+    def response(self, request: Any, response_class: Any, filename: str) -> Any:
+        """Response for a hashed asset: the best encoding, or 304 if the client has it.
+
+        Returns None for names that are not in the build.
+        """
+        asset = self.assets.get(filename)
+        if asset is None:
+            return None
+        encoding, body = asset.select(request.accept_encodings)
+        # Each encoding is its own representation and needs its own tag
+        etag = asset.etag + ('-' + encoding if encoding else '')
+        headers = {'Cache-Control': IMMUTABLE, 'Vary': 'Accept-Encoding'}
+        if request.if_none_match.contains_weak(etag):
+            response = response_class(status=304, headers=headers)
+        else:
+            response = response_class(body, mimetype=asset.mimetype, headers=headers)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        return response
+
+def main() -> None:
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(root, 'static')
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(static_dir, 'dist')
+    manifest = build(static_dir, out_dir)
+    for name, hashed in sorted(manifest.items()):
+        print(f"{name:>22} -> {hashed}")
+    if brotli is None:
+        print("brotli is not installed; built gzip copies only")
+
+if __name__ == '__main__':
+    main()
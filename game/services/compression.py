@@ -0,0 +1,169 @@
+"""Per-message WebSocket compression: deflate large payloads, send small ones as they are."""
+from typing import Any, Dict, List, Optional
+import logging
+import time
+import zlib
+from eventlet.websocket import RFC6455WebSocket
+
+log = logging.getLogger(__name__)
+
+# Message classes, told apart by the Socket.IO event name and whether a game_state
+# carries the obstacle layout
+KEYFRAME = 'keyframe'  # game_state with the layout: on connect, new game and level change
+DELTA = 'delta'  # Per-tick game_state without the layout
+EVENT = 'event'  # game_events notifications
+OTHER = 'other'  # Pings, session and anything else
+MESSAGE_CLASSES = (KEYFRAME, DELTA, EVENT, OTHER)
+
+MODES = ('auto', 'always', 'off')
+
+# Private eventlet and python-engineio hooks the policy relies on; tested with
+# eventlet 0.41 and python-engineio 4.14, and checked by install() before use
+SOCKET_HOOKS = ('_get_permessage_deflate_enc', '_pack_message')
+WSGI_HOOKS = ('_handle_hybi_request',)
+
+def classify(message: Any) -> str:
+    """Message class of an encoded Engine.IO packet as it goes to the socket."""
+    if not isinstance(message, str):
+        return OTHER
+    if message.startswith('42["game_state"'):
+        return KEYFRAME if '"entities":' in message else DELTA
+    if message.startswith('42["game_events"'):
+        return EVENT
+    return OTHER
+
+class ClassStats:
+    """Sizes and packing time of the messages of one class."""
+    def __init__(self):
+        self.messages = 0
+        self.compressed = 0
+        self.raw_bytes = 0
+        self.wire_bytes = 0  # Frames as sent, headers included
+        self.seconds = 0.0  # Time spent framing, and deflating if compressed
+        self.compress_seconds = 0.0
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'messages': self.messages,
+            'compressed': self.compressed,
+            'raw_bytes': self.raw_bytes,
+            'wire_bytes': self.wire_bytes,
+            'ratio': round(self.wire_bytes / self.raw_bytes, 4) if self.raw_bytes else 1.0,
+            'cpu_ms': round(self.seconds * 1000, 3),
+            'us_per_message': round(self.seconds / self.messages * 1e6, 2) if self.messages else 0.0,
+            'us_per_compressed': (round(self.compress_seconds / self.compressed * 1e6, 2)
+                                  if self.compressed else 0.0)
+        }
+
+class CompressionPolicy:
+    """Decides per message whether a permessage-deflate connection compresses it."""
+    def __init__(self, mode: str = 'auto', min_size: int = 512, level: int = 1):
+        if mode not in MODES:
+            raise ValueError(f"unknown compression mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.min_size = min_size
+        self.level = level
+        self.stats = {name: ClassStats() for name in MESSAGE_CLASSES}
+
+    def should_compress(self, size: int) -> bool:
+        # 'auto' sends small messages uncompressed, which RFC 7692 allows on a deflate
+        # connection; 'always' deflates everything, as eventlet does by default
+        if self.mode == 'auto':
+            return size >= self.min_size
+        return self.mode == 'always'
+
+    def record(self, message_class: str, raw_bytes: int, wire_bytes: int,
+               seconds: float, compressed: bool) -> None:
+        stats = self.stats[message_class]
+        stats.messages += 1
+        stats.raw_bytes += raw_bytes
+        stats.wire_bytes += wire_bytes
+        stats.seconds += seconds
+        if compressed:
+            stats.compressed += 1
+            stats.compress_seconds += seconds
+
+    def report(self) -> Dict[str, Any]:
+        raw = sum(stats.raw_bytes for stats in self.stats.values())
+        wire = sum(stats.wire_bytes for stats in self.stats.values())
+        return {
+            'mode': self.mode,
+            'min_size': self.min_size,
+            'level': self.level,
+            'raw_bytes': raw,
+            'wire_bytes': wire,
+            'saved_bytes': raw - wire,
+            'classes': {name: stats.report() for name, stats in self.stats.items()}
+        }
+
+    def install(self, eio_server: Any) -> bool:
+        """Serve this Engine.IO server's WebSocket connections through the policy.
+
+        Returns False, leaving the stock driver in place, if the eventlet or
+        engineio internals it hooks into are missing.
+        """
+        missing = _missing_hooks(eio_server)
+        if missing:
+            log.warning('websocket compression policy not installed, using the stock driver',
+                        extra={'fields': {'missing': missing}})
+            return False
+        from engineio.async_drivers.eventlet import WebSocketWSGI
+        policy = self
+
+        class PolicyWebSocketWSGI(WebSocketWSGI):
+            def _handle_hybi_request(self, environ):
+                ws = super()._handle_hybi_request(environ)
+                # eventlet builds the socket itself; adopt it once the handshake is done
+                ws.__class__ = PolicyWebSocket
+                ws.policy = policy
+                ws.deflate_next = False
+                return ws
+
+        # A copy, so other servers in the process keep the stock driver
+        eio_server._async = dict(eio_server._async, websocket=PolicyWebSocketWSGI)
+        return True
+
+def _missing_hooks(eio_server: Any) -> List[str]:
+    """Names of the internals install() needs that this eventlet/engineio lacks."""
+    try:
+        from engineio.async_drivers.eventlet import WebSocketWSGI
+    except ImportError:
+        return ['engineio.async_drivers.eventlet.WebSocketWSGI']
+    missing = ['RFC6455WebSocket.' + name for name in SOCKET_HOOKS
+               if not callable(getattr(RFC6455WebSocket, name, None))]
+    missing += ['WebSocketWSGI.' + name for name in WSGI_HOOKS
+                if not callable(getattr(WebSocketWSGI, name, None))]
+    drivers = getattr(eio_server, '_async', None)
+    if not isinstance(drivers, dict) or 'websocket' not in drivers:
+        missing.append('Server._async')
+    return missing
+
+class PolicyWebSocket(RFC6455WebSocket):
+    """eventlet WebSocket that compresses only what its policy asks for."""
+    policy: Optional[CompressionPolicy] = None
+    deflate_next = False
+
+    def _get_permessage_deflate_enc(self):
+        options = self.extensions.get('permessage-deflate')
+        if options is None or not self.deflate_next:
+            return None
+        if self._deflate_enc is None or options.get('server_no_context_takeover'):
+            # The window carries over between messages, so a state repeating most of the
+            # previous one shrinks to a few percent
+            self._deflate_enc = zlib.compressobj(
+                self.policy.level, zlib.DEFLATED,
+                -options.get('server_max_window_bits', zlib.MAX_WBITS))
+        return self._deflate_enc
+
+    def _pack_message(self, message, masked=False, continuation=False, final=True, control_code=None):
+        if control_code or self.policy is None:
+            self.deflate_next = False
+            return super()._pack_message(message, masked, continuation, final, control_code)
+        # Engine.IO packets are ASCII JSON, so characters count bytes
+        size = len(message)
+        self.deflate_next = compressed = (self.policy.should_compress(size)
+                                          and 'permessage-deflate' in self.extensions)
+        started = time.perf_counter()
+        frame = super()._pack_message(message, masked, continuation, final, control_code)
+        self.policy.record(classify(message), size, len(frame), time.perf_counter() - started, compressed)
+        return frame
@@ -0,0 +1,98 @@
+"""Keep the cyclic garbage collector from eating into the game loop's tick budget."""
+from typing import Optional, Tuple
+import gc
+import time
+from .metrics import Metrics
+
+GC_MODES = ('default', 'tuned')
+
+# Far fewer young collections; each one still stays small because the
+# long-lived startup objects are frozen out of the generations
+TUNED_THRESHOLDS = (20000, 20, 20)
+
+# A generation is collected early during idle slack once it is this far towards its threshold
+SLACK_COLLECT_FRACTION = 0.5
+
+# Assumed pause for a generation that has not been collected yet
+DEFAULT_PAUSE_ESTIMATE = 0.002
+
+class GCTuner:
+    def __init__(self, metrics: Metrics, mode: str = 'default',
+                 thresholds: Tuple[int, int, int] = TUNED_THRESHOLDS,
+                 idle_collect: bool = False):
+        if mode not in GC_MODES:
+            raise ValueError(f"Unknown GC mode {mode!r}, expected one of {GC_MODES}")
+        self.metrics = metrics
+        self.mode = mode
+        self.thresholds = thresholds
+        self.idle_collect = idle_collect  # Run due collections in the sleep at the end of a tick
+        self._previous_thresholds = gc.get_threshold()
+        self._started = 0.0
+        self._in_slack = False
+        self._pause_time = 0.0  # Pause seconds since the last take_pause_time()
+        self._worst_pause = [0.0, 0.0, 0.0]
+        
+    def install(self) -> None:
+        """Start reporting pauses and, in tuned mode, freeze startup objects and raise thresholds.
+
+        Call once startup allocations (imports, restored rooms, caches) are done.
+        """
+        if self.mode == 'tuned':
+            gc.collect()
+            gc.freeze()
+            gc.set_threshold(*self.thresholds)
+            self.metrics.set_gauge('gc.frozen_objects', gc.get_freeze_count())
+        gc.callbacks.append(self._on_gc)
+            
+    def uninstall(self) -> None:
+        """Undo install(), e.g. between benchmark runs."""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self.mode == 'tuned':
+            gc.unfreeze()
+            gc.set_threshold(*self._previous_thresholds)
+            
+    def take_pause_time(self) -> float:
+        """Seconds spent collecting since the previous call."""
+        pause, self._pause_time = self._pause_time, 0.0
+        return pause
+        
+    def collect_in_slack(self, slack: float) -> bool:
+        """Run a collection that is due soon if it should fit in the idle time left in this tick."""
+        if not self.idle_collect:
+            return False
+        generation = self._due_generation()
+        if generation is None:
+            return False
+        estimate = self._worst_pause[generation] or DEFAULT_PAUSE_ESTIMATE
+        if estimate > slack:
+            return False
+        self._in_slack = True
+        try:
+            gc.collect(generation)
+        finally:
+            self._in_slack = False
+        return True
+        
+    def _due_generation(self) -> Optional[int]:
+        """Oldest generation that is far enough towards its threshold to collect early."""
+        counts = gc.get_count()
+        thresholds = gc.get_threshold()
+        for generation in (2, 1, 0):
+            if counts[generation] >= thresholds[generation] * SLACK_COLLECT_FRACTION:
+                return generation
+        return None
+        
+    def _on_gc(self, phase: str, info: dict) -> None:
+        if phase == 'start':
+            self._started = time.perf_counter()
+            return
+        pause = time.perf_counter() - self._started
+        generation = info['generation']
+        self._pause_time += pause
+        if pause > self._worst_pause[generation]:
+            self._worst_pause[generation] = pause
+        where = 'slack' if self._in_slack else 'automatic'
+        self.metrics.observe(f'gc.pause.gen{generation}', pause)
+        self.metrics.increment(f'gc.collections.{where}')
+        self.metrics.increment('gc.collected', info['collected'])
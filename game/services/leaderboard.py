@@ -0,0 +1,90 @@
+"""Persistent high-score leaderboard backed by SQLite."""
+from typing import List, Dict, Any, Tuple
+from collections import deque
+import bisect
+import sqlite3
+import threading
+import time
+
+class Leaderboard:
+    def __init__(self, path: str = 'leaderboard.db', cache_size: int = 100):
+        self.path = path
+        self.cache_size = cache_size
+        
+        # Finished games waiting to be written by flush()
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        
+        # Top scores kept sorted by (-score, finished_at) so reads never touch disk
+        self._keys: List[Tuple[int, float]] = []
+        self._entries: List[Dict[str, Any]] = []
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS scores ('
+            'id INTEGER PRIMARY KEY, name TEXT NOT NULL, score INTEGER NOT NULL, '
+            'level INTEGER NOT NULL, finished_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC)')
+        self._conn.commit()
+        self._load_cache()
+        
+    def _load_cache(self) -> None:
+        """Warm the in-memory cache with the best stored scores."""
+        rows = self._conn.execute(
+            'SELECT name, score, level, finished_at FROM scores '
+            'ORDER BY score DESC, finished_at ASC LIMIT ?', (self.cache_size,)
+        ).fetchall()
+        for name, score, level, finished_at in rows:
+            self._insert_cached({'name': name, 'score': score, 'level': level,
+                                 'finished_at': finished_at})
+            
+    def _insert_cached(self, entry: Dict[str, Any]) -> None:
+        """Insert an entry into the sorted cache, dropping whatever falls off the end."""
+        key = (-entry['score'], entry['finished_at'])
+        if len(self._keys) >= self.cache_size and key >= self._keys[-1]:
+            return
+        index = bisect.bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._entries.insert(index, entry)
+        if len(self._keys) > self.cache_size:
+            self._keys.pop()
+            self._entries.pop()
+            
+    def submit(self, name: str, score: int, level: int) -> None:
+        """Record a finished game; the disk write is deferred to flush()."""
+        entry = {'name': name, 'score': score, 'level': level, 'finished_at': time.time()}
+        self._queue.append(entry)
+        self._insert_cached(entry)
+        
+    def top(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the best scores from the in-memory cache."""
+        return [dict(entry) for entry in self._entries[:limit]]
+        
+    def flush(self) -> int:
+        """Write all queued games in a single transaction; a failed batch is queued again."""
+        with self._lock:
+            batch = []
+            while self._queue:
+                batch.append(self._queue.popleft())
+            if not batch:
+                return 0
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT INTO scores (name, score, level, finished_at) VALUES (?, ?, ?, ?)',
+                        [(e['name'], e['score'], e['level'], e['finished_at']) for e in batch]
+                    )
+            except sqlite3.Error:
+                # Ahead of anything submitted meanwhile, so the next flush keeps the order
+                self._queue.extendleft(reversed(batch))
+                raise
+            return len(batch)
+            
+    def close(self) -> None:
+        """Flush outstanding writes and close the database."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,64 @@
+"""In-process counters, gauges and rolling timings, served as JSON at /metrics."""
+from typing import Dict, Any
+from collections import deque
+
+class Timing:
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque = deque(maxlen=window)  # Newest samples, for percentiles
+        
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+        
+    def summary(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        def percentile(fraction: float) -> float:
+            return recent[min(int(len(recent) * fraction), len(recent) - 1)] * 1000 if recent else 0.0
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+            'p50_ms': percentile(0.5),
+            'p99_ms': percentile(0.99)
+        }
+
+class Metrics:
+    """Process-wide metrics registry.
+
+    There is deliberately no lock: gc callbacks record into it and can fire
+    inside any allocation, including one made while a lock would be held.
+    Each update is a few operations under the GIL, which is good enough for
+    monitoring.
+    """
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self.timings: Dict[str, Timing] = {}
+        
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+        
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+        
+    def observe(self, name: str, seconds: float) -> None:
+        """Record one duration sample."""
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing(self.window)
+        timing.add(seconds)
+        
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+            'timings': {name: timing.summary() for name, timing in list(self.timings.items())}
+        }
@@ -0,0 +1,196 @@
+"""Per-session game rooms with snapshot-based restore across restarts."""
+from typing import Dict, Set, Optional, List, Tuple
+import re
+import secrets
+import time
+from ..core.events import EventBus
+from ..core.game_state import GameState
+from ..core.snapshot import SnapshotStore, encode_state, decode_state, write_snapshots
+from ..engine.world import WorldConfig
+
+_TOKEN_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Room activity states. Only active and idle rooms are stepped and broadcast;
+# idle ones at IDLE_TICK_RATE, and paused ones keep their clock stopped until a client returns
+ACTIVE = 'active'
+IDLE = 'idle'
+PAUSED = 'paused'  # No clients connected
+FINISHED = 'finished'  # Game over; the final state has already gone out
+
+IDLE_TICK_RATE = 10  # Ticks per second for rooms where nothing moves
+HIBERNATE_AFTER = 300.0  # Seconds without clients before a room is compacted to a snapshot blob
+ROOM_TTL = 24 * 3600.0  # Seconds without clients before a hibernated or snapshotted room is dropped
+
+class Room:
+    def __init__(self, token: str, state: Optional[GameState] = None,
+                 world: Optional[WorldConfig] = None, bots: int = 0,
+                 events: Optional[EventBus] = None):
+        self.token = token
+        self.world = world
+        self.bots = bots  # Computer opponents in each new game
+        self.events = events  # Game events are published with the room token as source
+        self.state = state or GameState(record=True, world=world, bots=bots)
+        self._attach_events()
+        self.clients: Set[str] = set()
+        self.finished = False  # Set once the run was handed to leaderboard/verification
+        self.sent_layout: Optional[int] = None  # layout_version last broadcast to the room
+        self.sent_wind: Optional[Tuple[int, int]] = None  # wind.client_version last broadcast
+        self.pending_frames = 0  # Frames elapsed since an idle room was last stepped
+        self.empty_since: Optional[float] = None  # time.monotonic() when the last client left
+
+    def reset(self) -> None:
+        """Start a fresh game in this room."""
+        self.state = GameState(record=True, world=self.world, bots=self.bots)
+        self._attach_events()
+        self.finished = False
+        self.sent_layout = None
+        self.sent_wind = None
+        self.pending_frames = 0
+        
+    def _attach_events(self) -> None:
+        if self.events is not None:
+            self.state.events = self.events.publisher(self.token)
+            
+    def activity(self) -> str:
+        if self.state.game_over:
+            return FINISHED
+        if not self.clients:
+            return PAUSED
+        if self.state.is_idle():
+            return IDLE
+        return ACTIVE
+        
+    def catch_up(self, frame_time: float) -> None:
+        """Step the frames an idle room has skipped, so new input applies from now on."""
+        if self.pending_frames and not self.state.game_over:
+            self.state.update(self.pending_frames * frame_time)
+        self.pending_frames = 0
+
+class RoomManager:
+    def __init__(self, snapshots: Optional[SnapshotStore] = None,
+                 world: Optional[WorldConfig] = None, bots: int = 0,
+                 events: Optional[EventBus] = None):
+        self.rooms: Dict[str, Room] = {}
+        self.snapshots = snapshots
+        self.world = world  # Size of newly created worlds; restored rooms keep their own
+        self.bots = bots
+        self.events = events
+        # token -> (snapshot blob, wall-clock time its last client left) of a long-empty room
+        self.hibernated: Dict[str, Tuple[bytes, float]] = {}
+        self.activity_counts: Dict[str, int] = {}  # Rooms per activity state at the last schedule()
+        self._sessions: Dict[str, str] = {}  # socket id -> room token
+
+    @staticmethod
+    def new_token() -> str:
+        return secrets.token_hex(16)
+
+    @staticmethod
+    def is_valid_token(token: Optional[str]) -> bool:
+        return isinstance(token, str) and bool(_TOKEN_PATTERN.match(token))
+
+    def join(self, token: Optional[str], sid: str) -> Room:
+        """Attach a client to its room, restoring it from the last snapshot if needed."""
+        if not self.is_valid_token(token):
+            token = self.new_token()
+
+        room = self.rooms.get(token)
+        if room is None:
+            hibernated = self.hibernated.pop(token, None)
+            if hibernated is not None:
+                state = decode_state(hibernated[0])
+            else:
+                state = self.snapshots.pop(token) if self.snapshots else None
+            room = Room(token, state, self.world, self.bots, self.events)
+            self.rooms[token] = room
+
+        room.clients.add(sid)
+        room.empty_since = None
+        self._sessions[sid] = token
+        return room
+
+    def leave(self, sid: str) -> Optional[Room]:
+        """Detach a client; finished rooms without clients are dropped."""
+        token = self._sessions.pop(sid, None)
+        room = self.rooms.get(token) if token else None
+        if room is None:
+            return None
+        room.clients.discard(sid)
+        if not room.clients:
+            room.empty_since = time.monotonic()
+            if room.state.game_over:
+                del self.rooms[token]
+        return room
+
+    def discard(self, room: Room) -> None:
+        """Drop a room that no client can return to."""
+        self.rooms.pop(room.token, None)
+
+    def room_for(self, sid: str) -> Optional[Room]:
+        token = self._sessions.get(sid)
+        return self.rooms.get(token) if token else None
+
+    def schedule(self, frames: int, idle_frames: int) -> Tuple[List[Room], List[Tuple[Room, int]]]:
+        """Rooms to step this tick: active ones, and idle ones due with the frames they cover.
+
+        frames is how many frames the tick advances; an idle room is stepped once
+        it has built up idle_frames. Paused and finished rooms are skipped. Input
+        for an idle room should go through Room.catch_up() first.
+        """
+        active: List[Room] = []
+        idle: List[Tuple[Room, int]] = []
+        counts = {ACTIVE: 0, IDLE: 0, PAUSED: 0, FINISHED: 0}
+        for room in self.rooms.values():
+            activity = room.activity()
+            counts[activity] += 1
+            if activity == ACTIVE:
+                active.append(room)
+            elif activity == IDLE:
+                room.pending_frames += frames
+                if room.pending_frames >= idle_frames:
+                    idle.append((room, room.pending_frames))
+                    room.pending_frames = 0
+            else:
+                room.pending_frames = 0
+        counts['hibernated'] = len(self.hibernated)
+        self.activity_counts = counts
+        return active, idle
+
+    def hibernate(self, after: float = HIBERNATE_AFTER) -> int:
+        """Compact rooms that have had no clients for `after` seconds into snapshot blobs."""
+        now = time.monotonic()
+        expired = [room for room in self.rooms.values()
+                   if room.empty_since is not None and now - room.empty_since >= after]
+        for room in expired:
+            del self.rooms[room.token]
+            if not room.state.game_over:
+                self.hibernated[room.token] = (encode_state(room.state), self._left_at(room))
+        return len(expired)
+
+    def expire(self, max_age: float = ROOM_TTL) -> int:
+        """Drop hibernated rooms and unclaimed snapshots whose clients left over max_age seconds ago."""
+        before = time.time() - max_age
+        expired = [token for token, (_, left_at) in self.hibernated.items() if left_at < before]
+        for token in expired:
+            del self.hibernated[token]
+        return len(expired) + (self.snapshots.expire(before) if self.snapshots else 0)
+
+    @staticmethod
+    def _left_at(room: Room) -> float:
+        """Wall-clock time a room's last client left; now if it still has clients."""
+        if room.empty_since is None:
+            return time.time()
+        return time.time() - (time.monotonic() - room.empty_since)
+
+    def dump(self, path: str) -> int:
+        """Snapshot every in-progress room, plus rooms never reclaimed since the last restart."""
+        blobs = self.snapshots.remaining_blobs() if self.snapshots else {}
+        saved_at = dict(self.snapshots.saved_at) if self.snapshots else {}
+        for token, (blob, left_at) in self.hibernated.items():
+            blobs[token] = blob
+            saved_at[token] = left_at
+        for token, room in self.rooms.items():
+            if not room.state.game_over:
+                blobs[token] = encode_state(room.state)
+                saved_at[token] = self._left_at(room)
+        write_snapshots(path, blobs, saved_at)
+        return len(blobs)
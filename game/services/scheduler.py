@@ -0,0 +1,98 @@
+"""Spreads room ticks across the frame so the eventlet hub gets to run socket I/O in between."""
+from typing import Any, Callable, Dict, List, Tuple
+import time
+
+UTILIZATION_SMOOTHING = 0.05  # Weight of the newest frame in the running utilization average
+
+class Bucket:
+    """One phase slot of the frame and the rooms ticked in it."""
+    def __init__(self, index: int, batch: Any):
+        self.index = index
+        self.batch = batch  # Own batch per bucket, so its padded layout stays cached between frames
+        self.rooms = 0
+        self.utilization = 0.0  # Smoothed share of the slot spent stepping and broadcasting
+        self.peak_utilization = 0.0
+        self.overruns = 0  # Frames in which stepping took longer than the slot
+        self.skipped_broadcasts = 0  # Room updates not sent because of an overrun
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'bucket': self.index,
+            'rooms': self.rooms,
+            'utilization': round(self.utilization, 4),
+            'peak_utilization': round(self.peak_utilization, 4),
+            'overruns': self.overruns,
+            'skipped_broadcasts': self.skipped_broadcasts
+        }
+
+class TickScheduler:
+    """Steps rooms in phase-offset buckets, one slot of the frame each."""
+    def __init__(self, buckets: int, frame_time: float, make_batch: Callable[[], Any],
+                 sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.time):
+        self.frame_time = frame_time
+        self.slot = frame_time / buckets
+        self.buckets = [Bucket(index, make_batch()) for index in range(buckets)]
+        self.sleep = sleep
+        self.clock = clock
+
+    def bucket_for(self, token: str) -> int:
+        # By token, so a room keeps its phase in every frame
+        return int(token[:8], 16) % len(self.buckets)
+
+    def run_frame(self, frame_start: float, active: List[Any], idle: List[Tuple[Any, int]],
+                  step: Callable[[Any, List[Any], List[Tuple[Any, int]]], None],
+                  broadcast: Callable[[List[Any]], None]) -> float:
+        """Step and broadcast one frame's rooms bucket by bucket; returns the time spent busy.
+
+        active and idle come from RoomManager.schedule(); step(batch, active, idle)
+        advances one bucket's rooms and broadcast(rooms) sends their updates.
+        """
+        count = len(self.buckets)
+        bucket_active: List[List[Any]] = [[] for _ in range(count)]
+        bucket_idle: List[List[Tuple[Any, int]]] = [[] for _ in range(count)]
+        for room in active:
+            bucket_active[self.bucket_for(room.token)].append(room)
+        for entry in idle:
+            bucket_idle[self.bucket_for(entry[0].token)].append(entry)
+
+        total_busy = 0.0
+        for bucket in self.buckets:
+            slot_start = frame_start + bucket.index * self.slot
+            # Yield to the hub before every bucket, and wait for its slot if it is early
+            self.sleep(max(0.0, slot_start - self.clock()))
+            rooms = bucket_active[bucket.index]
+            idle_rooms = bucket_idle[bucket.index]
+            bucket.rooms = len(rooms) + len(idle_rooms)
+            if not bucket.rooms:
+                self._record(bucket, 0.0)
+                continue
+
+            started = self.clock()
+            # The hub may wake us a little late; only the bucket's own work counts against it
+            deadline = max(slot_start, started) + self.slot
+            step(bucket.batch, rooms, idle_rooms)
+            stepped = rooms + [room for room, _ in idle_rooms]
+            if self.clock() > deadline:
+                # Late rooms were still simulated, since skipping time would change the game;
+                # only this frame's broadcast is dropped and clients catch up on the next one
+                bucket.overruns += 1
+                # Final game-over states still go out; those rooms are not broadcast again
+                finished = [room for room in stepped if room.state.game_over]
+                bucket.skipped_broadcasts += len(stepped) - len(finished)
+                stepped = finished
+            if stepped:
+                broadcast(stepped)
+            busy = self.clock() - started
+            self._record(bucket, busy)
+            total_busy += busy
+        return total_busy
+
+    def _record(self, bucket: Bucket, busy: float) -> None:
+        share = busy / self.slot
+        bucket.utilization += (share - bucket.utilization) * UTILIZATION_SMOOTHING
+        if share > bucket.peak_utilization:
+            bucket.peak_utilization = share
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [bucket.report() for bucket in self.buckets]
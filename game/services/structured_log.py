@@ -0,0 +1,167 @@
+"""JSON-lines logging written by a native thread, so the game loop never waits on stdout.
+
+Records are put on an in-memory queue by a QueueHandler and written by a
+QueueListener running on a real OS thread, even under eventlet monkey-patching.
+High-frequency messages are sampled and rate-limited per room before they are
+queued. Pass room and tick with extra={'room': ..., 'tick': ...} and any other
+structured values as extra={'fields': {...}}; fields named like one of the
+record's own keys are written with a field_ prefix.
+"""
+from typing import Dict, Any, Optional, Tuple
+import importlib
+import json
+import logging
+import logging.handlers
+import sys
+import time
+
+QUEUE_SIZE = 10000  # Records beyond this are dropped rather than blocking the caller
+RATE = 5.0  # Sustained records per second per (room, message)
+BURST = 20  # Records a (room, message) may log at once before the rate applies
+SAMPLE_EVERY = {'collected': 10}  # Keep one record in N for these messages, per room
+MAX_BUCKETS = 50000  # Rate-limit state is reset when it tracks more keys than this
+# Keys JsonFormatter writes itself; caller fields never replace them
+RESERVED_KEYS = frozenset(('ts', 'level', 'logger', 'msg', 'room', 'tick',
+                           'sampled', 'suppressed', 'exc'))
+
+def _native(module: str):
+    """The unpatched module when eventlet has monkey-patched it (it patches before imports)."""
+    patcher = sys.modules.get('eventlet.patcher')
+    if patcher is None:
+        return importlib.import_module(module)
+    return patcher.original(module)
+
+_threading = _native('threading')
+_queue = _native('queue')
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            'ts': round(record.created, 6),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key in ('room', 'tick', 'sampled', 'suppressed'):
+            value = getattr(record, key, None)
+            if value is not None:
+                line[key] = value
+        fields = getattr(record, 'fields', None)
+        if fields:
+            for key, value in fields.items():
+                line['field_' + key if key in RESERVED_KEYS else key] = value
+        if record.exc_text:
+            line['exc'] = record.exc_text
+        return json.dumps(line, default=str)
+
+class RoomLogFilter(logging.Filter):
+    """Samples and rate-limits records per (room, message) before they are queued.
+
+    Sampling keeps every Nth record of the messages in sample_every and marks
+    it with sampled=N. Rate limiting is a token bucket; the next record let
+    through after a dropped run carries suppressed=<count>. Records without a
+    room share one bucket per message.
+    """
+    def __init__(self, rate: float = RATE, burst: int = BURST,
+                 sample_every: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = SAMPLE_EVERY if sample_every is None else sample_every
+        self._counts: Dict[Tuple[Any, str], int] = {}
+        # (room, message) -> [tokens, last refill, suppressed since last record]
+        self._buckets: Dict[Tuple[Any, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True  # Problems are never thinned out
+        message = record.msg if isinstance(record.msg, str) else str(record.msg)
+        key = (getattr(record, 'room', None), message)
+        every = self.sample_every.get(message)
+        if every and every > 1:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            if count % every:
+                return False
+            record.sampled = every
+
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._buckets.clear()
+                self._counts.clear()
+            bucket = self._buckets[key] = [float(self.burst), now, 0]
+        else:
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] < 1.0:
+            bucket[2] += 1
+            return False
+        bucket[0] -= 1.0
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queues records without formatting them and drops them when the queue is full."""
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def createLock(self) -> None:
+        self.lock = None  # The queue is already thread-safe
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve what cannot cross threads; JSON encoding happens on the writer
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except _queue.Full:
+            self.dropped += 1
+
+class NativeQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose writer is an OS thread even when threading is green."""
+    def start(self) -> None:
+        self._thread = thread = _threading.Thread(target=self._monitor, name='log-writer',
+                                                 daemon=True)
+        thread.start()
+
+def configure_logging(level: int = logging.INFO, stream=None, log_filter: Optional[logging.Filter] = None
+                      ) -> Tuple[DroppingQueueHandler, NativeQueueListener]:
+    """Route the root logger through a bounded queue to a JSON-lines writer thread.
+
+    Returns the queue handler (for its dropped count) and the started listener;
+    stop() the listener on shutdown to flush what is queued.
+    """
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter())
+    writer.lock = _threading.RLock()  # Only the writer thread takes it
+
+    handler = DroppingQueueHandler(_queue.Queue(QUEUE_SIZE))
+    handler.addFilter(log_filter or RoomLogFilter())
+
+    # The JSON lines carry none of these, and collecting them is most of the cost of a
+    # record: current_thread() is slow under eventlet and caller lookup walks the stack
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging._srcfile = None
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = NativeQueueListener(handler.queue, writer)
+    listener.start()
+    return handler, listener
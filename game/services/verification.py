@@ -0,0 +1,160 @@
+"""Server-authoritative score verification by replaying submitted runs."""
+from typing import List, Dict, Any, Optional, Callable, TYPE_CHECKING
+import os
+import time
+from ..core.game_state import GameState
+from ..core.replay import RUN_LOG_VERSION
+from ..engine.world import WorldConfig
+
+# Largest tick a client loop can legitimately produce; anything bigger is
+# either a stalled server or a forged log trying to skip through obstacles
+MAX_TICK_DT = 0.25
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor, Future
+
+def replay_runs(run_logs: List[Dict[str, Any]]) -> List[GameState]:
+    """Re-simulate runs in lockstep through the batch kernel the live server uses."""
+    from ..core.batch import BatchSimulation  # numpy is only needed once a replay runs
+    states = [GameState(seed=run_log['seed'], world=WorldConfig.from_dict(run_log.get('world')))
+              for run_log in run_logs]
+    batch = BatchSimulation()
+    longest = max((len(run_log['ticks']) for run_log in run_logs), default=0)
+    
+    for tick in range(longest):
+        stepping = []
+        dts = []
+        for state, run_log in zip(states, run_logs):
+            if tick >= len(run_log['ticks']) or state.game_over:
+                continue
+            dt, events = run_log['ticks'][tick]
+            for event in events:
+                state.handle_event(event)
+            stepping.append(state)
+            dts.append(dt)
+        batch.step(stepping, dts)
+    return states
+
+def replay_run(run_log: Dict[str, Any]) -> GameState:
+    """Re-simulate a single run from its seed and recorded inputs."""
+    return replay_runs([run_log])[0]
+
+def _reject_reason(run_log: Dict[str, Any]) -> Optional[str]:
+    """Reasons a run log cannot be replayed at all."""
+    if run_log.get('version') != RUN_LOG_VERSION:
+        return 'unsupported run log version'
+    for dt, _ in run_log['ticks']:
+        if not 0 < dt <= MAX_TICK_DT:
+            return f'invalid tick dt {dt}'
+    return None
+
+def verify_batch(run_logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Verify a batch of runs inside one worker process."""
+    results = []
+    replayable = []
+    for run_log in run_logs:
+        result = {
+            'run_id': run_log.get('run_id', ''),
+            'claimed_score': run_log.get('score'),
+            'replayed_score': None,
+            'valid': False,
+            'reason': _reject_reason(run_log)
+        }
+        results.append(result)
+        if result['reason'] is None:
+            replayable.append((result, run_log))
+            
+    states = replay_runs([run_log for _, run_log in replayable])
+    for (result, run_log), state in zip(replayable, states):
+        result['replayed_score'] = state.score
+        if state.score != run_log.get('score'):
+            result['reason'] = 'score mismatch'
+        elif state.level != run_log.get('level', state.level):
+            result['reason'] = 'level mismatch'
+        else:
+            result['valid'] = True
+    return results
+
+def verify_run(run_log: Dict[str, Any]) -> Dict[str, Any]:
+    """Replay a single run and compare its score against the claimed one."""
+    return verify_batch([run_log])[0]
+
+class VerificationService:
+    def __init__(self, max_workers: Optional[int] = None, batch_size: int = 16,
+                 on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 mp_context=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.mp_context = mp_context  # e.g. game.worker.pool_context(); None uses the platform default
+        self.batch_size = batch_size
+        self.on_result = on_result
+        self.flagged: List[Dict[str, Any]] = []
+        self.runs_verified = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._executor: Optional['ProcessPoolExecutor'] = None
+        
+    def _get_executor(self) -> 'ProcessPoolExecutor':
+        """Start the worker pool on first use."""
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=self.mp_context)
+        return self._executor
+        
+    def submit(self, run_log: Dict[str, Any]) -> None:
+        """Queue a finished run; a batch is dispatched once it fills up."""
+        self._pending.append(run_log)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+            
+    def flush(self) -> Optional['Future']:
+        """Dispatch queued runs to the worker pool without waiting."""
+        if not self._pending:
+            return None
+        batch, self._pending = self._pending, []
+        future = self._get_executor().submit(verify_batch, batch)
+        future.add_done_callback(self._collect)
+        return future
+        
+    def _collect(self, future: 'Future') -> None:
+        """Record results of a finished batch and flag diverging runs."""
+        for result in future.result():
+            self._record(result)
+            
+    def _record(self, result: Dict[str, Any]) -> None:
+        self.runs_verified += 1
+        if not result['valid']:
+            self.flagged.append(result)
+        if self.on_result:
+            self.on_result(result)
+            
+    def verify(self, run_logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Verify runs in parallel batches and report throughput."""
+        executor = self._get_executor()
+        batches = [run_logs[i:i + self.batch_size]
+                   for i in range(0, len(run_logs), self.batch_size)]
+        
+        start = time.perf_counter()
+        results = []
+        for batch_results in executor.map(verify_batch, batches):
+            for result in batch_results:
+                self._record(result)
+            results.extend(batch_results)
+        elapsed = time.perf_counter() - start
+        
+        runs_per_second = len(results) / elapsed if elapsed > 0 else 0.0
+        return {
+            'results': results,
+            'runs': len(results),
+            'flagged': sum(1 for result in results if not result['valid']),
+            'elapsed': elapsed,
+            'workers': self.max_workers,
+            'runs_per_second': runs_per_second,
+            'runs_per_second_per_core': runs_per_second / self.max_workers
+        }
+        
+    def shutdown(self, wait: bool = True) -> None:
+        """Dispatch anything queued and stop the worker pool."""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
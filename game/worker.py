@@ -0,0 +1,64 @@
+"""Lightweight entry point for headless workers such as replay verification.
+
+Only game.core and game.engine are imported, never Flask, Socket.IO or
+eventlet, so command-line jobs and pool workers start without the web stack.
+
+Usage: python -m game.worker [--workers N] RUN_LOG.json [...]
+
+Each file holds one run log or a list of them; results are printed as JSON.
+"""
+from typing import List, Dict, Any
+import argparse
+import json
+import multiprocessing
+import sys
+
+# Modules a replay worker needs; the forkserver imports them once for every worker
+WORKER_PRELOAD = ['game.core.batch', 'game.services.verification']
+
+def pool_context():
+    """multiprocessing context for pools of game workers.
+
+    Workers are forked from a clean server process that has already imported
+    WORKER_PRELOAD, so each one starts with numpy and the replay kernel loaded
+    and none of its parent's state. The parent's main module is still
+    re-imported in each worker, so use this from entry points whose __main__
+    is cheap to import, not from app.py. Platforms without forkserver use spawn.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(WORKER_PRELOAD)
+        return context
+    return multiprocessing.get_context('spawn')
+
+def load_run_logs(paths: List[str]) -> List[Dict[str, Any]]:
+    run_logs = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        run_logs.extend(data if isinstance(data, list) else [data])
+    return run_logs
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Replay and verify recorded runs.')
+    parser.add_argument('run_logs', nargs='+', help='JSON files with one run log or a list of them')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='verify in a process pool of this size instead of in-process')
+    args = parser.parse_args(argv)
+    
+    run_logs = load_run_logs(args.run_logs)
+    
+    if args.workers:
+        from .services.verification import VerificationService
+        service = VerificationService(max_workers=args.workers, mp_context=pool_context())
+        results = service.verify(run_logs)['results']
+        service.shutdown()
+    else:
+        from .services.verification import verify_batch
+        results = verify_batch(run_logs)
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0 if all(result['valid'] for result in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
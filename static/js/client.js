@@ -1,4 +1,6 @@
 // Beach Rally Game Client
+const TILE_SIZE = 512;  // World units per side of a cached scenery tile
+const MAX_TILES = 48;  // Tiles kept around; about three screens' worth at 1080p
 class GameClient {
     constructor() {
         this.canvas = document.getElementById('game-canvas');
@@ -13,30 +15,27 @@ class GameClient {
         };
         this._loadAssets();
 
-        // Initialize Socket.IO with correct configuration
-        this.socket = io({
-            transports: ['websocket', 'polling'],
-            cors: {
-                origin: "*",
-                methods: ["GET", "POST"]
-            }
-        });
-        
-        // Game state
+        // Game state. Obstacles, pickups and bots arrive packed into Float32Arrays
+        // (see state_decoder.js); the layout is kept until the server changes it
         this.gameState = null;
-        
-        // Connection event handlers
-        this.socket.on('connect', () => {
-            console.log('Connected to server');
-        });
-        
-        this.socket.on('disconnect', () => {
-            console.log('Disconnected from server');
-        });
-        
-        this.socket.on('error', (error) => {
-            console.error('Socket error:', error);
-        });
+        this.layout = new Float32Array(0);
+        this.collectibles = new Float32Array(0);
+        this.bots = new Float32Array(0);
+        this.wind = null;  // Downsampled wind field, when the world has wind
+        this.dirty = true;  // Something changed since the last frame was drawn
+        this.animated = false;  // Waves or pickups in view, which move between updates
+        this.scratch = {};  // Reused when unpacking items to draw
+        
+        // The background is drawn once into a canvas-sized backdrop, and the grid, rocks
+        // and palms into world-space tiles built as they come into view; each frame copies
+        // the backdrop and the visible tiles. Tiles are dropped when the layout or zoom changes
+        this.backdrop = document.createElement('canvas');
+        this.backdropKey = null;
+        this.tiles = new Map();  // "column,row" -> canvas, least recently drawn first
+        this.tileKey = null;
+        
+        // Camera in world coordinates; only moves when the world is larger than the view
+        this.camera = {x: 0, y: 0, zoom: 1};
         
         // Resize canvas
         this.resizeCanvas();
@@ -53,16 +52,72 @@ class GameClient {
         // Set up input handling
         this.setupInput();
         
-        // Set up socket events
-        this.socket.on('game_state', (state) => this.handleServerUpdate(state));
+        // The socket runs in a worker that parses and packs each update off the
+        // main thread; browsers without workers run it here with the same decoder
+        this.worker = null;
+        this.socket = null;
+        if (window.Worker) {
+            this.worker = new Worker(this.canvas.dataset.worker || '/static/js/state_worker.js');
+            this.worker.onmessage = (message) => this.handleMessage(message.data);
+            this.worker.postMessage({type: 'connect', token: localStorage.getItem('sessionToken')});
+        } else {
+            this.connectHere();
+        }
         
         // Start game loop
         requestAnimationFrame(() => this.gameLoop());
     }
 
+    connectHere() {
+        const decoder = new StateDecoder();
+        // The session token lets the server hand back our room after a reconnect or restart
+        this.socket = io({
+            auth: (cb) => cb({token: localStorage.getItem('sessionToken')}),
+            transports: ['websocket', 'polling']
+        });
+        this.socket.on('connect', () => this.handleMessage({type: 'connect'}));
+        this.socket.on('disconnect', () => this.handleMessage({type: 'disconnect'}));
+        this.socket.on('error', (error) => this.handleMessage({type: 'error', error: error}));
+        this.socket.on('session', (session) => this.handleMessage({type: 'session', token: session.token}));
+        this.socket.on('game_state', (state) => this.handleMessage(decoder.decode(state).message));
+        this.socket.on('game_events', (event) => this.handleMessage({type: 'game_event', event: event}));
+    }
+    
+    send(event, data) {
+        if (this.worker) {
+            this.worker.postMessage({type: 'emit', event: event, data: data});
+        } else if (this.socket) {
+            this.socket.emit(event, data);
+        }
+    }
+    
+    handleMessage(message) {
+        switch (message.type) {
+            case 'connect':
+                console.log('Connected to server');
+                break;
+            case 'disconnect':
+                console.log('Disconnected from server');
+                break;
+            case 'error':
+                console.error('Socket error:', message.error);
+                break;
+            case 'session':
+                localStorage.setItem('sessionToken', message.token);
+                break;
+            case 'state':
+                this.handleServerUpdate(message);
+                break;
+            case 'game_event':
+                this.handleGameEvent(message.event);
+                break;
+        }
+    }
+
 	_loadAssets() {
 		const createImgFromSvg = (svgText) => {
 			const img = new Image();
+			img.onload = () => this.invalidate();
 			img.src = 'data:image/svg+xml;charset=utf-8,' + encodeURIComponent(svgText);
 			return img;
 		};
@@ -260,6 +315,14 @@ class GameClient {
     resizeCanvas() {
         this.canvas.width = this.canvas.clientWidth;
         this.canvas.height = this.canvas.clientHeight;
+        this.invalidate();
+    }
+    
+    invalidate() {
+        // Redraw everything, cached scenery included, on the next frame
+        this.backdropKey = null;
+        this.tileKey = null;
+        this.dirty = true;
     }
     
     setupInput() {
@@ -271,14 +334,14 @@ class GameClient {
                 return;
             }
             
-            this.socket.emit('input', {
+            this.send('input', {
                 type: 'keydown',
                 key: event.key
             });
         });
         
         document.addEventListener('keyup', (event) => {
-            this.socket.emit('input', {
+            this.send('input', {
                 type: 'keyup',
                 key: event.key
             });
@@ -300,39 +363,47 @@ class GameClient {
             return;
         }
         
-        // Clear canvas
-        this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
-        
-        // Draw SVG background if loaded
-        if (this.assets.background && this.assets.background.complete) {
-            this._drawBackground();
+        if (!this.needsRedraw()) {
+            return;
         }
+        this.dirty = false;
         
-        // Draw background grid for reference
-        this.drawGrid();
+        // Static scenery comes from the cached layers, which also clears the canvas
+        this.updateCamera();
+        this.drawStaticLayer();
+        this.animated = this.animatedInView();
         
-        // Draw entities
-        if (this.gameState.entities) {
-            for (const entity of this.gameState.entities) {
-                // Use screen coordinates if available, otherwise use world coordinates
-                const entityCopy = {...entity};
-                entityCopy.x = entity.screen_x !== undefined ? entity.screen_x : entity.x;
-                entityCopy.y = entity.screen_y !== undefined ? entity.screen_y : entity.y;
-                this.drawEntity(entityCopy);
-            }
+        // Everything up to the HUD is drawn in world coordinates through the camera
+        this.ctx.save();
+        this.ctx.scale(this.camera.zoom, this.camera.zoom);
+        this.ctx.translate(-this.camera.x, -this.camera.y);
+        
+        // Draw waves, which move between updates
+        this.drawLayout(true, this.viewRect());
+        
+        if (this.wind) {
+            this.drawWind(this.wind);
         }
         
         // Draw collectibles
-        if (this.gameState.collectibles) {
-            for (const collectible of this.gameState.collectibles) {
-                if (!collectible.collected) {
-                    // Use screen coordinates if available, otherwise use world coordinates
-                    const collectibleCopy = {...collectible};
-                    collectibleCopy.x = collectible.screen_x !== undefined ? collectible.screen_x : collectible.x;
-                    collectibleCopy.y = collectible.screen_y !== undefined ? collectible.screen_y : collectible.y;
-                    this.drawCollectible(collectibleCopy);
-                }
-            }
+        const collectibles = this.collectibles;
+        const item = this.scratch;
+        for (let i = 0; i < collectibles.length; i += COLLECTIBLE_STRIDE) {
+            item.type = COLLECTIBLE_KINDS[collectibles[i]];
+            item.x = collectibles[i + 1];
+            item.y = collectibles[i + 2];
+            this.drawCollectible(item);
+        }
+        
+        // Draw bots underneath the player
+        const bots = this.bots;
+        for (let i = 0; i < bots.length; i += BOT_STRIDE) {
+            item.x = bots[i];
+            item.y = bots[i + 1];
+            item.rotation = bots[i + 2];
+            item.width = bots[i + 3];
+            item.height = bots[i + 4];
+            this.drawBot(item);
         }
         
         // Draw player
@@ -360,6 +431,7 @@ class GameClient {
 
             this.ctx.restore();
         }
+        this.ctx.restore();
         
         // Update UI with improved formatting
         const scoreElement = document.getElementById('score-value');
@@ -375,31 +447,211 @@ class GameClient {
         if (this.gameState.active_powerup) {
             this.drawPowerupIndicator(this.gameState.active_powerup);
         }
-        
-        // Draw game bounds
-        this.ctx.strokeStyle = '#ff0000';
-        this.ctx.lineWidth = 2;
-        this.ctx.strokeRect(0, 0, this.canvas.width, this.canvas.height);
     }
     
-    drawGrid() {
-        // Draw a light grid for better spatial reference
+    needsRedraw() {
+        // New state, a resize or a loaded asset always redraws; otherwise only
+        // waves and pulsing pickups in view change between updates
+        if (this.dirty) return true;
+        return this.animated && !this.gameState.game_over;
+    }
+    
+    viewRect() {
+        // Visible part of the world
+        const camera = this.camera;
+        return {left: camera.x, top: camera.y,
+                right: camera.x + this.canvas.width / camera.zoom,
+                bottom: camera.y + this.canvas.height / camera.zoom};
+    }
+    
+    animatedInView() {
+        const view = this.viewRect();
+        const collectibles = this.collectibles;
+        for (let i = 0; i < collectibles.length; i += COLLECTIBLE_STRIDE) {
+            const x = collectibles[i + 1];
+            const y = collectibles[i + 2];
+            if (x >= view.left - 20 && x <= view.right + 20 && y >= view.top - 20 && y <= view.bottom + 20) {
+                return true;
+            }
+        }
+        // Waves move over their whole travel range
+        const layout = this.layout;
+        const wave = ENTITY_KINDS.indexOf('wave');
+        for (let i = 0; i < layout.length; i += ENTITY_STRIDE) {
+            if (layout[i] === wave && this.overlapsRange(layout, i, true, view)) return true;
+        }
+        return false;
+    }
+    
+    overlapsRange(layout, i, travel, view) {
+        // Whether an entity's drawn extent (its whole travel range for waves) meets a rect
+        const margin = Math.max(layout[i + 3], layout[i + 4]);
+        const left = travel ? layout[i + 5] : layout[i + 1];
+        const right = travel ? layout[i + 5] + layout[i + 6] + layout[i + 3] : layout[i + 1];
+        const y = layout[i + 2];
+        return right + margin >= view.left && left - margin <= view.right &&
+               y + margin >= view.top && y - margin <= view.bottom;
+    }
+    
+    drawLayout(waves, view) {
+        // Draw either the waves or everything else from the packed layout, within a world rect
+        const layout = this.layout;
+        const entity = this.scratch;
+        const wave = ENTITY_KINDS.indexOf('wave');
+        for (let i = 0; i < layout.length; i += ENTITY_STRIDE) {
+            if ((layout[i] === wave) !== waves || !this.overlapsRange(layout, i, waves, view)) continue;
+            entity.type = ENTITY_KINDS[layout[i]];
+            entity.x = layout[i + 1];
+            entity.y = layout[i + 2];
+            entity.width = layout[i + 3];
+            entity.height = layout[i + 4];
+            entity.origin_x = layout[i + 5];
+            entity.distance = layout[i + 6];
+            entity.speed = layout[i + 7];
+            entity.phase = layout[i + 8];
+            this.drawEntity(entity);
+        }
+    }
+    
+    drawStaticLayer() {
+        const canvas = this.canvas;
+        const camera = this.camera;
+        const ctx = this.ctx;
+        if (this.backdropKey !== canvas.width + 'x' + canvas.height) {
+            this.buildBackdrop();
+        }
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        ctx.drawImage(this.backdrop, 0, 0);
+        
+        const world = this.gameState.world || {};
+        const tileKey = [this.layout, world.width, world.height, camera.zoom];
+        const current = this.tileKey;
+        if (!current || tileKey.some((value, i) => value !== current[i])) {
+            this.tiles.clear();
+            this.tileKey = tileKey;
+        }
+        // Copy the visible tiles at whole-pixel offsets; their pixel size is rounded up,
+        // so neighbours overlap by under a pixel instead of leaving seams
+        const view = this.viewRect();
+        const size = Math.ceil(TILE_SIZE * camera.zoom);
+        for (let row = Math.floor(view.top / TILE_SIZE); row * TILE_SIZE < view.bottom; row++) {
+            for (let column = Math.floor(view.left / TILE_SIZE); column * TILE_SIZE < view.right; column++) {
+                const tile = this.tile(column, row, size);
+                ctx.drawImage(tile, Math.round((column * TILE_SIZE - camera.x) * camera.zoom),
+                              Math.round((row * TILE_SIZE - camera.y) * camera.zoom));
+            }
+        }
+    }
+    
+    buildBackdrop() {
+        const backdrop = this.backdrop;
+        backdrop.width = this.canvas.width;  // Also clears it
+        backdrop.height = this.canvas.height;
+        if (this.assets.background && this.assets.background.complete) {
+            // _drawBackground fills this.canvas's size through this.ctx
+            const screen = this.ctx;
+            this.ctx = backdrop.getContext('2d');
+            try {
+                this._drawBackground();
+            } finally {
+                this.ctx = screen;
+            }
+        }
+        this.backdropKey = this.canvas.width + 'x' + this.canvas.height;
+    }
+    
+    tile(column, row, size) {
+        const key = column + ',' + row;
+        let tile = this.tiles.get(key);
+        if (tile) {
+            // Move to the back of the Map's order, which is its recency order
+            this.tiles.delete(key);
+        } else {
+            tile = this.buildTile(column, row, size);
+            if (this.tiles.size >= MAX_TILES) {
+                this.tiles.delete(this.tiles.keys().next().value);
+            }
+        }
+        this.tiles.set(key, tile);
+        return tile;
+    }
+    
+    buildTile(column, row, size) {
+        const tile = document.createElement('canvas');
+        tile.width = size;
+        tile.height = size;
+        const rect = {left: column * TILE_SIZE, top: row * TILE_SIZE,
+                      right: (column + 1) * TILE_SIZE, bottom: (row + 1) * TILE_SIZE};
+        
+        // The draw helpers use this.ctx, so point it at the tile while they run
+        const screen = this.ctx;
+        this.ctx = tile.getContext('2d');
+        try {
+            this.ctx.scale(size / TILE_SIZE, size / TILE_SIZE);
+            this.ctx.translate(-rect.left, -rect.top);
+            
+            // Draw background grid for reference
+            this.drawGrid(rect);
+            
+            // Rocks and palms; waves are drawn per frame
+            this.drawLayout(false, rect);
+            
+            // Draw world bounds
+            const world = this.gameState.world;
+            if (world) {
+                this.ctx.strokeStyle = '#ff0000';
+                this.ctx.lineWidth = 2;
+                this.ctx.strokeRect(0, 0, world.width, world.height);
+            }
+        } finally {
+            this.ctx = screen;
+        }
+        return tile;
+    }
+    
+    updateCamera() {
+        // Follow the player, clamped to the world edges, like Renderer.view_around on the server
+        const world = this.gameState.world;
+        const player = this.gameState.player;
+        if (!world || !player || (world.width <= world.view_width && world.height <= world.view_height)) {
+            this.camera = {x: 0, y: 0, zoom: 1};
+            return;
+        }
+        // Zoom in far enough that the canvas never shows more than the server's view
+        const zoom = Math.max(1, this.canvas.width / world.view_width, this.canvas.height / world.view_height);
+        const viewWidth = this.canvas.width / zoom;
+        const viewHeight = this.canvas.height / zoom;
+        const clamp = (value, max) => Math.min(Math.max(value, 0), Math.max(0, max));
+        this.camera = {
+            x: clamp(player.x - viewWidth / 2, world.width - viewWidth),
+            y: clamp(player.y - viewHeight / 2, world.height - viewHeight),
+            zoom: zoom
+        };
+    }
+    
+    drawGrid(rect) {
+        // Draw a light grid for better spatial reference, over a rect of the world
         this.ctx.strokeStyle = '#e0e0e0';
         this.ctx.lineWidth = 1;
+        const left = Math.floor(rect.left / 50) * 50;
+        const top = Math.floor(rect.top / 50) * 50;
+        const right = rect.right;
+        const bottom = rect.bottom;
         
+        // Lines on the rect's edges are drawn by both tiles, each keeping its half
         // Vertical lines
-        for (let x = 0; x < this.canvas.width; x += 50) {
+        for (let x = left; x <= right; x += 50) {
             this.ctx.beginPath();
-            this.ctx.moveTo(x, 0);
-            this.ctx.lineTo(x, this.canvas.height);
+            this.ctx.moveTo(x, top);
+            this.ctx.lineTo(x, bottom);
             this.ctx.stroke();
         }
         
         // Horizontal lines
-        for (let y = 0; y < this.canvas.height; y += 50) {
+        for (let y = top; y <= bottom; y += 50) {
             this.ctx.beginPath();
-            this.ctx.moveTo(0, y);
-            this.ctx.lineTo(this.canvas.width, y);
+            this.ctx.moveTo(left, y);
+            this.ctx.lineTo(right, y);
             this.ctx.stroke();
         }
     }
@@ -413,7 +665,23 @@ class GameClient {
         }
     }
     
+    simulationTime() {
+        // Server time at the last update, advanced by local time since it arrived
+        if (!this.serverTime) return 0;
+        if (this.gameState && this.gameState.game_over) return this.serverTime.time;
+        return this.serverTime.time + (performance.now() - this.serverTime.receivedAt) / 1000;
+    }
+    
+    waveX(wave, time) {
+        // Left edge at a simulation time: a closed form of the parameters sent with the level
+        const angle = 2 * wave.speed / wave.distance * time + wave.phase;
+        return wave.origin_x + wave.distance * 0.5 * (1 - Math.cos(angle));
+    }
+    
     drawEntity(entity) {
+        if (entity.type === 'wave' && entity.speed !== undefined) {
+            entity.x = this.waveX(entity, this.simulationTime());
+        }
         this.ctx.save();
         this.ctx.translate(entity.x, entity.y);
         
@@ -485,6 +753,38 @@ class GameClient {
         this.ctx.restore();
     }
     
+    drawWind(wind) {
+        // One faint streak per grid node, pointing downwind, a quarter second long
+        const field = wind.field;
+        this.ctx.save();
+        this.ctx.strokeStyle = 'rgba(255, 255, 255, 0.35)';
+        this.ctx.lineWidth = 2;
+        this.ctx.beginPath();
+        for (let row = 0; row < wind.rows; row++) {
+            for (let column = 0; column < wind.columns; column++) {
+                const i = (row * wind.columns + column) * WIND_STRIDE;
+                const x = column * wind.cellSize;
+                const y = row * wind.cellSize;
+                this.ctx.moveTo(x, y);
+                this.ctx.lineTo(x + field[i] * 0.25, y + field[i + 1] * 0.25);
+            }
+        }
+        this.ctx.stroke();
+        this.ctx.restore();
+    }
+    
+    drawBot(bot) {
+        this.ctx.save();
+        this.ctx.translate(bot.x, bot.y);
+        this.ctx.rotate(bot.rotation * Math.PI / 180);
+        this.ctx.fillStyle = '#3b7dd8';
+        this.ctx.fillRect(-bot.width/2, -bot.height/2, bot.width, bot.height);
+        // Windscreen marks the front
+        this.ctx.fillStyle = '#cfe3ff';
+        this.ctx.fillRect(-bot.width/2 + 6, -bot.height/2 + 8, bot.width - 12, 10);
+        this.ctx.restore();
+    }
+    
     drawCollectible(collectible) {
         this.ctx.save();
         this.ctx.translate(collectible.x, collectible.y);
@@ -582,20 +882,39 @@ class GameClient {
         }
     }
 
-    handleServerUpdate(state) {
+    handleServerUpdate(message) {
+        // Updates between level changes leave out the obstacle layout; keep the last one
+        if (message.layout) {
+            this.layout = message.layout;
+        }
+        this.collectibles = message.collectibles;
+        this.bots = message.bots;
+        if (message.wind) {
+            this.wind = message.wind;
+        } else if (!message.state.world.wind) {
+            this.wind = null;
+        }
+        const state = message.state;
         this.gameState = state;
+        this.serverTime = {time: state.time || 0, receivedAt: performance.now()};
+        this.dirty = true;
         
         // Check for game over
         if (state.game_over) {
             this.showGameOverScreen();
         }
-        
-        // Debug logging to track objects
-        if (this.gameState.entities) {
-            console.log(`Entities count: ${this.gameState.entities.length}`);
-        }
-        if (this.gameState.collectibles) {
-            console.log(`Collectibles count: ${this.gameState.collectibles.length}`);
+    }
+    
+    handleGameEvent(event) {
+        // Sounds for moments the state updates only show as changed numbers
+        const sound = {
+            collected: this.sounds.pickup,
+            checkpoint_reached: this.sounds.checkpoint,
+            level_completed: this.sounds.checkpoint
+        }[event.type];
+        if (sound) {
+            sound.currentTime = 0;
+            sound.play().catch(() => {});  // Ignore autoplay restrictions and missing files
         }
     }
     
@@ -638,10 +957,10 @@ function startNewGame() {
     }
     
     // Request new game from server
-    if (window.gameClient && window.gameClient.socket) {
-        window.gameClient.socket.emit('new_game');
+    if (window.gameClient) {
+        window.gameClient.send('new_game');
     } else {
-        // Fallback to page reload if socket not available
+        // Fallback to page reload if the client has not started yet
         location.reload();
     }
 }
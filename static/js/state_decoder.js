@@ -0,0 +1,114 @@
+// Turns game_state messages into packed Float32Arrays ready for drawing. Runs in
+// state_worker.js, or on the main thread in browsers without workers.
+
+// Per-item layouts of the packed arrays
+const ENTITY_KINDS = ['rock', 'palmtree', 'wave'];
+const ENTITY_STRIDE = 9;  // kind, x, y, width, height, origin_x, distance, speed, phase
+const COLLECTIBLE_KINDS = ['coin', 'powerup'];
+const COLLECTIBLE_STRIDE = 3;  // kind, x, y
+const BOT_STRIDE = 5;  // x, y, rotation, width, height
+const WIND_STRIDE = 2;  // u, v per grid node, rows of columns
+
+class StateDecoder {
+    constructor() {
+        this.layoutVersion = null;
+    }
+
+    // Returns {message, transfer}: plain fields plus packed arrays whose buffers
+    // can be transferred instead of copied. 'layout' is only set when the obstacle
+    // layout changed, and 'wind' only when the server sent a new wind field; otherwise
+    // the receiver keeps the one it has.
+    decode(state) {
+        const collectibles = this.packCollectibles(state.collectibles || []);
+        const bots = this.packBots(state.bots || []);
+        const message = {
+            type: 'state',
+            state: {
+                player: state.player,
+                score: state.score,
+                timeLeft: state.timeLeft,
+                level: state.level,
+                game_over: state.game_over,
+                current_checkpoint: state.current_checkpoint,
+                total_checkpoints: state.total_checkpoints,
+                active_powerup: state.active_powerup,
+                world: state.world,
+                time: state.time,
+                layout_version: state.layout_version
+            },
+            collectibles: collectibles,
+            bots: bots
+        };
+        const transfer = [collectibles.buffer, bots.buffer];
+
+        // Updates between level changes leave out the layout; large worlds send a
+        // culled one with every update, and then it is always forwarded
+        if (state.entities !== undefined || state.layout_version !== this.layoutVersion) {
+            const layout = this.packEntities(state.entities || []);
+            message.layout = layout;
+            transfer.push(layout.buffer);
+            this.layoutVersion = state.layout_version;
+        }
+        if (state.wind !== undefined) {
+            const wind = this.packWind(state.wind);
+            message.wind = wind;
+            transfer.push(wind.field.buffer);
+        }
+        return {message, transfer};
+    }
+
+    packEntities(entities) {
+        const packed = new Float32Array(entities.length * ENTITY_STRIDE);
+        let offset = 0;
+        for (const entity of entities) {
+            packed[offset] = ENTITY_KINDS.indexOf(entity.type);
+            packed[offset + 1] = entity.x;
+            packed[offset + 2] = entity.y;
+            packed[offset + 3] = entity.width;
+            packed[offset + 4] = entity.height;
+            if (entity.type === 'wave') {
+                packed[offset + 5] = entity.origin_x;
+                packed[offset + 6] = entity.distance;
+                packed[offset + 7] = entity.speed;
+                packed[offset + 8] = entity.phase;
+            }
+            offset += ENTITY_STRIDE;
+        }
+        return packed;
+    }
+
+    packCollectibles(collectibles) {
+        const packed = new Float32Array(collectibles.length * COLLECTIBLE_STRIDE);
+        let offset = 0;
+        for (const collectible of collectibles) {
+            packed[offset] = COLLECTIBLE_KINDS.indexOf(collectible.type);
+            packed[offset + 1] = collectible.x;
+            packed[offset + 2] = collectible.y;
+            offset += COLLECTIBLE_STRIDE;
+        }
+        return packed;
+    }
+
+    packWind(wind) {
+        const field = new Float32Array(wind.u.length * WIND_STRIDE);
+        for (let i = 0; i < wind.u.length; i++) {
+            field[i * WIND_STRIDE] = wind.u[i];
+            field[i * WIND_STRIDE + 1] = wind.v[i];
+        }
+        return {columns: wind.columns, rows: wind.rows, cellSize: wind.cell_size, field: field};
+    }
+
+    packBots(bots) {
+        const packed = new Float32Array(bots.length * BOT_STRIDE);
+        let offset = 0;
+        for (const bot of bots) {
+            packed[offset] = bot.x;
+            packed[offset + 1] = bot.y;
+            packed[offset + 2] = bot.rotation;
+            packed[offset + 3] = bot.width;
+            packed[offset + 4] = bot.height;
+            offset += BOT_STRIDE;
+        }
+        return packed;
+    }
+}
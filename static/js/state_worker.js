@@ -0,0 +1,40 @@
+// Owns the Socket.IO connection so JSON parsing and state packing stay off the
+// main thread. Messages from the page: {type: 'connect', token}, {type: 'emit',
+// event, data}. Messages to the page: connection status, 'session', decoded
+// 'state' (see StateDecoder) and 'game_event'.
+importScripts('https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.0.1/socket.io.js', 'state_decoder.js');
+
+let socket = null;
+let token = null;
+const decoder = new StateDecoder();
+
+function connect() {
+    // The session token lets the server hand back our room after a reconnect or restart
+    socket = io({
+        auth: (cb) => cb({token: token}),
+        transports: ['websocket', 'polling']
+    });
+
+    socket.on('connect', () => self.postMessage({type: 'connect'}));
+    socket.on('disconnect', () => self.postMessage({type: 'disconnect'}));
+    socket.on('error', (error) => self.postMessage({type: 'error', error: String(error)}));
+    socket.on('session', (session) => {
+        token = session.token;
+        self.postMessage({type: 'session', token: token});
+    });
+    socket.on('game_state', (state) => {
+        const {message, transfer} = decoder.decode(state);
+        self.postMessage(message, transfer);
+    });
+    socket.on('game_events', (event) => self.postMessage({type: 'game_event', event: event}));
+}
+
+self.onmessage = (message) => {
+    const data = message.data;
+    if (data.type === 'connect') {
+        token = data.token;
+        connect();
+    } else if (data.type === 'emit' && socket) {
+        socket.emit(data.event, data.data);
+    }
+};